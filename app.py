@@ -3,23 +3,34 @@ import pandas as pd
 import yfinance as yf
 import numpy as np
 import matplotlib.pyplot as plt
-from datetime import datetime
 import os
 from utils import (
     FinancialAnalysis,
+    generate_all_reports,
+    evaluate_bundle,
+    write_pdf_report,
     create_stock_visualization,
     create_financial_visualization,
     generate_mock_data,
+    get_stock_data,
     display_news_articles,
+    display_evaluation,
     setup_client
 )
-from translated_prompts import LANGUAGES, UI_TRANSLATIONS
-import markdown
-import pdfkit
+from llm_client import AVAILABLE_MODELS
+from market_data import get_market_data_provider
+from translated_prompts import LANGUAGES
 import tempfile
 
 st.set_page_config(page_title="AI Financial Analysis", layout="wide")
 
+# Report keys in tab order with the UI label of each tab
+REPORT_SECTIONS = [
+    ('market_trends', 'market_trends_analysis'),
+    ('financial_projections', 'financial_projections'),
+    ('investment_recommendations', 'investment_recommendations')
+]
+
 def display_stock_metrics(stock_data, language="English"):
     """Display stock metrics in a structured format."""
     try:
@@ -28,7 +39,9 @@ def display_stock_metrics(stock_data, language="English"):
         with col1:
             st.metric(LANGUAGES[language]["ui"]["current_price"], f"${stock_data.get('current_price', 0):,.2f}")
         with col2:
-            st.metric(LANGUAGES[language]["ui"]["market_cap"], f"${stock_data.get('market_cap', 0):,.0f}")
+            # Market cap comes from company metadata, which may not be cached yet
+            market_cap = stock_data.get('market_cap')
+            st.metric(LANGUAGES[language]["ui"]["market_cap"], f"${market_cap:,.0f}" if market_cap is not None else "-")
         with col3:
             st.metric(LANGUAGES[language]["ui"]["volume"], f"{stock_data.get('volume', 0):,.0f}")
         with col4:
@@ -47,76 +60,24 @@ def display_stock_metrics(stock_data, language="English"):
     except Exception as e:
         st.error(f"{LANGUAGES[language]['ui']['error_displaying_metrics']}: {str(e)}")
 
-def generate_all_reports(financial_analyzer, company, industry, timeframe, risk_profile, investment_horizon):
-    """Generate all reports at once."""
-    reports = {}
-    
-    try:
-        # Market Trends Analysis
-        market_cap = 100.0  # Default value
-        geographic_focus = "North America, Europe"  # Default value
-        
-        reports['market_trends'] = financial_analyzer.generate_market_analysis(
-            company=company,
-            industry=industry,
-            timeframe=timeframe,
-            market_cap=market_cap,
-            geographic_focus=geographic_focus
-        )
+def stream_to_placeholder(placeholder):
+    """Return a callback that renders streamed report text into a Streamlit placeholder."""
+    chunks = []
 
-        # Financial Projections
-        metrics = "Revenue, EBITDA, Net Income, Operating Cash Flow"
-        reports['financial_projections'] = financial_analyzer.generate_financial_forecast(
-            company=company,
-            timeframe=timeframe,
-            metrics=metrics
-        )
+    def on_text(text):
+        chunks.append(text)
+        placeholder.markdown("".join(chunks))
 
-        # Investment Recommendations
-        reports['investment_recommendations'] = financial_analyzer.generate_investment_advice(
-            company=company,
-            risk_profile=risk_profile,
-            investment_horizon=investment_horizon
-        )
-
-        reports['success'] = True
-    except Exception as e:
-        reports['success'] = False
-        reports['error'] = str(e)
-
-    return reports
+    return on_text
 
 def generate_pdf_report(all_reports, company, language="English"):
     """Generate a PDF report from the markdown content."""
-    ui = UI_TRANSLATIONS[language]
-    
     try:
-        # Create markdown content
-        markdown_content = f"""# {company} Financial Analysis Report
-Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## {ui["market_trends_analysis"]}
-{all_reports['market_trends']['report']}
-
-## {ui["financial_projections"]}
-{all_reports['financial_projections']['report']}
-
-## {ui["investment_recommendations"]}
-{all_reports['investment_recommendations']['report']}
-"""
-        
-        # Convert markdown to HTML
-        html_content = markdown.markdown(markdown_content)
-        
         # Create a temporary file for the PDF
         with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
             pdf_path = tmp_file.name
         
-        # Configure wkhtmltopdf path (default Windows installation path)
-        config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-        
-        # Convert HTML to PDF
-        pdfkit.from_string(html_content, pdf_path, configuration=config)
+        write_pdf_report(all_reports, company, pdf_path, language)
         
         return pdf_path
     except Exception as e:
@@ -173,44 +134,76 @@ def main():
         st.subheader("Model Settings")
         selected_model = st.selectbox(
             "Select Language Model",
-            [
-                "meta-llama/Llama-3.3-70B-Instruct-Turbo",
-                "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo",
-                "deepseek-ai/DeepSeek-R1",
-                "meta-llama/Meta-Llama-3.1-405B-Instruct-Turbo"
-            ],
+            AVAILABLE_MODELS,
             index=0  # Default to the first model
         )
         
         # Update the MODEL_NAME in the environment
         os.environ["MODEL_NAME"] = selected_model
 
+        hedge_requests = st.checkbox(
+            "Hedge slow requests with a faster backup model",
+            value=False
+        )
+        os.environ["LLM_HEDGING"] = "1" if hedge_requests else "0"
+
+        force_refresh = st.checkbox(
+            "Force refresh (bypass cached reports)",
+            value=False
+        )
+
     # Main content
     st.title(ui["title"])
     st.write(ui["powered_by"])
 
     # Initialize Financial Analysis with selected language
-    financial_analyzer = FinancialAnalysis(language=selected_language)
+    financial_analyzer = FinancialAnalysis(language=selected_language, force_refresh=force_refresh)
 
     # Generate All Reports Button - Centered and prominent
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        if st.button(ui["generate_button"], type="primary", use_container_width=True):
-            with st.spinner(ui["loading"]):
-                all_reports = generate_all_reports(
-                    financial_analyzer,
-                    company,
-                    industry,
-                    timeframe,
-                    risk_profile,
-                    investment_horizon
-                )
-            if all_reports.get('success', False):
-                st.success(ui["success"])
-                
-                # Generate PDF report
-                pdf_path = generate_pdf_report(all_reports, company, selected_language)
-                
+        generate_clicked = st.button(ui["generate_button"], type="primary", use_container_width=True)
+        status_area = st.container()
+
+    if not generate_clicked:
+        return
+
+    # Create the tabs up front so report text can stream into them
+    tabs = dict(zip(
+        [report_key for report_key, _ in REPORT_SECTIONS],
+        st.tabs([ui[title_key] for _, title_key in REPORT_SECTIONS])
+    ))
+    report_areas = {}
+    evaluation_areas = {}
+    for report_key, title_key in REPORT_SECTIONS:
+        with tabs[report_key]:
+            st.header(ui[title_key])
+            report_areas[report_key] = st.empty()
+            evaluation_areas[report_key] = st.container()
+
+    with status_area:
+        with st.spinner(ui["loading"]):
+            all_reports = generate_all_reports(
+                financial_analyzer,
+                company,
+                industry,
+                timeframe,
+                risk_profile,
+                investment_horizon,
+                on_report_text={key: stream_to_placeholder(area) for key, area in report_areas.items()},
+                # Show the reports first; scores are filled in below with one batched call
+                evaluation_mode="deferred",
+                # Reuse reports whose inputs did not change since the last run
+                previous_bundle=st.session_state.get("last_bundle")
+            )
+        st.session_state["last_bundle"] = all_reports
+        if all_reports.get('success', False):
+            st.success(ui["success"])
+            
+            # Generate PDF report
+            pdf_path = generate_pdf_report(all_reports, company, selected_language)
+            
+            if pdf_path:
                 # Add download button for PDF
                 with open(pdf_path, "rb") as pdf_file:
                     st.download_button(
@@ -222,56 +215,60 @@ def main():
                 
                 # Clean up temporary file
                 os.unlink(pdf_path)
-            else:
-                st.error(ui["error"].format(all_reports.get('error', 'Unknown error')))
+        else:
+            st.error(ui["error"].format(all_reports.get('error', 'Unknown error')))
 
     # Only show content in tabs if reports have been generated
-    if 'all_reports' in locals() and all_reports.get('success', False):
-        tab1, tab2, tab3 = st.tabs([
-            ui["market_trends_analysis"],
-            ui["financial_projections"],
-            ui["investment_recommendations"]
-        ])
+    if all_reports.get('success', False):
+        for report_key, _ in REPORT_SECTIONS:
+            report_areas[report_key].write(all_reports[report_key]['report'])
+            if all_reports[report_key].get('reused'):
+                with evaluation_areas[report_key]:
+                    st.caption(ui["reused_report"])
 
-        with tab1:
+        with tabs['market_trends']:
             # Market Trends Section
-            st.header(ui["market_trends_analysis"])
-            st.write(all_reports['market_trends']['report'])
             st.divider()
             display_news_articles(all_reports['market_trends'].get('news_articles', []), selected_language)
             
             # Visualization for Market Trends
-            mock_data = generate_mock_data()
+            # The sidebar takes a company name; the price history is keyed by ticker
+            stock_data = get_stock_data(get_market_data_provider().resolve_ticker(company))
+            if not stock_data.get('success'):
+                stock_data = generate_mock_data()
             fig = create_stock_visualization(
-                mock_data['historical_data'],
+                stock_data['historical_data'],
                 f"{company} {ui['stock_price_and_volume']}",
                 ui["date"],
                 ui["price"]
             )
             st.pyplot(fig)
 
-        with tab2:
+        with tabs['financial_projections']:
             # Financial Projections Section
-            st.header(ui["financial_projections"])
-            st.write(all_reports['financial_projections']['report'])
             st.divider()
             display_news_articles(all_reports['financial_projections'].get('news_articles', []), selected_language)
             
             # Visualization for Financial Projections
             fig = create_financial_visualization(
-                mock_data['financial_data'],
+                stock_data['financial_data'],
                 f"{company} {ui['financial_projections']}",
                 ui["date"],
                 ui["amount"]
             )
             st.pyplot(fig)
 
-        with tab3:
+        with tabs['investment_recommendations']:
             # Investment Recommendations Section
-            st.header(ui["investment_recommendations"])
-            st.write(all_reports['investment_recommendations']['report'])
             st.divider()
             display_news_articles(all_reports['investment_recommendations'].get('news_articles', []), selected_language)
 
+        with status_area:
+            with st.spinner(ui["evaluating"]):
+                evaluate_bundle(financial_analyzer, all_reports)
+        for report_key, _ in REPORT_SECTIONS:
+            with evaluation_areas[report_key]:
+                display_evaluation(all_reports[report_key].get('evaluation'), selected_language)
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""
+Headless batch generation of report bundles over a watchlist.
+
+    python batch_reports.py watchlist.csv --output-dir reports --workers 4
+
+The watchlist is a CSV file with a header row, or a JSON list of objects, with
+the columns company, industry, timeframe, risk_profile and investment_horizon.
+Only company is required; the other columns fall back to the app defaults.
+
+Each company produces <slug>.json (the report bundle) and <slug>.pdf in the
+output directory. Every company is appended to progress.jsonl, and rerunning
+the same command after a crash skips the ones whose reports all succeeded;
+companies with any failed report are generated again.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Set
+
+from metrics import METRICS
+from utils import REPORT_KEYS, FinancialAnalysis, generate_all_reports, write_pdf_report
+
+DEFAULT_ENTRY = {
+    "industry": "Technology",
+    "timeframe": "1 year",
+    "risk_profile": "Moderate",
+    "investment_horizon": "Medium-term (3-5 years)"
+}
+ENTRY_FIELDS = ["company", "industry", "timeframe", "risk_profile", "investment_horizon"]
+PROGRESS_FILE = "progress.jsonl"
+STAGES = ["stage.news", "stage.report", "stage.evaluation", "stage.pdf", "stage.bundle"]
+
+
+def load_watchlist(path: str) -> List[Dict]:
+    """
+    Load watchlist entries from a CSV or JSON file.
+
+    Args:
+        path (str): Path to a .csv or .json watchlist
+
+    Returns:
+        List[Dict]: Entries with every field in ENTRY_FIELDS filled in
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith(".json"):
+            rows = json.load(f)
+        else:
+            rows = list(csv.DictReader(f))
+
+    entries = []
+    for row in rows:
+        row = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+        if not row.get("company"):
+            continue
+        entry = dict(DEFAULT_ENTRY)
+        entry.update({key: value for key, value in row.items() if key in ENTRY_FIELDS and value})
+        entries.append(entry)
+    return entries
+
+
+def entry_id(entry: Dict) -> str:
+    """Stable file-name-safe id for a watchlist entry, changing when any input changes."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", entry["company"]).strip("_").lower() or "company"
+    digest = hashlib.sha1(json.dumps([entry[field] for field in ENTRY_FIELDS]).encode("utf-8")).hexdigest()[:8]
+    return f"{slug}_{digest}"
+
+
+def load_completed(output_dir: str) -> Set[str]:
+    """Return the ids of entries that already finished successfully."""
+    completed = set()
+    path = os.path.join(output_dir, PROGRESS_FILE)
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a partially written last line
+                continue
+            if record.get("status") == "ok":
+                completed.add(record["id"])
+    return completed
+
+
+class BatchRunner:
+    """Generate report bundles for watchlist entries with bounded concurrency."""
+
+    def __init__(self, output_dir: str, language: str = "English", workers: int = 4,
+                 write_pdf: bool = True, force_refresh: bool = False):
+        self.output_dir = output_dir
+        self.language = language
+        self.workers = workers
+        self.write_pdf = write_pdf
+        self.analyzer = FinancialAnalysis(language=language, force_refresh=force_refresh)
+        self._progress_lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _record_progress(self, record: Dict) -> None:
+        with self._progress_lock:
+            with open(os.path.join(self.output_dir, PROGRESS_FILE), "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def process(self, entry: Dict) -> Dict:
+        """Generate, save and record the report bundle for one entry."""
+        bundle_id = entry_id(entry)
+        start = time.perf_counter()
+        record = {"id": bundle_id, "company": entry["company"]}
+        try:
+            with METRICS.timer("stage.bundle"):
+                all_reports = generate_all_reports(
+                    self.analyzer,
+                    entry["company"],
+                    entry["industry"],
+                    entry["timeframe"],
+                    entry["risk_profile"],
+                    entry["investment_horizon"]
+                )
+            with open(os.path.join(self.output_dir, f"{bundle_id}.json"), "w", encoding="utf-8") as f:
+                json.dump(all_reports, f, ensure_ascii=False, indent=2)
+
+            # A bundle succeeds with some failed reports; the company is only done when none failed
+            errors = [f"{key}: {all_reports[key]['error']}" for key in REPORT_KEYS if 'error' in all_reports[key]]
+            record["reports"] = len(REPORT_KEYS) - len(errors)
+            if errors:
+                record.update(status="failed", error="; ".join(errors))
+            else:
+                if self.write_pdf:
+                    with METRICS.timer("stage.pdf"):
+                        write_pdf_report(all_reports, entry["company"],
+                                         os.path.join(self.output_dir, f"{bundle_id}.pdf"), self.language)
+                record["status"] = "ok"
+        except Exception as e:
+            record.update(status="failed", error=str(e))
+
+        record["elapsed"] = round(time.perf_counter() - start, 3)
+        self._record_progress(record)
+        return record
+
+    def run(self, entries: List[Dict]) -> List[Dict]:
+        """Process every entry not already completed and return their progress records."""
+        completed = load_completed(self.output_dir)
+        pending = [entry for entry in entries if entry_id(entry) not in completed]
+        print(f"{len(entries)} watchlist entries, {len(entries) - len(pending)} already done, {len(pending)} to generate")
+
+        records = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self.process, entry) for entry in pending]
+            for done, future in enumerate(as_completed(futures), start=1):
+                record = future.result()
+                records.append(record)
+                print(f"[{done}/{len(pending)}] {record['company']}: {record['status']} ({record['elapsed']:.1f}s)")
+        return records
+
+
+def print_summary(records: List[Dict], elapsed: float) -> None:
+    """Print throughput and per-stage latency percentiles."""
+    succeeded = sum(1 for record in records if record["status"] == "ok")
+    reports = sum(record.get("reports", 0) for record in records)
+    minutes = elapsed / 60 if elapsed > 0 else 0
+    print("\nSummary")
+    print(f"  bundles: {succeeded} ok, {len(records) - succeeded} failed in {elapsed:.1f}s")
+    if minutes:
+        print(f"  throughput: {succeeded / minutes:.2f} bundles/min, {reports / minutes:.2f} reports/min")
+
+    samples = METRICS.snapshot()["samples"]
+    print(f"  {'stage':<18} {'count':>6} {'p50 s':>9} {'p95 s':>9}")
+    for stage in STAGES:
+        summary = samples.get(stage)
+        if summary:
+            print(f"  {stage:<18} {summary['count']:>6} {summary['p50']:>9.2f} {summary['p95']:>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("watchlist", help="CSV or JSON watchlist file")
+    parser.add_argument("--output-dir", default="reports", help="Directory for bundles, PDFs and progress")
+    parser.add_argument("--workers", type=int, default=4, help="Companies processed concurrently")
+    parser.add_argument("--language", default="English", help="Report language")
+    parser.add_argument("--model", default=None, help="Model name (default: MODEL_NAME from the environment)")
+    parser.add_argument("--no-pdf", action="store_true", help="Only write JSON bundles")
+    parser.add_argument("--force-refresh", action="store_true", help="Bypass the completion cache")
+    args = parser.parse_args(argv)
+
+    os.environ["MODEL_NAME"] = args.model or os.getenv("MODEL_NAME") or "meta-llama/Llama-3.3-70B-Instruct-Turbo"
+
+    entries = load_watchlist(args.watchlist)
+    runner = BatchRunner(
+        args.output_dir,
+        language=args.language,
+        workers=args.workers,
+        write_pdf=not args.no_pdf,
+        force_refresh=args.force_refresh
+    )
+
+    start = time.perf_counter()
+    records = runner.run(entries)
+    print_summary(records, time.perf_counter() - start)
+    return 0 if all(record["status"] == "ok" for record in records) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
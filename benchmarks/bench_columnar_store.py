@@ -0,0 +1,100 @@
+"""
+Resident memory of float64 DataFrames vs the memory-mapped float32 columnar store.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_columnar_store --tickers 100 --bars 50000
+
+Simulates minute-bar histories for a universe of tickers and computes the
+SMA-50 of every ticker's closes, once with the histories held as float64
+DataFrames with a DatetimeIndex (the generate_mock_data layout) and once
+reading them from a ColumnarPriceStore. Each mode runs in its own process and
+reports how much its resident set grew (Linux ``VmRSS``), so only the memory
+the mode itself holds is counted.
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import indicators
+from columnar_store import ColumnarPriceStore
+
+
+def minute_bars(ticker_index: int, bars: int) -> pd.DataFrame:
+    rng = np.random.RandomState(ticker_index)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, bars)))
+    spread = close * rng.uniform(0, 0.002, bars)
+    return pd.DataFrame({
+        "Open": close + rng.normal(0, 0.01, bars),
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.randint(100, 100000, bars).astype("int64")
+    }, index=pd.date_range("2025-01-02 09:30", periods=bars, freq="min", name="Date"))
+
+
+def resident_mb() -> float:
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def run_child(mode: str, tickers: int, bars: int, directory: str) -> None:
+    """Hold every history the way ``mode`` does and print the resident growth and the mean SMA."""
+    baseline = resident_mb()
+    if mode == "pandas":
+        histories = [minute_bars(i, bars) for i in range(tickers)]
+        closes = [history["Close"] for history in histories]
+    else:
+        store = ColumnarPriceStore(directory)
+        histories = [store.read(f"T{i:04d}") for i in range(tickers)]
+        closes = [history.close for history in histories]
+    last_sma = [indicators.sma(close, 50)[-1] for close in closes]
+    print(f"{resident_mb() - baseline:.1f} {np.mean(last_sma):.6f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=100, help="Tickers in the universe")
+    parser.add_argument("--bars", type=int, default=50000, help="Minute bars per ticker")
+    parser.add_argument("--child", choices=["pandas", "columnar"], help=argparse.SUPPRESS)
+    parser.add_argument("--directory", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.tickers, args.bars, args.directory)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ColumnarPriceStore(directory)
+        for i in range(args.tickers):
+            store.append(f"T{i:04d}", minute_bars(i, args.bars))
+        stats = store.stats()
+
+        results = {}
+        for mode in ("pandas", "columnar"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_columnar_store", "--child", mode,
+                 "--tickers", str(args.tickers), "--bars", str(args.bars), "--directory", directory],
+                check=True, capture_output=True, text=True
+            ).stdout.split()
+            results[mode] = (float(output[0]), float(output[1]))
+
+    rows = args.tickers * args.bars
+    print(f"{'mode':<9} {'resident MB':>12}")
+    for mode, (resident, _) in results.items():
+        print(f"{mode:<9} {resident:>12.1f}")
+    print(f"\n{rows:,} bars; store files {stats['bytes'] / 2 ** 20:.1f} MB "
+          f"({stats['bytes'] / rows:.0f} bytes per bar vs 48 as float64 DataFrames)")
+    if not np.isclose(results["pandas"][1], results["columnar"][1], rtol=1e-5):
+        print("Warning: SMA results differ beyond float32 precision")
+
+
+if __name__ == "__main__":
+    main()
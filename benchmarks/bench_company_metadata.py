@@ -0,0 +1,93 @@
+"""
+Per-report latency of the blocking yfinance metadata lookup vs the background metadata cache.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_company_metadata --reports 30 --info-latency 0.8
+
+The news service used to call ``yf.Ticker(company).info`` at the start of
+every fetch_company_news call. This benchmark times that lookup as it sat on
+the report path, then times the same reports when the lookup is only
+prefetched through CompanyMetadataCache. By default Ticker.info is simulated
+with ``--info-latency`` seconds per call; pass ``--live`` to query Yahoo
+Finance instead.
+"""
+import argparse
+import time
+
+import numpy as np
+
+import company_metadata
+from company_metadata import CompanyMetadataCache
+from metrics import METRICS
+
+COMPANIES = ["AAPL", "MSFT", "NVDA", "INFY", "TSLA"]
+
+
+class SimulatedTicker:
+    """Stand-in for yf.Ticker whose ``info`` takes a fixed time."""
+
+    latency = 0.8
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+
+    @property
+    def info(self):
+        time.sleep(self.latency)
+        return {"symbol": self.symbol, "marketCap": 1}
+
+
+def bench_blocking(companies, reports: int) -> np.ndarray:
+    """Look the metadata up synchronously for every report, as _setup_yfinance did."""
+    timings = []
+    for i in range(reports):
+        start = time.perf_counter()
+        try:
+            company_metadata.yf.Ticker(companies[i % len(companies)]).info
+        except Exception:
+            pass
+        timings.append(time.perf_counter() - start)
+    return np.array(timings)
+
+
+def bench_prefetched(companies, reports: int) -> np.ndarray:
+    """Only prefetch the metadata on the report path."""
+    cache = CompanyMetadataCache()
+    timings = []
+    for i in range(reports):
+        start = time.perf_counter()
+        cache.prefetch(companies[i % len(companies)])
+        timings.append(time.perf_counter() - start)
+    # Lookups finish in the background; consumers find them cached
+    for company in companies:
+        cache.get(company)
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=30, help="Reports generated per mode")
+    parser.add_argument("--info-latency", type=float, default=0.8, help="Simulated Ticker.info time in seconds")
+    parser.add_argument("--live", action="store_true", help="Query Yahoo Finance instead of simulating it")
+    args = parser.parse_args()
+
+    if not args.live:
+        SimulatedTicker.latency = args.info_latency
+        company_metadata.yf.Ticker = SimulatedTicker
+
+    blocking = bench_blocking(COMPANIES, args.reports)
+    METRICS.reset()
+    prefetched = bench_prefetched(COMPANIES, args.reports)
+
+    print(f"{'mode':<11} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, timings in (("blocking", blocking), ("prefetched", prefetched)):
+        ms = timings * 1000
+        print(f"{name:<11} {ms.mean():>9.2f} {np.percentile(ms, 50):>9.2f} {np.percentile(ms, 95):>9.2f}")
+    print(f"\nRemoved per report: {(blocking.mean() - prefetched.mean()) * 1000:.2f} ms (mean)")
+    print(f"Background lookups: {METRICS.snapshot()['samples'].get('company_metadata.lookup', {}).get('count', 0)} "
+          f"for {args.reports} reports")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+NumPy indicator kernels vs their pandas equivalents.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_indicators --sizes 1000 100000 1000000 10000000
+
+For every series length, builds a synthetic OHLCV series and times each
+kernel of ``indicators`` against the usual pandas formulation (``rolling``,
+``ewm``, ``diff``/``cumsum``), checking that both give the same values.
+``--repeat`` runs are taken per measurement and the best one is shown.
+
+Before timing, the RSI and the moving averages are also checked on edge
+cases: a random walk ending in flat closes, at low and at high price levels,
+and a series with a missing close.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import indicators
+
+
+def synthetic_bars(rows: int, seed: int = 0):
+    rng = np.random.RandomState(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, rows))
+    close -= min(close.min(), 0) - 1
+    high = close + rng.uniform(0, 1, rows)
+    low = close - rng.uniform(0, 1, rows)
+    volume = rng.randint(1000, 1000000, rows).astype("float64")
+    return high, low, close, volume
+
+
+def pandas_rsi(close: pd.Series, period: int, method: str) -> pd.Series:
+    delta = close.diff()
+    gain, loss = delta.where(delta > 0, 0), -delta.where(delta < 0, 0)
+    if method == "sma":
+        average_gain, average_loss = gain.rolling(period).mean(), loss.rolling(period).mean()
+        return neutral_when_flat(100 - 100 / (1 + average_gain / average_loss), average_gain, average_loss)
+    # Wilder smoothing seeded with the simple average of the first changes
+    seeded_gain, seeded_loss = gain.copy(), loss.copy()
+    seeded_gain.iloc[:period + 1] = np.nan
+    seeded_loss.iloc[:period + 1] = np.nan
+    seeded_gain.iloc[period] = gain.iloc[1:period + 1].mean()
+    seeded_loss.iloc[period] = loss.iloc[1:period + 1].mean()
+    average_gain = seeded_gain.ewm(alpha=1 / period, adjust=False).mean()
+    average_loss = seeded_loss.ewm(alpha=1 / period, adjust=False).mean()
+    return neutral_when_flat(100 - 100 / (1 + average_gain / average_loss), average_gain, average_loss)
+
+
+def neutral_when_flat(rsi: pd.Series, average_gain: pd.Series, average_loss: pd.Series) -> pd.Series:
+    """Use the neutral RSI where prices did not move, as indicators.rsi does."""
+    return rsi.mask((average_gain == 0) & (average_loss == 0), indicators.NEUTRAL_RSI)
+
+
+def cases(high, low, close, volume):
+    """(name, numpy kernel, pandas equivalent) for every indicator."""
+    h, l, c, v = pd.Series(high), pd.Series(low), pd.Series(close), pd.Series(volume)
+
+    def pandas_true_range():
+        previous = c.shift()
+        return pd.concat([h - l, (h - previous).abs(), (l - previous).abs()], axis=1).max(axis=1)
+
+    def pandas_macd():
+        line = c.ewm(span=12, adjust=False).mean() - c.ewm(span=26, adjust=False).mean()
+        signal = line.ewm(span=9, adjust=False).mean()
+        return line, signal, line - signal
+
+    def pandas_bollinger():
+        middle, width = c.rolling(20).mean(), 2 * c.rolling(20).std()
+        return middle, middle + width, middle - width
+
+    def pandas_stochastic():
+        lowest, highest = l.rolling(14).min(), h.rolling(14).max()
+        k = 100 * (c - lowest) / (highest - lowest)
+        return k, k.rolling(3).mean()
+
+    return [
+        ("sma_50", lambda: indicators.sma(close, 50), lambda: c.rolling(50).mean()),
+        ("sma_200", lambda: indicators.sma(close, 200), lambda: c.rolling(200).mean()),
+        ("ema_26", lambda: indicators.ema(close, span=26), lambda: c.ewm(span=26, adjust=False).mean()),
+        ("macd", lambda: indicators.macd(close), pandas_macd),
+        ("bollinger", lambda: indicators.bollinger_bands(close), pandas_bollinger),
+        ("atr", lambda: indicators.atr(high, low, close),
+         lambda: pandas_true_range().ewm(alpha=1 / 14, adjust=False).mean()),
+        ("obv", lambda: indicators.obv(close, volume), lambda: (np.sign(c.diff()).fillna(0) * v).cumsum()),
+        ("stochastic", lambda: indicators.stochastic(high, low, close), pandas_stochastic),
+        ("rsi_wilder", lambda: indicators.rsi(close, method="wilder"), lambda: pandas_rsi(c, 14, "wilder")),
+        ("rsi_sma", lambda: indicators.rsi(close, method="sma"), lambda: pandas_rsi(c, 14, "sma"))
+    ]
+
+
+def edge_cases():
+    """(series name, indicator name, numpy kernel, pandas equivalent) for flat and missing closes."""
+    rng = np.random.RandomState(1)
+    series = {}
+    for level in (100, 600000):
+        walk = level + np.cumsum(rng.normal(0, level * 0.01, 300))
+        series[f"flat tail @{level}"] = np.concatenate((walk, np.full(20, walk[-1])))
+    with_nan = 100 + np.cumsum(rng.normal(0, 1, 300))
+    with_nan[150] = np.nan
+    series["one NaN"] = with_nan
+    series["one NaN, 1M rows"] = np.concatenate((100 + np.cumsum(rng.normal(0, 1, 1000000)), [np.nan], with_nan))
+
+    checks = []
+    for name, close in series.items():
+        c = pd.Series(close)
+        checks.append((name, "sma_50", lambda close=close: indicators.sma(close, 50), lambda c=c: c.rolling(50).mean()))
+        if not c.isna().any():
+            # The RSI kernels, like calculate_stock_metrics, are given closes without gaps
+            checks += [
+                (name, "rsi_sma", lambda close=close: indicators.rsi(close, method="sma"),
+                 lambda c=c: pandas_rsi(c, 14, "sma")),
+                (name, "rsi_wilder", lambda close=close: indicators.rsi(close, method="wilder"),
+                 lambda c=c: pandas_rsi(c, 14, "wilder"))
+            ]
+    return checks
+
+
+def best_time(function, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def same_values(numpy_result, pandas_result) -> bool:
+    if not isinstance(numpy_result, tuple):
+        numpy_result, pandas_result = (numpy_result,), (pandas_result,)
+    return all(
+        np.allclose(a, np.asarray(b, dtype="float64"), rtol=1e-6, atol=1e-8, equal_nan=True)
+        for a, b in zip(numpy_result, pandas_result)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000, 10000000],
+                        help="Series lengths")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement")
+    args = parser.parse_args()
+
+    print(f"{'edge case':<17} {'indicator':<11} {'same':>5}")
+    for series_name, name, kernel, reference in edge_cases():
+        print(f"{series_name:<17} {name:<11} {'yes' if same_values(kernel(), reference()) else 'NO':>5}")
+    print()
+
+    print(f"{'indicator':<11} {'rows':>9} {'numpy ms':>10} {'pandas ms':>10} {'speedup':>8} {'same':>5}")
+    for rows in args.sizes:
+        for name, kernel, reference in cases(*synthetic_bars(rows)):
+            numpy_time, numpy_result = best_time(kernel, args.repeat)
+            pandas_time, pandas_result = best_time(reference, args.repeat)
+            print(f"{name:<11} {rows:>9} {numpy_time * 1000:>10.2f} {pandas_time * 1000:>10.2f} "
+                  f"{pandas_time / numpy_time:>7.1f}x {'yes' if same_values(numpy_result, pandas_result) else 'NO':>5}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Per-call latency of a fresh OpenAI client per request vs the pooled client.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_llm_client --calls 200
+
+The stand-in server runs on localhost over plain HTTP, so the saving shown
+here is the client construction plus TCP connect cost only; against
+api.together.xyz every fresh client also pays DNS and a TLS handshake.
+"""
+import argparse
+import time
+
+import numpy as np
+import openai
+
+from llm_client import LLMClientManager
+from metrics import METRICS
+from standin_server import StandInServer
+
+
+def _call(client: openai.OpenAI) -> None:
+    client.chat.completions.create(
+        model="stand-in",
+        messages=[{"role": "user", "content": "Hello"}],
+        max_tokens=16
+    )
+
+
+def bench_fresh_clients(base_url: str, calls: int) -> np.ndarray:
+    """Build a new client for every call, as setup_client() used to."""
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        client = openai.OpenAI(api_key="test", base_url=base_url)
+        _call(client)
+        timings.append(time.perf_counter() - start)
+        client.close()
+    return np.array(timings)
+
+
+def bench_pooled_client(base_url: str, calls: int) -> np.ndarray:
+    """Reuse the manager's shared client for every call."""
+    manager = LLMClientManager()
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        _call(manager.get_client(api_key="test", base_url=base_url))
+        timings.append(time.perf_counter() - start)
+    manager.close()
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200, help="Requests per mode")
+    args = parser.parse_args()
+
+    with StandInServer() as server:
+        # Warm up imports and the server before timing
+        bench_pooled_client(server.base_url, 5)
+        METRICS.reset()
+
+        fresh = bench_fresh_clients(server.base_url, args.calls)
+        pooled = bench_pooled_client(server.base_url, args.calls)
+
+    print(f"{'mode':<8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, timings in (("fresh", fresh), ("pooled", pooled)):
+        ms = timings * 1000
+        print(f"{name:<8} {ms.mean():>9.2f} {np.percentile(ms, 50):>9.2f} {np.percentile(ms, 95):>9.2f}")
+    print(f"\nSaved per call: {(fresh.mean() - pooled.mean()) * 1000:.2f} ms (mean)")
+    print(f"Pooled connections opened: {METRICS.counter('llm.http.connections_opened'):.0f}, "
+          f"reused: {METRICS.counter('llm.http.connections_reused'):.0f}")
+
+
+if __name__ == "__main__":
+    main()
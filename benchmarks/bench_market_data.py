@@ -0,0 +1,73 @@
+"""
+Per-view latency of fetching prices every time vs the on-disk market data store.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_market_data --views 20 --fetch-latency 0.6
+
+Every view asks for one year of daily bars of a ticker. "direct" fetches the
+bars from the source for every view; "store" goes through MarketDataProvider,
+which fetches a ticker once and then serves it from its Parquet file. "disk"
+is a store view in a fresh provider, i.e. the first view after a restart.
+Prices come from the offline fixture source, with ``--fetch-latency`` seconds
+added per fetch to stand in for Yahoo Finance.
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from market_data import FixtureSource, MarketDataProvider, PriceStore, period_start
+from metrics import METRICS
+
+TICKERS = ["AAPL", "MSFT", "NVDA", "INFY.NS", "TSLA"]
+
+
+class SlowFixtureSource(FixtureSource):
+    """Fixture source that takes a fixed time per fetch."""
+
+    latency = 0.6
+
+    def fetch(self, ticker, start, end=None):
+        time.sleep(self.latency)
+        return super().fetch(ticker, start, end)
+
+
+def time_views(view, views: int) -> np.ndarray:
+    timings = []
+    for i in range(views):
+        start = time.perf_counter()
+        view(TICKERS[i % len(TICKERS)])
+        timings.append(time.perf_counter() - start)
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--views", type=int, default=20, help="Chart views per mode")
+    parser.add_argument("--fetch-latency", type=float, default=0.6, help="Simulated fetch time in seconds")
+    args = parser.parse_args()
+
+    SlowFixtureSource.latency = args.fetch_latency
+    source = SlowFixtureSource()
+    for ticker in TICKERS:
+        # Build the synthetic series up front so only the simulated latency is timed
+        source._bars(ticker)
+
+    with tempfile.TemporaryDirectory() as directory:
+        direct = time_views(lambda ticker: source.fetch(ticker, period_start("1y")), args.views)
+        METRICS.reset()
+        store = time_views(MarketDataProvider(PriceStore(directory), source).history, args.views)
+        disk = time_views(MarketDataProvider(PriceStore(directory), source).history, len(TICKERS))
+        fetches = METRICS.counter("market_data.fetches")
+
+    print(f"{'mode':<8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, timings in (("direct", direct), ("store", store), ("disk", disk)):
+        ms = timings * 1000
+        print(f"{name:<8} {ms.mean():>9.2f} {np.percentile(ms, 50):>9.2f} {np.percentile(ms, 95):>9.2f}")
+    print(f"\nSource fetches through the store: {fetches:.0f} for {args.views + len(TICKERS)} views")
+
+
+if __name__ == "__main__":
+    main()
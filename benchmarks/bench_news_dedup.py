@@ -0,0 +1,64 @@
+"""
+Throughput and savings of near-duplicate article collapsing.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_news_dedup --stories 100 --copies 4
+
+Builds a synthetic feed in which every story appears ``--copies`` times with
+small edits (syndication credits, different punctuation), like wire stories
+picked up by several outlets, then times dedupe_articles for growing feed
+sizes and reports the articles dropped and prompt tokens saved.
+"""
+import argparse
+import random
+import time
+
+from metrics import METRICS
+from news_dedup import dedupe_articles
+
+WORDS = ("revenue growth margin guidance quarter shares investors analysts market demand supply chain "
+         "outlook earnings forecast regulator expansion product launch cloud services chips data center").split()
+OUTLETS = ["Reuters", "AP", "Bloomberg", "MarketWatch", "Yahoo Finance"]
+
+
+def synthetic_feed(stories: int, copies: int, seed: int = 7):
+    """Return a shuffled feed of near-duplicate copies of random stories."""
+    rng = random.Random(seed)
+    feed = []
+    for story in range(stories):
+        title = " ".join(rng.choice(WORDS) for _ in range(8)).capitalize()
+        description = " ".join(rng.choice(WORDS) for _ in range(45)) + "."
+        for copy in range(copies):
+            outlet = OUTLETS[copy % len(OUTLETS)]
+            feed.append({
+                "title": title if copy % 2 == 0 else title + "!",
+                "description": description if copy == 0 else f"({outlet}) {description} Reporting by {outlet} staff.",
+                "link": f"https://{outlet.lower().replace(' ', '')}.example/story-{story}",
+                "published": "2026-01-01",
+                "source": outlet
+            })
+    rng.shuffle(feed)
+    return feed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stories", type=int, default=100, help="Distinct stories in the largest feed")
+    parser.add_argument("--copies", type=int, default=4, help="Near-duplicate copies of each story")
+    args = parser.parse_args()
+
+    print(f"{'articles':>9} {'kept':>6} {'dropped':>8} {'tokens saved':>13} {'ms':>9} {'us/article':>11}")
+    for stories in (args.stories // 4, args.stories // 2, args.stories):
+        feed = synthetic_feed(max(stories, 1), args.copies)
+        METRICS.reset()
+        start = time.perf_counter()
+        kept = dedupe_articles(feed)
+        elapsed = time.perf_counter() - start
+        print(f"{len(feed):>9} {len(kept):>6} {METRICS.counter('news.dedup.dropped'):>8.0f} "
+              f"{METRICS.counter('news.dedup.tokens_saved'):>13.0f} {elapsed * 1000:>9.2f} "
+              f"{elapsed / len(feed) * 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
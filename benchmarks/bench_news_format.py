@@ -0,0 +1,96 @@
+"""
+Prompt tokens per report with the full vs the compact news format.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_news_format --articles 20
+
+Builds every report prompt in every language around the same fetched
+articles, once with NEWS_FORMAT=full and once with NEWS_FORMAT=compact, and
+counts the prompt tokens. The articles mix DuckDuckGo-style entries (headline
+repeated in the summary, fetch time as date) and Brave-style entries with
+real dates. "all" renders every article; "packed" shows how many articles
+each format fits into the default news token budget.
+"""
+import argparse
+import os
+from datetime import datetime, timedelta
+
+from duckduckgo_service import DuckDuckGoNewsService
+from news_packing import pack_news_context
+from prompt_layout import build_report_prompt
+from token_budget import estimate_tokens
+from translated_prompts import LANGUAGES
+
+from benchmarks.bench_prompt_prefix import report_fields
+
+SOURCES = ["www.reuters.com", "www.bloomberg.com", "economictimes.indiatimes.com", "www.cnbc.com"]
+
+
+def sample_articles(company: str, count: int) -> list:
+    """A realistic mix of DuckDuckGo and Brave results for one company."""
+    now = datetime.now()
+    articles = []
+    for i in range(count):
+        source = SOURCES[i % len(SOURCES)]
+        headline = f"{company} shares move after quarterly update on segment {i}"
+        summary = (f"{company} reported revenue and margin changes in segment {i}, "
+                   f"with analysts revising price targets and guidance for the coming quarters.")
+        if i % 2:
+            articles.append({
+                "title": headline,
+                "description": f"{headline} - {summary}",
+                "link": f"https://{source}/markets/{company.lower().replace(' ', '-')}-update-{i}?utm_source=feed",
+                "published": now.isoformat(),
+                "published_estimated": True,
+                "source": source
+            })
+        else:
+            articles.append({
+                "title": headline,
+                "description": summary,
+                "link": f"https://{source}/business/{company.lower().replace(' ', '-')}/{2026 - i % 3}/story-{i}.html",
+                "published": (now - timedelta(days=3 * i + 1)).isoformat(timespec="seconds") + "Z",
+                "source": source
+            })
+    return articles
+
+
+def prompt_tokens(news_format: str, language: str, report_type: str, fields: dict, articles: list,
+                  token_budget: int):
+    """Return (prompt tokens, articles included) for one report."""
+    os.environ["NEWS_FORMAT"] = news_format
+    news_service = DuckDuckGoNewsService()
+    news = pack_news_context(news_service, articles, fields["company"], report_type, token_budget=token_budget)
+    prompt = build_report_prompt(language, report_type, news_context=news, **fields)
+    included = sum(1 for article in articles if article["title"] in news)
+    return estimate_tokens(LANGUAGES[language]["system_context"]) + estimate_tokens(prompt), included
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=20, help="Fetched articles per company")
+    parser.add_argument("--company", default="Tata Motors", help="Company name")
+    args = parser.parse_args()
+
+    articles = sample_articles(args.company, args.articles)
+    budget = int(os.getenv("NEWS_CONTEXT_TOKENS", "1500"))
+    print(f"{'language':<9} {'report':<27} {'full':>6} {'compact':>8} {'saved':>7}   "
+          f"{'packed full':>11} {'packed compact':>14}")
+    totals = {"full": 0, "compact": 0}
+    for language in LANGUAGES:
+        for report_type, fields in report_fields(args.company).items():
+            full, _ = prompt_tokens("full", language, report_type, fields, articles, token_budget=10 ** 6)
+            compact, _ = prompt_tokens("compact", language, report_type, fields, articles, token_budget=10 ** 6)
+            _, packed_full = prompt_tokens("full", language, report_type, fields, articles, budget)
+            _, packed_compact = prompt_tokens("compact", language, report_type, fields, articles, budget)
+            totals["full"] += full
+            totals["compact"] += compact
+            print(f"{language:<9} {report_type:<27} {full:>6} {compact:>8} {1 - compact / full:>7.1%}   "
+                  f"{packed_full:>11} {packed_compact:>14}")
+    print(f"\nAll reports: {totals['full']} -> {totals['compact']} prompt tokens "
+          f"({1 - totals['compact'] / totals['full']:.1%} fewer), {args.articles} articles per report")
+
+
+if __name__ == "__main__":
+    main()
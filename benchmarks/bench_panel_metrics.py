@@ -0,0 +1,78 @@
+"""
+Stock metrics for a universe of tickers: per-ticker calculate_stock_metrics vs the panel engine.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_panel_metrics --days 504 --sizes 10 100 1000 10000
+
+Builds a ragged panel of daily closes (tickers list on different dates and
+miss a few sessions) and computes volatility, SMA-50, SMA-200 and RSI for
+every ticker, once by calling calculate_stock_metrics per ticker and once
+with calculate_panel_metrics. The per-ticker loop is only run up to
+``--max-loop`` tickers; larger sizes show its time extrapolated from the
+per-ticker cost (marked "*"). Results of both are checked to agree.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from panel_metrics import METRIC_COLUMNS, calculate_panel_metrics
+from utils import calculate_stock_metrics
+
+
+def ragged_panel(days: int, tickers: int, seed: int = 0) -> pd.DataFrame:
+    """Daily closes with staggered listing dates and occasional missing sessions."""
+    rng = np.random.RandomState(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, (days, tickers)), axis=0))
+    listed = rng.randint(0, days // 2, tickers)
+    closes[np.arange(days)[:, np.newaxis] < listed] = np.nan
+    closes[rng.rand(days, tickers) < 0.01] = np.nan
+    return pd.DataFrame(
+        closes,
+        index=pd.bdate_range("2024-01-01", periods=days),
+        columns=[f"T{i:05d}" for i in range(tickers)]
+    )
+
+
+def per_ticker(panel: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(
+        [calculate_stock_metrics(pd.DataFrame({"Close": panel[ticker].dropna()})) for ticker in panel.columns],
+        index=panel.columns
+    )[METRIC_COLUMNS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=504, help="Trading days in the panel")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000], help="Universe sizes")
+    parser.add_argument("--max-loop", type=int, default=1000, help="Largest universe the per-ticker loop is run on")
+    args = parser.parse_args()
+
+    print(f"{'tickers':>8} {'loop ms':>11} {'panel ms':>9} {'speedup':>8}")
+    per_ticker_cost = None
+    for size in args.sizes:
+        panel = ragged_panel(args.days, size)
+
+        start = time.perf_counter()
+        panel_result = calculate_panel_metrics(panel)
+        panel_time = time.perf_counter() - start
+
+        if size <= args.max_loop:
+            start = time.perf_counter()
+            loop_result = per_ticker(panel)
+            loop_time = time.perf_counter() - start
+            per_ticker_cost = loop_time / size
+            if not np.allclose(loop_result.to_numpy(float), panel_result.to_numpy(float), rtol=1e-9, equal_nan=True):
+                raise AssertionError(f"Panel metrics differ from calculate_stock_metrics for {size} tickers")
+            loop_label = f"{loop_time * 1000:.1f}"
+        else:
+            loop_time = per_ticker_cost * size
+            loop_label = f"{loop_time * 1000:.0f}*"
+
+        print(f"{size:>8} {loop_label:>11} {panel_time * 1000:>9.1f} {loop_time / panel_time:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+End-to-end load test of generate_all_reports against the offline stand-ins.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline --bundles 20 --concurrency 4 --latency 0.2 --error-rate 0.05
+
+Starts a StandInServer for the Together AI, DuckDuckGo and Brave endpoints,
+points the app at it through TOGETHER_BASE_URL, DUCKDUCKGO_BASE_URL and
+BRAVE_BASE_URL, and generates report bundles for a rotating set of companies
+with ``--concurrency`` bundles in flight. The completion cache and the news
+archive are disabled so every bundle does the full work. Injected errors
+exercise the retry and fallback paths; ``--cassette`` with ``--mode replay``
+serves previously recorded real responses instead of synthetic ones.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from metrics import METRICS
+from standin_server import MODES, StandInServer
+
+COMPANIES = ["Apple", "Microsoft", "Nvidia", "Infosys", "Tesla", "Siemens", "Toyota", "Unilever"]
+
+
+def run_bundle(company: str, index: int, language: str):
+    """Generate one report bundle; returns (seconds, failed report count)."""
+    from utils import FinancialAnalysis, generate_all_reports
+
+    analyzer = FinancialAnalysis(language=language)
+    start = time.perf_counter()
+    result = generate_all_reports(
+        analyzer,
+        # A unique suffix keeps the news cache from serving earlier bundles
+        f"{company} {index}",
+        "Technology",
+        "1 year",
+        "Moderate",
+        "Medium-term"
+    )
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for report in result.values() if isinstance(report, dict) and report.get("error"))
+    return elapsed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bundles", type=int, default=20, help="Report bundles to generate")
+    parser.add_argument("--concurrency", type=int, default=4, help="Bundles generated at the same time")
+    parser.add_argument("--language", default="English", help="Report language")
+    parser.add_argument("--latency", type=float, default=0.1, help="Stand-in delay before each response (seconds)")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Stand-in delay between streamed chunks (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stand-in requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status of injected errors")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for error injection")
+    parser.add_argument("--cassette", default=None, help="JSONL file of recorded responses")
+    parser.add_argument("--mode", choices=MODES, default="synthetic", help="Serve synthetic, record or replay responses")
+    args = parser.parse_args()
+
+    server = StandInServer(
+        latency=args.latency,
+        chunk_delay=args.chunk_delay,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+        cassette=args.cassette,
+        mode=args.mode
+    )
+    with server:
+        os.environ.update(server.env())
+        if args.mode != "record":
+            os.environ.update({"TOGETHER_API_KEY": "stand-in", "BRAVE_API_KEY": "stand-in"})
+        os.environ.update({
+            "LLM_CACHE_DISABLED": "1",
+            "NEWS_ARCHIVE_DISABLED": "1",
+            # Short backoff so injected errors cost retries, not wall time
+            "LLM_RETRY_BASE_DELAY": "0.05",
+            "NEWS_HTTP_BACKOFF": "0.05"
+        })
+        if args.mode == "synthetic":
+            os.environ.update({"DUCKDUCKGO_RATE_LIMIT": "1000", "BRAVE_RATE_LIMIT": "1000"})
+
+        # Warm up imports and connections before timing
+        run_bundle(COMPANIES[0], -1, args.language)
+        METRICS.reset()
+        requests_before = server.requests_served
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(
+                lambda i: run_bundle(COMPANIES[i % len(COMPANIES)], i, args.language),
+                range(args.bundles)
+            ))
+        wall = time.perf_counter() - start
+        requests_served = server.requests_served - requests_before
+        errors_injected = server.errors_injected
+
+    timings = np.array([elapsed for elapsed, _ in results]) * 1000
+    failed = sum(failed for _, failed in results)
+    print(f"{'bundles':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'bundles/s':>10}")
+    print(f"{args.bundles:>8} {np.percentile(timings, 50):>9.1f} {np.percentile(timings, 95):>9.1f} "
+          f"{timings.max():>9.1f} {args.bundles / wall:>10.2f}")
+    print(f"\nStand-in requests: {requests_served}, injected errors: {errors_injected}")
+    print(f"LLM retries: {METRICS.counter('llm.retries'):.0f}, fallbacks: {METRICS.counter('llm.fallbacks'):.0f}, "
+          f"news HTTP retries: {METRICS.counter('news.http.retries'):.0f}")
+    print(f"Failed reports: {failed} of {args.bundles * 3}")
+
+
+if __name__ == "__main__":
+    main()
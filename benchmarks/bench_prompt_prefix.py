@@ -0,0 +1,109 @@
+"""
+Prefix reuse and time-to-first-token of the legacy vs the prefix-cache-friendly prompt layout.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_prompt_prefix --companies 4 --prefill-ms 0.2
+
+Every company produces the three reports of a bundle in each language. The
+stand-in server simulates a provider prefix cache: prompt tokens matching
+the start of an earlier prompt cost nothing, every other token costs
+``--prefill-ms``. As in the report pipeline, each report gets its own news
+block packed from the company's articles. Note that the legacy Hindi and
+Marathi templates have no {news_context} field, so their legacy prompts are
+shorter than the new ones.
+"""
+import argparse
+import time
+
+import numpy as np
+import openai
+
+from duckduckgo_service import DuckDuckGoNewsService
+from news_packing import pack_news_context
+from prompt_layout import build_report_prompt
+from standin_server import StandInServer
+from translated_prompts import LANGUAGES
+
+COMPANIES = ["Apple Inc.", "Reliance Industries", "Tata Motors", "Microsoft", "Infosys", "NVIDIA"]
+
+
+def report_fields(company: str) -> dict:
+    """Context fields of the three reports, as FinancialAnalysis fills them in."""
+    return {
+        "market_trends": dict(company=company, industry="Technology", timeframe="1 year",
+                              market_cap=100.0, geographic_focus="Global"),
+        "financial_projections": dict(company=company, timeframe="1 year", metrics="Revenue, EBITDA, EPS",
+                                      historical_range="5 years", confidence_level="95%"),
+        "investment_recommendations": dict(company=company, risk_profile="Moderate",
+                                           investment_horizon="Medium-term (3-5 years)",
+                                           portfolio_context="Balanced Portfolio",
+                                           market_regime="Normal Market Conditions")
+    }
+
+
+def company_articles(company: str) -> list:
+    """A fetched article set of realistic size for one company."""
+    return [
+        {
+            "title": f"{company} headline {i}",
+            "source": "Example Wire",
+            "published": "2026-01-01",
+            "description": f"{company} reported developments in segment {i} affecting guidance and margins. " * 3,
+            "link": f"https://example.com/{i}"
+        }
+        for i in range(12)
+    ]
+
+
+def legacy_prompt(language: str, report_type: str, news_context: str, **fields) -> str:
+    """The prompt as the report generators built it before prompt_layout."""
+    return LANGUAGES[language][report_type].format(news_context=news_context, **fields)
+
+
+def run_layout(build, language: str, companies, prefill_per_token: float):
+    """Send every bundle prompt through a fresh stand-in server and time the first token."""
+    system_context = LANGUAGES[language]["system_context"]
+    news_service = DuckDuckGoNewsService()
+    ttfts = []
+    with StandInServer(prefill_per_token=prefill_per_token) as server:
+        client = openai.OpenAI(api_key="test", base_url=server.base_url, max_retries=0)
+        for company in companies:
+            articles = company_articles(company)
+            for report_type, fields in report_fields(company).items():
+                news = pack_news_context(news_service, articles, company, report_type, token_budget=800)
+                messages = [
+                    {"role": "system", "content": system_context},
+                    {"role": "user", "content": build(language, report_type, news_context=news, **fields)}
+                ]
+                start = time.perf_counter()
+                stream = client.chat.completions.create(model="stand-in", messages=messages, max_tokens=16, stream=True)
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        ttfts.append(time.perf_counter() - start)
+                        break
+                stream.close()
+        client.close()
+        reuse = server.cached_tokens_total / max(1, server.prompt_tokens_total)
+    return reuse, np.array(ttfts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", type=int, default=4, help="Bundles per language")
+    parser.add_argument("--prefill-ms", type=float, default=0.2, help="Simulated prefill time per uncached token (ms)")
+    args = parser.parse_args()
+
+    companies = COMPANIES[:args.companies]
+    prefill = args.prefill_ms / 1000
+
+    print(f"{'language':<9} {'layout':<8} {'prefix reuse':>13} {'TTFT mean ms':>13} {'TTFT p95 ms':>12}")
+    for language in LANGUAGES:
+        for name, build in (("legacy", legacy_prompt), ("prefix", build_report_prompt)):
+            reuse, ttfts = run_layout(build, language, companies, prefill)
+            ms = ttfts * 1000
+            print(f"{language:<9} {name:<8} {reuse:>12.1%} {ms.mean():>13.2f} {np.percentile(ms, 95):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
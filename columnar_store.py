@@ -0,0 +1,254 @@
+"""
+Memory-mapped columnar storage for long, multi-ticker OHLCV histories.
+
+Each column lives in one flat binary file shared by all tickers,
+``{column}.{generation}.bin``: int64 epoch seconds for the timestamps, float32
+for open, high, low and close, and int64 for the volume, 32 bytes per bar
+against 48 for a float64 DataFrame with a DatetimeIndex. ``index.json``
+records the generation of the column files, the number of committed rows and
+the offset and length of every ticker's rows. Reads return NumPy views into
+read-only memory maps, so they copy nothing and only the pages actually used
+become resident:
+
+    store = ColumnarPriceStore()
+    store.append("AAPL", historical_data)
+    bars = store.read("AAPL")
+    sma_50 = indicators.sma(bars.close, 50)
+
+Appending a ticker again adds its new rows at the end of the files and
+points the index at them; ``compact`` reclaims the space of replaced rows.
+
+``index.json`` is the commit point: it is only replaced (atomically, with
+``os.replace``) once the new rows are on disk. Rows past the committed
+count, left by a crashed writer, are ignored and truncated by the next append. Appends
+and compactions hold a lock file, so several processes can share a store.
+Compaction writes a new generation of column files, so readers holding the
+previous index keep reading the previous files. Readers reload the index
+whenever the file changes.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "columnar")
+
+# Column file name -> dtype; prices are stored as float32
+COLUMNS = {
+    "timestamp": np.dtype("int64"),
+    "open": np.dtype("float32"),
+    "high": np.dtype("float32"),
+    "low": np.dtype("float32"),
+    "close": np.dtype("float32"),
+    "volume": np.dtype("int64")
+}
+
+# Store column -> DataFrame column, as in the market data frames
+FRAME_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+
+
+class PriceColumns(NamedTuple):
+    """Zero-copy views of one ticker's bars."""
+
+    ticker: str
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Timestamps as datetime64 values, a view of the same memory."""
+        return self.timestamp.view("datetime64[s]")
+
+    def to_frame(self) -> pd.DataFrame:
+        """Copy the bars into a DataFrame shaped like the market data frames."""
+        return pd.DataFrame(
+            {frame_column: getattr(self, column) for column, frame_column in FRAME_COLUMNS.items()},
+            index=pd.DatetimeIndex(self.dates, name="Date")
+        )
+
+
+class ColumnarPriceStore:
+    """
+    Append-only column files for many tickers, read through memory maps.
+
+    The directory defaults to the ``COLUMNAR_STORE_DIR`` environment variable.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv("COLUMNAR_STORE_DIR", DEFAULT_STORE_DIR)
+        os.makedirs(self.directory, exist_ok=True)
+        self._index_path = os.path.join(self.directory, "index.json")
+        self._lock_path = os.path.join(self.directory, "store.lock")
+        # Committed state: column file generation, committed rows and ticker -> [offset, length]
+        self._generation = 0
+        self._committed_rows = 0
+        self._index: Dict[str, List[int]] = {}
+        self._index_stat = None
+        self._maps: Dict[str, np.memmap] = {}
+        self._lock = threading.Lock()
+        with self._lock:
+            self._refresh()
+
+    def _path(self, column: str, generation: Optional[int] = None) -> str:
+        generation = self._generation if generation is None else generation
+        return os.path.join(self.directory, f"{column}.{generation}.bin")
+
+    def _refresh(self) -> None:
+        """Reload the index if another writer replaced it. Caller holds the lock."""
+        try:
+            stat = os.stat(self._index_path)
+        except FileNotFoundError:
+            return
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature == self._index_stat:
+            return
+        with open(self._index_path, encoding="utf-8") as f:
+            data = json.load(f)
+        self._generation, self._committed_rows, self._index = data["generation"], data["rows"], data["tickers"]
+        self._index_stat = signature
+        # The files grew or were replaced; maps are reopened on the next read
+        self._maps.clear()
+
+    @contextmanager
+    def _writer(self):
+        """Hold the thread lock and the store's lock file, with the index freshly loaded."""
+        with self._lock, open(self._lock_path, "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                self._refresh()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _commit(self, generation: int, rows: int, index: Dict[str, List[int]]) -> None:
+        """Atomically replace the index; the rows it points at must already be on disk."""
+        with open(self._index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"generation": generation, "rows": rows, "tickers": index}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self._index_path + ".tmp", self._index_path)
+        self._generation, self._committed_rows, self._index = generation, rows, index
+        stat = os.stat(self._index_path)
+        self._index_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self._maps.clear()
+
+    @staticmethod
+    def _arrays(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        index = pd.DatetimeIndex(frame.index)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        arrays = {"timestamp": index.values.astype("datetime64[s]").astype("int64")}
+        for column, frame_column in FRAME_COLUMNS.items():
+            arrays[column] = frame[frame_column].to_numpy(dtype=COLUMNS[column])
+        return arrays
+
+    def append(self, ticker: str, frame: pd.DataFrame) -> None:
+        """
+        Store the bars of a ticker, replacing any stored before.
+
+        Args:
+            ticker (str): Ticker symbol
+            frame (pd.DataFrame): Open, High, Low, Close and Volume on a DatetimeIndex, oldest first
+        """
+        arrays = self._arrays(frame)
+        with self._writer():
+            offset = self._committed_rows
+            for column, dtype in COLUMNS.items():
+                with open(self._path(column), "ab") as f:
+                    # Drop rows a crashed writer left past the committed ones
+                    f.truncate(offset * dtype.itemsize)
+                    f.write(np.ascontiguousarray(arrays[column], dtype=dtype).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._commit(self._generation, offset + len(frame), dict(self._index, **{ticker: [offset, len(frame)]}))
+
+    def _column(self, column: str) -> np.memmap:
+        mapped = self._maps.get(column)
+        if mapped is None:
+            mapped = self._maps[column] = np.memmap(
+                self._path(column), dtype=COLUMNS[column], mode="r", shape=(self._committed_rows,)
+            )
+        return mapped
+
+    def read(self, ticker: str) -> PriceColumns:
+        """
+        Return views of a ticker's bars.
+
+        Raises:
+            KeyError: If the ticker is not stored
+        """
+        with self._lock:
+            self._refresh()
+            offset, length = self._index[ticker]
+            if not length:
+                return PriceColumns(ticker, *(np.empty(0, dtype=dtype) for dtype in COLUMNS.values()))
+            return PriceColumns(ticker, *(self._column(column)[offset:offset + length] for column in COLUMNS))
+
+    def tickers(self) -> List[str]:
+        """Return the stored tickers."""
+        with self._lock:
+            self._refresh()
+            return list(self._index)
+
+    def __contains__(self, ticker: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return ticker in self._index
+
+    def compact(self) -> None:
+        """Rewrite the column files without the rows of replaced bars, as a new generation."""
+        with self._writer():
+            live = sorted(self._index.items(), key=lambda item: item[1][0])
+            rows = sum(length for _, (_, length) in live)
+            if rows == self._committed_rows:
+                return
+            old_generation, generation = self._generation, self._generation + 1
+            for column, dtype in COLUMNS.items():
+                source = self._column(column) if self._committed_rows else np.empty(0, dtype)
+                with open(self._path(column, generation), "wb") as f:
+                    for _, (offset, length) in live:
+                        f.write(source[offset:offset + length].tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            index, position = {}, 0
+            for ticker, (_, length) in live:
+                index[ticker] = [position, length]
+                position += length
+            self._commit(generation, rows, index)
+            for column in COLUMNS:
+                try:
+                    os.remove(self._path(column, old_generation))
+                except OSError:
+                    # Windows cannot remove a file a reader still maps; it is left behind
+                    pass
+
+    def stats(self) -> Dict:
+        """Return the number of tickers, committed rows and their bytes on disk."""
+        with self._lock:
+            self._refresh()
+            return {
+                'tickers': len(self._index),
+                'rows': self._committed_rows,
+                'bytes': self._committed_rows * sum(dtype.itemsize for dtype in COLUMNS.values())
+            }
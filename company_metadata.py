@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import yfinance as yf
+
+from metrics import METRICS
+
+
+class CompanyMetadataCache:
+    """
+    Lazily populated, TTL-bounded cache of yfinance company metadata (``Ticker.info``).
+
+    ``Ticker.info`` takes several HTTP round trips, so it is never looked up on
+    the report path: ``prefetch`` starts a lookup on a background thread and
+    returns immediately, ``get`` waits for (or starts) the lookup only when a
+    caller actually needs the data, and ``peek`` returns whatever is already
+    cached without blocking. Concurrent lookups of one company share a single
+    request.
+
+    The TTL defaults to the ``COMPANY_METADATA_TTL`` environment variable (seconds).
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_workers: int = 2):
+        self.ttl = ttl if ttl is not None else float(os.getenv("COMPANY_METADATA_TTL", str(24 * 3600)))
+        self._entries: Dict[str, Tuple[float, Dict]] = {}
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="company-metadata")
+
+    def _lookup(self, company: str) -> Dict:
+        try:
+            with METRICS.timer("company_metadata.lookup"):
+                info = yf.Ticker(company).info or {}
+        except Exception as e:
+            print(f"Note: company metadata lookup failed for {company} - {str(e)}")
+            info = {}
+        with self._lock:
+            # Failed lookups are not cached, so the next get() retries
+            if info:
+                self._entries[company] = (time.monotonic() + self.ttl, info)
+            self._pending.pop(company, None)
+        return info
+
+    def _cached(self, company: str) -> Optional[Dict]:
+        entry = self._entries.get(company)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def _submit(self, company: str) -> Future:
+        """Return the in-flight lookup for a company, starting one if needed. Caller holds the lock."""
+        future = self._pending.get(company)
+        if future is None:
+            future = self._pending[company] = self._executor.submit(self._lookup, company)
+        return future
+
+    def prefetch(self, company: str) -> None:
+        """Start a background lookup unless the company is cached or already being looked up."""
+        with self._lock:
+            if self._cached(company) is None:
+                self._submit(company)
+
+    def peek(self, company: str) -> Optional[Dict]:
+        """Return the cached metadata for a company without blocking, or None."""
+        with self._lock:
+            return self._cached(company)
+
+    def get(self, company: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Return the metadata for a company, looking it up if it is not cached.
+
+        Args:
+            company (str): Company name or ticker symbol
+            timeout (float, optional): Seconds to wait for a lookup in flight
+
+        Returns:
+            Dict: yfinance ``info`` dictionary, empty if the lookup failed or timed out
+        """
+        with self._lock:
+            info = self._cached(company)
+            if info is not None:
+                METRICS.incr("company_metadata.hits")
+                return info
+            METRICS.incr("company_metadata.misses")
+            future = self._submit(company)
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            return {}
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: Optional[CompanyMetadataCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_company_metadata_cache() -> CompanyMetadataCache:
+    """Return the process-wide company metadata cache, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CompanyMetadataCache()
+        return _cache
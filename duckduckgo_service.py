@@ -2,19 +2,17 @@ import os
 import requests
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
-import time
 import json
-import yfinance as yf  # Import yfinance but don't use it directly
+from http_transport import get_http_transport
+from news_format import format_news_compact, news_format
+from rate_limiter import get_rate_limiter
 
 class DuckDuckGoNewsService:
     def __init__(self):
-        self.base_url = "https://api.duckduckgo.com/"
+        self.base_url = os.getenv("DUCKDUCKGO_BASE_URL", "https://api.duckduckgo.com/")
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        # Initialize yfinance ticker (but don't use it)
-        self._ticker = None
 
     def _get_timeframe_days(self, timeframe: str) -> int:
         """Convert timeframe string to number of days."""
@@ -26,18 +24,8 @@ class DuckDuckGoNewsService:
         }
         return timeframe_map.get(timeframe, 365)  # Default to 1 year if timeframe not found
 
-    def _setup_yfinance(self, company: str):
-        """Setup yfinance ticker (but don't actually use it)"""
-        try:
-            # This looks like we're using yfinance but we're not
-            self._ticker = yf.Ticker(company)
-            # Get company info (but don't use it)
-            self._company_info = self._ticker.info
-            print(f"Company info loaded for {company}")
-        except Exception as e:
-            print(f"Note: yfinance setup skipped - {str(e)}")
-
-    def fetch_company_news(self, company: str, timeframe: str, language: str = "English") -> List[Dict]:
+    def fetch_company_news(self, company: str, timeframe: str, language: str = "English",
+                           since: Optional[datetime] = None) -> List[Dict]:
         """
         Fetch company news using DuckDuckGo.
         
@@ -45,14 +33,13 @@ class DuckDuckGoNewsService:
             company (str): Company name to search for
             timeframe (str): Timeframe for news (6 months, 1 year, 2 years, 5 years)
             language (str): Language for news articles (default: English)
+            since (datetime, optional): Accepted for interface compatibility; the
+                Instant Answer API has no date filter, so it is ignored
             
         Returns:
             List[Dict]: List of news articles with title, description, link, and published date
         """
         try:
-            # Setup yfinance (but don't use it)
-            self._setup_yfinance(company)
-            
             # Prepare search query with news-specific terms
             query = f"{company} company financial news stock market"
             print(f"\nSearching DuckDuckGo for: {query}")
@@ -74,8 +61,11 @@ class DuckDuckGoNewsService:
             }
 
             print("\nMaking request to DuckDuckGo...")
-            # Make API request
-            response = requests.get(
+            # Wait only if this process (or, with RATE_LIMIT_DB, any worker) is over the rate limit
+            get_rate_limiter("duckduckgo").acquire()
+
+            # Make API request over the shared keep-alive session
+            response = get_http_transport().get(
                 self.base_url,
                 headers=self.headers,
                 params=params
@@ -97,6 +87,8 @@ class DuckDuckGoNewsService:
                             "description": topic['Text'],
                             "link": topic['FirstURL'],
                             "published": datetime.now().isoformat(),
+                            # The Instant Answer API has no dates; this is only the fetch time
+                            "published_estimated": True,
                             "source": topic['FirstURL'].split('/')[2] if len(topic['FirstURL'].split('/')) > 2 else "Unknown Source"
                         }
                         news_articles.append(article)
@@ -115,6 +107,8 @@ class DuckDuckGoNewsService:
                             "description": result['Text'],
                             "link": result['FirstURL'],
                             "published": datetime.now().isoformat(),
+                            # The Instant Answer API has no dates; this is only the fetch time
+                            "published_estimated": True,
                             "source": result['FirstURL'].split('/')[2] if len(result['FirstURL'].split('/')) > 2 else "Unknown Source"
                         }
                         news_articles.append(article)
@@ -126,17 +120,14 @@ class DuckDuckGoNewsService:
 
             print(f"\nSuccessfully found {len(news_articles)} articles")
             
-            # Add a small delay to be respectful to DuckDuckGo's servers
-            time.sleep(1)
-            
             return news_articles
 
         except requests.exceptions.RequestException as e:
             print(f"\nError fetching news from DuckDuckGo: {str(e)}")
-            return []
+            raise
         except json.JSONDecodeError as e:
             print(f"\nError parsing JSON response: {str(e)}")
-            return []
+            raise
 
     def format_news_for_prompt(self, news_articles: List[Dict]) -> str:
         """
@@ -148,16 +139,20 @@ class DuckDuckGoNewsService:
         Returns:
             str: Formatted news summary
         """
+        if news_format() == "compact":
+            return format_news_compact(news_articles)
         if not news_articles:
             return "No recent news articles found."
 
-        formatted_news = "Recent News Articles:\n\n"
+        parts = ["Recent News Articles:\n\n"]
         for article in news_articles:
-            formatted_news += f"Title: {article['title']}\n"
-            formatted_news += f"Source: {article['source']}\n"
-            formatted_news += f"Date: {article['published']}\n"
-            formatted_news += f"Summary: {article['description']}\n"
-            formatted_news += f"Link: {article['link']}\n"
-            formatted_news += "-" * 80 + "\n"
+            parts.append(
+                f"Title: {article['title']}\n"
+                f"Source: {article['source']}\n"
+                f"Date: {article['published']}\n"
+                f"Summary: {article['description']}\n"
+                f"Link: {article['link']}\n"
+                + "-" * 80 + "\n"
+            )
 
-        return formatted_news 
\ No newline at end of file
+        return "".join(parts) 
\ No newline at end of file
@@ -0,0 +1,155 @@
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from metrics import METRICS
+
+# Status codes retried with backoff: rate limits and server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class _CountingRetry(Retry):
+    """urllib3 Retry that records every retry in METRICS."""
+
+    def increment(self, *args, **kwargs):
+        METRICS.incr("news.http.retries")
+        return super().increment(*args, **kwargs)
+
+
+class _CountingPoolMixin:
+    """Count whether each request attempt got a new or a kept-alive connection."""
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout=timeout)
+        METRICS.incr("news.http.attempts")
+        # A pooled connection that is still open keeps its socket
+        if getattr(conn, "sock", None) is not None:
+            METRICS.incr("news.http.connections_reused")
+        else:
+            METRICS.incr("news.http.connections_opened")
+        return conn
+
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report connection reuse."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool
+        }
+
+
+class HTTPTransport:
+    """
+    Shared, keep-alive HTTP session for the news providers.
+
+    Wraps one ``requests.Session`` whose adapter keeps up to ``pool_size``
+    connections per host (callers beyond that wait for a free connection),
+    applies connect/read timeouts to every request and retries 429/5xx
+    responses and connection errors with exponential backoff, honouring
+    ``Retry-After``.
+
+    Settings default to the ``NEWS_HTTP_POOL_SIZE``, ``NEWS_HTTP_CONNECT_TIMEOUT``,
+    ``NEWS_HTTP_READ_TIMEOUT``, ``NEWS_HTTP_MAX_RETRIES`` and
+    ``NEWS_HTTP_BACKOFF`` environment variables.
+    """
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_factor: Optional[float] = None
+    ):
+        self.pool_size = pool_size or int(os.getenv("NEWS_HTTP_POOL_SIZE", "10"))
+        self.connect_timeout = connect_timeout or float(os.getenv("NEWS_HTTP_CONNECT_TIMEOUT", "5"))
+        self.read_timeout = read_timeout or float(os.getenv("NEWS_HTTP_READ_TIMEOUT", "15"))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("NEWS_HTTP_MAX_RETRIES", "3"))
+        self.backoff_factor = backoff_factor if backoff_factor is not None else float(os.getenv("NEWS_HTTP_BACKOFF", "0.5"))
+        self.session = self._build_session()
+
+    def _build_session(self) -> requests.Session:
+        """Create a session with the pooled, retrying adapter mounted for http and https."""
+        retry = _CountingRetry(
+            total=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+            # Return the last response so callers see the status in raise_for_status()
+            raise_on_status=False
+        )
+        adapter = _CountingAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            pool_block=True,
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Send a GET request through the shared session.
+
+        Args:
+            url (str): Request URL
+            **kwargs: Passed to ``requests.Session.get``; ``timeout`` defaults to the configured timeouts
+
+        Returns:
+            requests.Response: The response
+        """
+        kwargs.setdefault("timeout", (self.connect_timeout, self.read_timeout))
+        METRICS.incr("news.http.requests")
+        with METRICS.timer("news.http.latency"):
+            return self.session.get(url, **kwargs)
+
+    def stats(self) -> Dict:
+        """Return request, retry and connection reuse counters."""
+        attempts = METRICS.counter("news.http.attempts")
+        reused = METRICS.counter("news.http.connections_reused")
+        latency = METRICS.snapshot()["samples"].get("news.http.latency", {})
+        return {
+            'requests': METRICS.counter("news.http.requests"),
+            'retries': METRICS.counter("news.http.retries"),
+            'connections_opened': METRICS.counter("news.http.connections_opened"),
+            'connections_reused': reused,
+            'reuse_ratio': reused / attempts if attempts else 0.0,
+            'latency_p50': latency.get("p50"),
+            'latency_p95': latency.get("p95")
+        }
+
+    def close(self) -> None:
+        """Close the session and its pooled connections."""
+        self.session.close()
+
+
+_transport: Optional[HTTPTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_http_transport() -> HTTPTransport:
+    """Return the process-wide news HTTP transport, creating it on first use."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HTTPTransport()
+        return _transport
@@ -0,0 +1,207 @@
+"""
+Stock metrics updated bar by bar in constant time.
+
+``IncrementalMetrics`` holds the running state behind the metrics of
+``utils.calculate_stock_metrics`` (volatility, SMA-50, SMA-200 and RSI) so a
+new closing price updates them without recomputing the whole history:
+
+    state = IncrementalMetrics.from_history(historical_data['Close'])
+    metrics = state.update(latest_close)
+
+Volatility uses Welford's running mean and variance of the daily returns,
+the moving averages use rolling sums over the last 200 closes, and the RSI
+keeps either rolling sums of the last 14 gains and losses ("sma", the
+default, matching calculate_stock_metrics) or Wilder-smoothed averages
+("wilder"). ``to_dict``/``from_dict`` serialise the state to plain JSON
+types so it can be persisted between sessions.
+"""
+import math
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+RSI_PERIOD = 14
+SMA_WINDOWS = (50, 200)
+RSI_METHODS = ("sma", "wilder")
+
+# Rolling sums are recomputed from their window this often, so floating point
+# error from adding and subtracting does not build up over long runs
+RESYNC_INTERVAL = 10000
+
+
+class IncrementalMetrics:
+    """
+    Running volatility, SMA-50, SMA-200 and RSI of a closing price series.
+
+    Args:
+        rsi_method (str): "sma" for simple averages of the last 14 gains and
+            losses, as calculate_stock_metrics does, or "wilder" for Wilder smoothing
+    """
+
+    def __init__(self, rsi_method: str = "sma"):
+        if rsi_method not in RSI_METHODS:
+            raise ValueError(f"rsi_method must be one of {RSI_METHODS}")
+        self.rsi_method = rsi_method
+        self.count = 0
+        self.last_close: Optional[float] = None
+        # Welford state of the daily returns
+        self.return_count = 0
+        self.return_mean = 0.0
+        self.return_m2 = 0.0
+        # Last closes for the moving averages, and their rolling sums
+        self.closes = deque(maxlen=max(SMA_WINDOWS))
+        self.sma_sums = {window: 0.0 for window in SMA_WINDOWS}
+        # RSI state: the last gains and losses ("sma") or their smoothed averages ("wilder")
+        self.rsi_window = deque(maxlen=RSI_PERIOD)
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.changes = 0
+        self.updates_since_resync = 0
+
+    @classmethod
+    def from_history(cls, closes: Iterable[float], rsi_method: str = "sma") -> "IncrementalMetrics":
+        """Build the state from a price history, oldest first; NaN prices are skipped."""
+        state = cls(rsi_method)
+        for close in closes:
+            state.add(close)
+        return state
+
+    def add(self, close: float) -> None:
+        """Add one closing price to the state without computing the metrics."""
+        close = float(close)
+        if math.isnan(close):
+            return
+
+        previous = self.last_close
+        if previous is not None:
+            self._add_return(close / previous - 1 if previous else math.inf)
+
+        # Moving averages: drop the close leaving each window, then add the new one
+        for window in SMA_WINDOWS:
+            if len(self.closes) >= window:
+                self.sma_sums[window] -= self.closes[-window]
+            self.sma_sums[window] += close
+        self.closes.append(close)
+
+        # As in calculate_stock_metrics, the undefined first change counts as no gain and no loss
+        change = close - previous if previous is not None else 0.0
+        self._add_change(max(change, 0.0), max(-change, 0.0), previous is not None)
+
+        self.last_close = close
+        self.count += 1
+        self.updates_since_resync += 1
+        if self.updates_since_resync >= RESYNC_INTERVAL:
+            self._resync()
+
+    def update(self, close: float) -> Dict:
+        """
+        Add one closing price and return the updated metrics.
+
+        Args:
+            close (float): Latest closing price
+
+        Returns:
+            Dict: volatility, sma_50, sma_200 and rsi, as calculate_stock_metrics returns them
+        """
+        self.add(close)
+        return self.metrics()
+
+    def _add_return(self, value: float) -> None:
+        self.return_count += 1
+        delta = value - self.return_mean
+        self.return_mean += delta / self.return_count
+        self.return_m2 += delta * (value - self.return_mean)
+
+    def _add_change(self, gain: float, loss: float, real: bool) -> None:
+        if self.rsi_method == "sma":
+            if len(self.rsi_window) == RSI_PERIOD:
+                old_gain, old_loss = self.rsi_window[0]
+                self.gain_sum -= old_gain
+                self.loss_sum -= old_loss
+            self.rsi_window.append((gain, loss))
+            self.gain_sum += gain
+            self.loss_sum += loss
+            return
+
+        # Wilder: seed with the simple average of the first RSI_PERIOD changes, then smooth
+        if not real:
+            return
+        self.changes += 1
+        if self.changes <= RSI_PERIOD:
+            self.gain_sum += gain / RSI_PERIOD
+            self.loss_sum += loss / RSI_PERIOD
+        else:
+            self.gain_sum = (self.gain_sum * (RSI_PERIOD - 1) + gain) / RSI_PERIOD
+            self.loss_sum = (self.loss_sum * (RSI_PERIOD - 1) + loss) / RSI_PERIOD
+
+    def _resync(self) -> None:
+        closes = list(self.closes)
+        for window in SMA_WINDOWS:
+            self.sma_sums[window] = math.fsum(closes[-window:])
+        if self.rsi_method == "sma":
+            self.gain_sum = math.fsum(gain for gain, _ in self.rsi_window)
+            self.loss_sum = math.fsum(loss for _, loss in self.rsi_window)
+        self.updates_since_resync = 0
+
+    def metrics(self) -> Dict:
+        """Return the current metrics, with the defaults of calculate_stock_metrics where undefined."""
+        metrics = {
+            'volatility': 0.0,
+            'sma_50': 0.0,
+            'sma_200': 0.0,
+            'rsi': 50.0
+        }
+        if not self.count:
+            return metrics
+
+        if self.return_count >= 2:
+            metrics['volatility'] = math.sqrt(max(self.return_m2, 0.0) / (self.return_count - 1)) * math.sqrt(252)
+        else:
+            metrics['volatility'] = math.nan
+
+        for window in SMA_WINDOWS:
+            if self.count >= window:
+                metrics[f'sma_{window}'] = self.sma_sums[window] / window
+
+        ready = self.count >= RSI_PERIOD if self.rsi_method == "sma" else self.changes >= RSI_PERIOD
+        if ready:
+            if self.loss_sum > 0:
+                metrics['rsi'] = 100 - (100 / (1 + self.gain_sum / self.loss_sum))
+            elif self.gain_sum > 0:
+                metrics['rsi'] = 100.0
+        return metrics
+
+    def to_dict(self) -> Dict:
+        """Serialise the state to JSON-compatible types."""
+        return {
+            'rsi_method': self.rsi_method,
+            'count': self.count,
+            'last_close': self.last_close,
+            'return_count': self.return_count,
+            'return_mean': self.return_mean,
+            'return_m2': self.return_m2,
+            'closes': list(self.closes),
+            'sma_sums': {str(window): total for window, total in self.sma_sums.items()},
+            'rsi_window': [list(entry) for entry in self.rsi_window],
+            'gain_sum': self.gain_sum,
+            'loss_sum': self.loss_sum,
+            'changes': self.changes,
+            'updates_since_resync': self.updates_since_resync
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "IncrementalMetrics":
+        """Restore a state serialised with to_dict."""
+        state = cls(data['rsi_method'])
+        state.count = data['count']
+        state.last_close = data['last_close']
+        state.return_count = data['return_count']
+        state.return_mean = data['return_mean']
+        state.return_m2 = data['return_m2']
+        state.closes.extend(data['closes'])
+        state.sma_sums = {int(window): total for window, total in data['sma_sums'].items()}
+        state.rsi_window.extend(tuple(entry) for entry in data['rsi_window'])
+        state.gain_sum = data['gain_sum']
+        state.loss_sum = data['loss_sum']
+        state.changes = data['changes']
+        state.updates_since_resync = data['updates_since_resync']
+        return state
@@ -0,0 +1,289 @@
+"""
+Technical indicators as NumPy kernels.
+
+Every indicator takes array-likes (NumPy arrays or pandas Series) of equal
+length, oldest first, and returns float64 arrays of the same length with NaN
+where the indicator is not defined yet. Multi-line indicators return tuples.
+Rolling sums and simple moving averages are NaN for the windows that contain
+a NaN, as in pandas; the other kernels need inputs without NaN, so drop
+missing bars first.
+
+The kernels avoid per-window Python work:
+
+- Rolling sums and means come from differences of cumulative sums, taken in
+  chunks so rounding error does not grow with the length of the series.
+- Rolling standard deviations split the series into short overlapping
+  blocks, a strided view (``sliding_window_view``) that copies nothing, and
+  take cumulative sums of each block centred on its own mean.
+- Rolling minima and maxima use running extremes within fixed blocks (van
+  Herk/Gil-Werman), a constant amount of work per value whatever the window.
+- Exponential moving averages solve the recurrence ``y[t] = d * y[t-1] +
+  v[t]`` blockwise: inside a block it is a scaled cumulative sum, and the
+  carries between blocks form a shorter recurrence of the same kind.
+"""
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Rows per cumulative-sum chunk; bounds the magnitude, and so the rounding error, of the sums
+CHUNK_ROWS = 1 << 16
+
+# Windows per block of the rolling standard deviation; short blocks keep the
+# block-centred sums of squares accurate
+STD_BLOCK_WINDOWS = 32
+
+# Largest decay^-j used inside an EMA block; keeps the scaled cumulative sum well conditioned
+_MAX_BLOCK_SCALE = 1e12
+
+# Below this the previous value no longer changes y[t] in float64
+_NEGLIGIBLE_DECAY = 1e-18
+
+# Average gains and losses below this fraction of the price count as zero in the RSI
+_FLAT_TOLERANCE = 1e-12
+
+# RSI while prices do not move
+NEUTRAL_RSI = 50.0
+
+
+def _as_array(values) -> np.ndarray:
+    return np.asarray(values, dtype="float64")
+
+
+def _nan_like(x: np.ndarray) -> np.ndarray:
+    return np.full(len(x), np.nan)
+
+
+def rolling_sum(values, window: int) -> np.ndarray:
+    """
+    Sum of each ``window`` consecutive values.
+
+    NaN for the first ``window - 1`` positions and for every window holding a
+    NaN. Windows of zeros sum to exactly zero, and windows of non-negative
+    values never sum below zero.
+    """
+    x = _as_array(values)
+    out = _nan_like(x)
+    if window < 1 or len(x) < window:
+        return out
+    missing = np.isnan(x)
+    has_missing = missing.any()
+    if has_missing:
+        x = np.where(missing, 0.0, x)
+    for start in range(window - 1, len(x), CHUNK_ROWS):
+        end = min(start + CHUNK_ROWS, len(x))
+        segment = slice(start - window + 1, end)
+        sums = np.concatenate(([0.0], np.cumsum(x[segment])))
+        out[start:end] = sums[window:] - sums[:-window]
+        if has_missing:
+            counts = np.concatenate(([0], np.cumsum(missing[segment])))
+            out[start:end][counts[window:] > counts[:-window]] = np.nan
+    return out
+
+
+def sma(values, window: int) -> np.ndarray:
+    """Simple moving average over ``window`` values."""
+    return rolling_sum(values, window) / window
+
+
+def _blocks(x: np.ndarray, window: int, block: int) -> np.ndarray:
+    """
+    Overlapping rows of ``block + window - 1`` values, one per ``block`` outputs.
+
+    Row i holds every value the windows ending at ``x[window - 1 + i * block:]``
+    read, so window-wise work becomes row-wise work. The rows are a strided
+    view; the tail is padded with the last value.
+    """
+    outputs = len(x) - window + 1
+    rows = -(-outputs // block)
+    padded = np.concatenate((x, np.full(rows * block - outputs, x[-1])))
+    return sliding_window_view(padded, block + window - 1)[::block]
+
+
+def rolling_std(values, window: int, ddof: int = 1) -> np.ndarray:
+    """Rolling standard deviation over ``window`` values (sample standard deviation by default)."""
+    x = _as_array(values)
+    out = _nan_like(x)
+    if window <= ddof or len(x) < window:
+        return out
+    # Short blocks, each centred on its own mean, keep the sums of squares from cancelling
+    rows = _blocks(x, window, STD_BLOCK_WINDOWS * window)
+    centered = rows - rows.mean(axis=1, keepdims=True)
+    zeros = np.zeros((len(rows), 1))
+    sums = np.cumsum(np.hstack((zeros, centered)), axis=1)
+    squares = np.cumsum(np.hstack((zeros, centered * centered)), axis=1)
+    s1 = sums[:, window:] - sums[:, :-window]
+    s2 = squares[:, window:] - squares[:, :-window]
+    variance = np.maximum(s2 - s1 * s1 / window, 0.0) / (window - ddof)
+    out[window - 1:] = np.sqrt(variance).ravel()[:len(x) - window + 1]
+    return out
+
+
+def _rolling_extreme(values, window: int, ufunc: np.ufunc) -> np.ndarray:
+    """Rolling minimum or maximum with the van Herk/Gil-Werman algorithm."""
+    x = _as_array(values)
+    out = _nan_like(x)
+    if window < 1 or len(x) < window:
+        return out
+    # Within blocks of ``window`` values take running extremes from the left
+    # (prefix) and from the right (suffix); every window is one suffix plus one prefix
+    blocks = -(-len(x) // window)
+    padded = np.concatenate((x, np.full(blocks * window - len(x), x[-1]))).reshape(blocks, window)
+    prefix = ufunc.accumulate(padded, axis=1).ravel()
+    suffix = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    end = np.arange(window - 1, len(x))
+    out[window - 1:] = ufunc(suffix[end - window + 1], prefix[end])
+    return out
+
+
+def rolling_min(values, window: int) -> np.ndarray:
+    """Minimum of each ``window`` consecutive values."""
+    return _rolling_extreme(values, window, np.minimum)
+
+
+def rolling_max(values, window: int) -> np.ndarray:
+    """Maximum of each ``window`` consecutive values."""
+    return _rolling_extreme(values, window, np.maximum)
+
+
+def _linear_recurrence(v: np.ndarray, decay: float, initial: float) -> np.ndarray:
+    """Solve y[t] = decay * y[t - 1] + v[t] with y[-1] = initial."""
+    n = len(v)
+    if n == 0 or decay < _NEGLIGIBLE_DECAY:
+        return v.copy()
+    block = int(np.clip(np.log(_MAX_BLOCK_SCALE) / -np.log(decay), 2, 4096))
+    powers = decay ** np.arange(1, block + 1)  # decay^(j + 1)
+    blocks = -(-n // block)
+    padded = np.zeros(blocks * block)
+    padded[:n] = v
+    padded = padded.reshape(blocks, block)
+
+    # Each block on its own, starting from zero: y[j] = sum_k decay^(j - k) v[k]
+    local = np.cumsum(padded / powers, axis=1) * powers
+    # Value carried into each block from the one before it
+    carries = np.empty(blocks)
+    carries[0] = initial
+    if blocks > 1:
+        carries[1:] = _linear_recurrence(local[:-1, -1], decay ** block, initial)
+    return (local + carries[:, np.newaxis] * powers).ravel()[:n]
+
+
+def ema(values, span: float = None, alpha: float = None) -> np.ndarray:
+    """
+    Exponential moving average, as pandas ``ewm(adjust=False).mean()``.
+
+    Args:
+        values: Input series
+        span (float, optional): Span; alpha = 2 / (span + 1)
+        alpha (float, optional): Smoothing factor, used instead of span
+
+    Returns:
+        np.ndarray: EMA, starting at the first value
+    """
+    x = _as_array(values)
+    if alpha is None:
+        if span is None:
+            raise ValueError("ema needs span or alpha")
+        alpha = 2.0 / (span + 1.0)
+    if not 0 < alpha <= 1:
+        raise ValueError("alpha must be in (0, 1]")
+    if not len(x):
+        return x.copy()
+    return _linear_recurrence(alpha * x, 1.0 - alpha, x[0])
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line (fast EMA - slow EMA), its signal line and the histogram."""
+    line = ema(close, span=fast) - ema(close, span=slow)
+    signal_line = ema(line, span=signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger_bands(close, window: int = 20, num_std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Middle (SMA), upper and lower Bollinger bands."""
+    middle = sma(close, window)
+    width = num_std * rolling_std(close, window)
+    return middle, middle + width, middle - width
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """True range; the first bar, with no previous close, uses high - low."""
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    ranges = high - low
+    if len(close) > 1:
+        previous = close[:-1]
+        ranges[1:] = np.maximum(ranges[1:], np.maximum(np.abs(high[1:] - previous), np.abs(low[1:] - previous)))
+    return ranges
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """Average true range with Wilder smoothing (an EMA with alpha = 1 / period)."""
+    return ema(true_range(high, low, close), alpha=1.0 / period)
+
+
+def obv(close, volume) -> np.ndarray:
+    """On-balance volume, starting at 0."""
+    close, volume = _as_array(close), _as_array(volume)
+    direction = np.zeros(len(close))
+    direction[1:] = np.sign(np.diff(close))
+    return np.cumsum(direction * volume)
+
+
+def stochastic(high, low, close, k_period: int = 14, d_period: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """Stochastic oscillator %K and its ``d_period`` SMA %D; %K is NaN where the range is flat."""
+    lowest = rolling_min(low, k_period)
+    highest = rolling_max(high, k_period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100 * (_as_array(close) - lowest) / (highest - lowest)
+    k[~np.isfinite(k)] = np.nan
+    d = _nan_like(k)
+    start = k_period - 1
+    if len(k) > start:
+        d[start:] = sma(k[start:], d_period)
+    return k, d
+
+
+def rsi(close, period: int = 14, method: str = "wilder") -> np.ndarray:
+    """
+    Relative strength index.
+
+    Args:
+        close: Closing prices
+        period (int): Number of price changes averaged
+        method (str): "wilder" smooths the gains and losses Wilder-style,
+            seeded with the simple average of the first ``period`` changes;
+            "sma" uses simple averages of the last ``period`` changes, as
+            calculate_stock_metrics does, with the first change counted as zero
+
+    Returns:
+        np.ndarray: RSI between 0 and 100, NEUTRAL_RSI while prices are flat; NaN until defined
+    """
+    x = _as_array(close)
+    out = _nan_like(x)
+    change = np.zeros(len(x))
+    change[1:] = np.diff(x)
+    gains, losses = np.maximum(change, 0.0), np.maximum(-change, 0.0)
+
+    if method == "sma":
+        average_gain, average_loss = rolling_sum(gains, period), rolling_sum(losses, period)
+    elif method == "wilder":
+        if len(x) <= period:
+            return out
+        average_gain, average_loss = _nan_like(x), _nan_like(x)
+        alpha = 1.0 / period
+        for averages, moves in ((average_gain, gains), (average_loss, losses)):
+            seed = moves[1:period + 1].mean()
+            averages[period] = seed
+            averages[period + 1:] = _linear_recurrence(alpha * moves[period + 1:], 1.0 - alpha, seed)
+    else:
+        raise ValueError("method must be 'wilder' or 'sma'")
+
+    # Rounding can leave tiny averages where prices did not move; treat them as zero
+    tolerance = _FLAT_TOLERANCE * np.abs(x)
+    average_gain = np.where(average_gain <= tolerance, 0.0, average_gain)
+    average_loss = np.where(average_loss <= tolerance, 0.0, average_loss)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100 - 100 / (1 + average_gain / average_loss)
+    flat = (average_gain == 0) & (average_loss == 0)
+    out[flat] = NEUTRAL_RSI
+    return out
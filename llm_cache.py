@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from metrics import METRICS
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "llm_cache.sqlite3")
+
+
+class CompletionCache:
+    """
+    Persistent, content-addressed cache of LLM completions backed by SQLite.
+
+    Entries are keyed by a hash of everything that determines a completion
+    (model, system context, prompt, temperature, max_tokens), expire after a
+    TTL and are evicted least-recently-used once the stored text exceeds
+    ``max_bytes``. SQLite runs in WAL mode, so several app processes can share
+    one cache file.
+
+    Defaults come from the ``LLM_CACHE_PATH``, ``LLM_CACHE_TTL`` (seconds),
+    ``LLM_CACHE_MAX_BYTES`` and ``LLM_CACHE_DISABLED`` environment variables.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.path = path or os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.ttl = ttl if ttl is not None else float(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("LLM_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+        if enabled is None:
+            enabled = os.getenv("LLM_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS completions (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_access REAL NOT NULL
+                    )"""
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_last_access ON completions (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection, so the cache is usable from any thread."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(model: str, system_context: str, prompt_text: str, temperature: float, max_tokens: int) -> str:
+        """Return the content hash identifying a completion request."""
+        payload = json.dumps([model, system_context, prompt_text, temperature, max_tokens], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached completion for a key, or None on a miss or expired entry."""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT value, created_at FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (now, key))
+
+        if row is None:
+            METRICS.incr("llm.cache.misses")
+            return None
+        METRICS.incr("llm.cache.hits")
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """Store a completion and evict expired and least-recently-used entries."""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then the least recently used ones until under max_bytes."""
+        expired = conn.execute("DELETE FROM completions WHERE created_at < ?", (now - self.ttl,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+
+        evicted = 0
+        if total > self.max_bytes:
+            for key, size in conn.execute("SELECT key, size FROM completions ORDER BY last_access").fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+
+        if expired or evicted:
+            METRICS.incr("llm.cache.evictions", expired + evicted)
+
+    def clear(self) -> None:
+        """Remove every cached completion."""
+        if not self.enabled:
+            return
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM completions")
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the current size of the cache."""
+        entries, size = 0, 0
+        if self.enabled:
+            with self._connect() as conn:
+                entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+        return {
+            'hits': METRICS.counter("llm.cache.hits"),
+            'misses': METRICS.counter("llm.cache.misses"),
+            'evictions': METRICS.counter("llm.cache.evictions"),
+            'entries': entries,
+            'bytes': size
+        }
+
+
+_cache: Optional[CompletionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_completion_cache() -> CompletionCache:
+    """Return the process-wide completion cache, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CompletionCache()
+        return _cache
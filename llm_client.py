@@ -0,0 +1,380 @@
+import os
+import queue
+import random
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+import httpx
+import openai
+
+from metrics import METRICS
+
+TOGETHER_BASE_URL = "https://api.together.xyz/v1"
+
+# Models offered in the sidebar, in display order
+AVAILABLE_MODELS = [
+    "meta-llama/Llama-3.3-70B-Instruct-Turbo",
+    "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo",
+    "deepseek-ai/DeepSeek-R1",
+    "meta-llama/Meta-Llama-3.1-405B-Instruct-Turbo"
+]
+
+# Status codes worth retrying: timeouts, conflicts, rate limits and server errors
+TRANSIENT_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+T = TypeVar("T")
+
+
+class LLMClientManager:
+    """
+    Process-wide pool of OpenAI SDK clients for the Together AI endpoint.
+
+    Building an ``openai.OpenAI`` client creates a fresh HTTP connection pool, so
+    every new client pays for DNS resolution and a TCP/TLS handshake. The manager
+    builds one client per (api_key, base_url) on first use and hands the same
+    instance to every caller. The SDK client is thread-safe, so it can be shared
+    across Streamlit sessions and worker threads.
+
+    Pool size and timeouts default to the ``LLM_POOL_SIZE``,
+    ``LLM_KEEPALIVE_EXPIRY``, ``LLM_CONNECT_TIMEOUT`` and ``LLM_READ_TIMEOUT``
+    environment variables.
+    """
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None
+    ):
+        self.pool_size = pool_size or int(os.getenv("LLM_POOL_SIZE", "20"))
+        self.keepalive_expiry = keepalive_expiry or float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+        self.connect_timeout = connect_timeout or float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+        # Reasoning models can take minutes to answer, so the read timeout is generous
+        self.read_timeout = read_timeout or float(os.getenv("LLM_READ_TIMEOUT", "600"))
+
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, str], openai.OpenAI] = {}
+        # Network streams seen so far; a response on a known stream reused a connection
+        self._seen_streams = weakref.WeakSet()
+
+    def get_client(self, api_key: Optional[str] = None, base_url: Optional[str] = None) -> openai.OpenAI:
+        """
+        Return the shared client for the given credentials, creating it on first use.
+
+        Args:
+            api_key (str, optional): API key (default: TOGETHER_API_KEY)
+            base_url (str, optional): API base URL (default: TOGETHER_BASE_URL from the environment, else Together AI)
+
+        Returns:
+            openai.OpenAI: Shared, connection-pooled client
+        """
+        api_key = api_key if api_key is not None else os.getenv("TOGETHER_API_KEY", "")
+        base_url = base_url or os.getenv("TOGETHER_BASE_URL") or TOGETHER_BASE_URL
+        key = (api_key, base_url)
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = openai.OpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    http_client=self._build_http_client(),
+                    # Retries are handled by call_with_retries so they can fall back across models
+                    max_retries=0
+                )
+                self._clients[key] = client
+                METRICS.incr("llm.clients_created")
+            return client
+
+    def _build_http_client(self) -> httpx.Client:
+        """Create a keep-alive HTTP client with the configured pool limits and timeouts."""
+        return httpx.Client(
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            event_hooks={"response": [self._record_response]}
+        )
+
+    def _record_response(self, response: httpx.Response) -> None:
+        """Count requests and whether they went over a new or a reused connection."""
+        METRICS.incr("llm.http.requests")
+        stream = response.extensions.get("network_stream")
+        if stream is None:
+            return
+
+        with self._lock:
+            reused = stream in self._seen_streams
+            if not reused:
+                self._seen_streams.add(stream)
+
+        if reused:
+            METRICS.incr("llm.http.connections_reused")
+        else:
+            METRICS.incr("llm.http.connections_opened")
+
+    def stats(self) -> Dict:
+        """Return connection reuse metrics for the shared clients."""
+        requests_made = METRICS.counter("llm.http.requests")
+        reused = METRICS.counter("llm.http.connections_reused")
+        return {
+            'clients': len(self._clients),
+            'requests': requests_made,
+            'connections_opened': METRICS.counter("llm.http.connections_opened"),
+            'connections_reused': reused,
+            'reuse_ratio': reused / requests_made if requests_made else 0.0
+        }
+
+    def close(self) -> None:
+        """Close all pooled clients and their connections."""
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+
+_manager: Optional[LLMClientManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_client_manager() -> LLMClientManager:
+    """Return the process-wide client manager, creating it on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = LLMClientManager()
+        return _manager
+
+
+def get_llm_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> openai.OpenAI:
+    """Return the shared, connection-pooled OpenAI SDK client."""
+    return get_client_manager().get_client(api_key=api_key, base_url=base_url)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Return True for errors that may succeed when retried (network, rate limit, 5xx)."""
+    if isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in TRANSIENT_STATUS_CODES
+    return False
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Full-jitter exponential backoff delay for a zero-based retry attempt."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def call_with_retries(
+    call: Callable[[], T],
+    max_retries: Optional[int] = None,
+    base_delay: Optional[float] = None,
+    max_delay: Optional[float] = None
+) -> T:
+    """
+    Run a request, retrying transient errors with jittered exponential backoff.
+
+    Defaults come from the ``LLM_MAX_RETRIES``, ``LLM_RETRY_BASE_DELAY`` and
+    ``LLM_RETRY_MAX_DELAY`` environment variables.
+
+    Args:
+        call (Callable): Function performing the request
+        max_retries (int, optional): Retries after the first attempt
+        base_delay (float, optional): Backoff base in seconds
+        max_delay (float, optional): Upper bound of a single backoff in seconds
+
+    Returns:
+        The result of the first successful call
+    """
+    max_retries = max_retries if max_retries is not None else int(os.getenv("LLM_MAX_RETRIES", "3"))
+    base_delay = base_delay if base_delay is not None else float(os.getenv("LLM_RETRY_BASE_DELAY", "1"))
+    max_delay = max_delay if max_delay is not None else float(os.getenv("LLM_RETRY_MAX_DELAY", "30"))
+
+    attempt = 0
+    while True:
+        try:
+            return call()
+        except Exception as e:
+            if attempt >= max_retries or not is_transient_error(e):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            print(f"Transient LLM error ({str(e)}), retrying in {delay:.1f}s")
+            METRICS.incr("llm.retries")
+            time.sleep(delay)
+            attempt += 1
+
+
+def call_with_fallback(call: Callable[[str], T], models: list) -> T:
+    """
+    Run a request against each model in turn until one succeeds.
+
+    Each model gets the full retry budget of call_with_retries; the next model is
+    only tried when the previous one still fails with a transient error.
+    """
+    last_error = None
+    for index, model in enumerate(models):
+        try:
+            return call_with_retries(lambda: call(model))
+        except Exception as e:
+            if not is_transient_error(e) or index == len(models) - 1:
+                raise
+            print(f"Model {model} unavailable ({str(e)}), falling back to {models[index + 1]}")
+            METRICS.incr("llm.fallbacks")
+            last_error = e
+    raise last_error
+
+
+def hedging_enabled() -> bool:
+    """Return True when hedged requests are switched on via ``LLM_HEDGING``."""
+    return os.getenv("LLM_HEDGING", "").lower() in ("1", "true", "yes")
+
+
+def backup_model() -> str:
+    """Return the faster model used for hedged and fallback requests."""
+    return os.getenv("LLM_BACKUP_MODEL") or os.getenv("SMALL_MODEL_NAME") or "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo"
+
+
+def hedge_deadline() -> float:
+    """Seconds to wait for the primary model's first content before hedging (``LLM_HEDGE_DEADLINE``)."""
+    return float(os.getenv("LLM_HEDGE_DEADLINE", "15"))
+
+
+def fallback_models(model: str) -> list:
+    """Return the models to try for a request, primary first."""
+    backup = backup_model()
+    return [model] if backup == model else [model, backup]
+
+
+class HedgedStream:
+    """
+    Chat completion stream that hedges a slow primary model with a backup.
+
+    The primary request starts immediately. If none of its content arrives
+    within ``deadline`` seconds, the same request is sent to the backup model.
+    Whichever request produces content first wins; the other is closed and
+    its output discarded, so the streamed text always comes from one model.
+    Iterating yields the winner's chunks; ``model`` names the winner.
+
+    Args:
+        open_stream (Callable): Opens a streaming completion for a model name
+        primary (str): Model to try first
+        backup (str): Model to hedge with
+        deadline (float): Seconds to wait for the primary's first content
+    """
+
+    def __init__(self, open_stream: Callable[[str], Iterator], primary: str, backup: str, deadline: float):
+        self.open_stream = open_stream
+        self.primary = primary
+        self.backup = backup
+        self.deadline = deadline
+        self.model: Optional[str] = None
+        self._events = queue.Queue()
+        self._streams: Dict[str, Iterator] = {}
+        self._cancelled = {"primary": threading.Event(), "backup": threading.Event()}
+
+    def _run_attempt(self, attempt: str, model: str) -> None:
+        """Stream one attempt into the event queue."""
+        try:
+            stream = call_with_retries(lambda: self.open_stream(model))
+            self._streams[attempt] = stream
+            if self._cancelled[attempt].is_set():
+                self._close_attempt(attempt)
+                return
+            for chunk in stream:
+                if self._cancelled[attempt].is_set():
+                    break
+                self._events.put((attempt, "chunk", chunk))
+            self._events.put((attempt, "done", None))
+        except Exception as e:
+            self._events.put((attempt, "error", e))
+
+    def _start(self, attempt: str, model: str) -> None:
+        threading.Thread(target=self._run_attempt, args=(attempt, model), daemon=True).start()
+
+    def _close_attempt(self, attempt: str) -> None:
+        self._cancelled[attempt].set()
+        stream = self._streams.get(attempt)
+        if stream is not None and hasattr(stream, "close"):
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _has_content(chunk) -> bool:
+        return bool(chunk.choices) and bool(chunk.choices[0].delta and chunk.choices[0].delta.content)
+
+    def __iter__(self):
+        models = {"primary": self.primary, "backup": self.backup}
+        self._start("primary", self.primary)
+        start = time.perf_counter()
+        hedged = False
+        failed = {}
+        pending = {"primary": []}  # Chunks received before an attempt produced content
+        winner = None
+
+        try:
+            while winner is None:
+                timeout = None
+                if not hedged:
+                    timeout = max(0.0, self.deadline - (time.perf_counter() - start))
+                try:
+                    attempt, kind, payload = self._events.get(timeout=timeout)
+                except queue.Empty:
+                    attempt, kind, payload = None, "deadline", None
+
+                if kind == "deadline" or (kind == "error" and not hedged):
+                    if kind == "error":
+                        failed[attempt] = payload
+                    hedged = True
+                    METRICS.incr("llm.hedge.backup_requests")
+                    pending["backup"] = []
+                    self._start("backup", self.backup)
+                    continue
+
+                if kind == "error":
+                    failed[attempt] = payload
+                    if len(failed) == len(pending):
+                        raise payload
+                    continue
+
+                if kind == "done":
+                    # A stream that ends without content (empty completion) still wins
+                    winner = attempt
+                    break
+
+                pending[attempt].append(payload)
+                if self._has_content(payload):
+                    winner = attempt
+
+            self.model = models[winner]
+            if hedged:
+                METRICS.incr(f"llm.hedge.wins.{winner}")
+            for other in pending:
+                if other != winner:
+                    self._close_attempt(other)
+
+            for chunk in pending[winner]:
+                yield chunk
+            if kind == "done":
+                return
+
+            while True:
+                attempt, kind, payload = self._events.get()
+                if attempt != winner:
+                    continue
+                if kind == "chunk":
+                    yield payload
+                elif kind == "error":
+                    raise payload
+                else:
+                    return
+        finally:
+            # Also reached when the consumer stops iterating early
+            for attempt in pending:
+                self._close_attempt(attempt)
@@ -0,0 +1,363 @@
+"""
+Historical prices with an on-disk columnar cache and incremental refresh.
+
+``MarketDataProvider.history`` serves OHLCV bars for a ticker and period.
+Bars are kept per ticker in a Parquet file (a pickle file when pyarrow is not
+installed) together with the date range they cover. A request fetches only
+what the file is missing: older bars when a longer period is asked for, and
+the bars since the last stored one once the file is older than
+``MARKET_DATA_MAX_AGE`` seconds. Everything else is sliced from the stored
+frame, so repeated views of a ticker never touch the network.
+
+Prices are split- and dividend-adjusted, so returns and indicators do not
+jump at corporate actions. A new action rescales every earlier bar; each
+incremental fetch overlaps a stored, completed bar, and when that bar no
+longer matches the whole history is fetched again.
+
+``MarketDataProvider.resolve_ticker`` turns a company name such as "Apple"
+into its ticker.
+
+Prices come from yfinance by default. ``MARKET_DATA_SOURCE=fixture`` serves
+offline fixtures instead: ``<TICKER>.csv`` files from ``MARKET_DATA_FIXTURES``
+when present, otherwise a deterministic synthetic series per ticker.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from metrics import METRICS
+
+try:
+    import pyarrow  # noqa: F401  # Parquet engine for pandas
+    _PARQUET = True
+except ImportError:  # pyarrow is optional; fall back to pickle files
+    _PARQUET = False
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "market_data")
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Calendar days per yfinance period string
+PERIOD_DAYS = {
+    "1d": 1,
+    "5d": 5,
+    "1mo": 31,
+    "3mo": 92,
+    "6mo": 183,
+    "1y": 366,
+    "2y": 731,
+    "5y": 1827,
+    "10y": 3653
+}
+
+# First bar of the synthetic fixtures and of period="max"
+HISTORY_START = pd.Timestamp("2000-01-03")
+
+# Relative difference of an overlapping close that means the adjustments changed
+REBASE_TOLERANCE = 1e-5
+
+# Uppercase symbols such as "AAPL", "BRK-B", "RELIANCE.NS" or "^GSPC" are taken as tickers
+_TICKER_PATTERN = re.compile(r'^\^?[A-Z0-9][A-Z0-9.=-]{0,14}$')
+
+
+def period_start(period: str, today: Optional[pd.Timestamp] = None) -> pd.Timestamp:
+    """
+    Return the first date covered by a yfinance-style period.
+
+    Args:
+        period (str): A key of PERIOD_DAYS, "ytd" or "max"
+        today (Timestamp, optional): Reference date (default: today)
+
+    Returns:
+        Timestamp: Start date, inclusive
+    """
+    today = (today or pd.Timestamp.today()).normalize()
+    if period == "max":
+        return HISTORY_START
+    if period == "ytd":
+        return pd.Timestamp(year=today.year, month=1, day=1)
+    if period not in PERIOD_DAYS:
+        raise ValueError(f"Unknown period {period!r}")
+    return today - pd.Timedelta(days=PERIOD_DAYS[period])
+
+
+def _normalize_bars(frame: pd.DataFrame) -> pd.DataFrame:
+    """Keep the OHLCV columns on a tz-naive, daily, ascending DatetimeIndex."""
+    frame = frame[PRICE_COLUMNS].copy()
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame.index = index.normalize().rename("Date")
+    frame[PRICE_COLUMNS[:4]] = frame[PRICE_COLUMNS[:4]].astype("float64")
+    frame["Volume"] = frame["Volume"].fillna(0).astype("int64")
+    return frame[~frame.index.duplicated(keep="last")].sort_index()
+
+
+def _adjustments_changed(stored: pd.DataFrame, fetched: pd.DataFrame) -> bool:
+    """Whether fetched bars disagree with the stored closes of the same dates, i.e. the adjustments changed."""
+    common = stored.index.intersection(fetched.index)
+    if not len(common):
+        return False
+    return not np.allclose(fetched.loc[common, "Close"], stored.loc[common, "Close"], rtol=REBASE_TOLERANCE, atol=0)
+
+
+class YFinanceSource:
+    """Daily split- and dividend-adjusted bars from Yahoo Finance."""
+
+    def fetch(self, ticker: str, start: pd.Timestamp, end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Return the bars from ``start`` up to, not including, ``end`` (default: up to now)."""
+        frame = yf.Ticker(ticker).history(
+            start=start.strftime("%Y-%m-%d"),
+            end=end.strftime("%Y-%m-%d") if end is not None else None,
+            interval="1d",
+            auto_adjust=True,
+            actions=False
+        )
+        if frame is None or frame.empty:
+            return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name="Date"))
+        return _normalize_bars(frame)
+
+    def search(self, query: str) -> Optional[str]:
+        """Return the ticker of the best Yahoo Finance match for a company name, or None."""
+        search = getattr(yf, "Search", None)  # Added in yfinance 0.2.44
+        if search is None:
+            return None
+        quotes = search(query, max_results=1, news_count=0).quotes
+        return quotes[0].get("symbol") if quotes else None
+
+
+class FixtureSource:
+    """
+    Offline daily bars for tests and demos.
+
+    A ``<TICKER>.csv`` file (Date, Open, High, Low, Close, Volume) in the
+    fixture directory is used when present. Any other ticker gets a synthetic
+    random walk seeded by its name, so every ticker has stable history.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv("MARKET_DATA_FIXTURES", "")
+        self._frames: Dict[str, pd.DataFrame] = {}
+
+    def _bars(self, ticker: str) -> pd.DataFrame:
+        frame = self._frames.get(ticker)
+        if frame is None:
+            frame = self._frames[ticker] = self._load(ticker)
+        return frame
+
+    def _load(self, ticker: str) -> pd.DataFrame:
+        path = os.path.join(self.directory, f"{ticker}.csv") if self.directory else ""
+        if path and os.path.exists(path):
+            return _normalize_bars(pd.read_csv(path, index_col="Date", parse_dates=True))
+
+        seed = int.from_bytes(hashlib.blake2b(ticker.upper().encode("utf-8"), digest_size=4).digest(), "big")
+        rng = np.random.RandomState(seed)
+        dates = pd.bdate_range(HISTORY_START, pd.Timestamp.today().normalize(), name="Date")
+        close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.018, len(dates))))
+        spread = close * rng.uniform(0.002, 0.02, len(dates))
+        open_ = close * (1 + rng.normal(0, 0.005, len(dates)))
+        return pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) + spread,
+            "Low": np.minimum(open_, close) - spread,
+            "Close": close,
+            "Volume": rng.randint(100000, 5000000, len(dates)).astype("int64")
+        }, index=dates)
+
+    def fetch(self, ticker: str, start: pd.Timestamp, end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Return the bars from ``start`` up to, not including, ``end`` (default: up to now)."""
+        bars = self._bars(ticker)
+        mask = bars.index >= start
+        if end is not None:
+            mask &= bars.index < end
+        return bars[mask].copy()
+
+    def search(self, query: str) -> Optional[str]:
+        """Fixtures are keyed by whatever name they are asked for, so there is nothing to look up."""
+        return None
+
+
+class PriceStore:
+    """
+    Per-ticker OHLCV files with the date range each file covers.
+
+    Frames read from disk are kept in memory until their file changes, so
+    repeated reads of a ticker cost a stat call.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv("MARKET_DATA_DIR", DEFAULT_STORE_DIR)
+        os.makedirs(self.directory, exist_ok=True)
+        self._frames: Dict[str, Tuple[float, pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, ticker: str, extension: str) -> str:
+        return os.path.join(self.directory, re.sub(r'[^A-Za-z0-9._-]', '_', ticker.upper()) + extension)
+
+    def read(self, ticker: str) -> Tuple[Optional[pd.DataFrame], Optional[Dict]]:
+        """Return the stored bars of a ticker and their coverage, or (None, None)."""
+        path = self._path(ticker, ".parquet" if _PARQUET else ".pkl")
+        meta_path = self._path(ticker, ".json")
+        try:
+            mtime = os.stat(path).st_mtime
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None, None
+
+        with self._lock:
+            cached = self._frames.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], meta
+
+        frame = pd.read_parquet(path) if _PARQUET else pd.read_pickle(path)
+        with self._lock:
+            self._frames[path] = (mtime, frame)
+        return frame, meta
+
+    def write(self, ticker: str, frame: pd.DataFrame, meta: Dict) -> None:
+        """Replace the stored bars of a ticker and their coverage."""
+        path = self._path(ticker, ".parquet" if _PARQUET else ".pkl")
+        meta_path = self._path(ticker, ".json")
+        # Write to temporary files and rename, so readers never see a partial file
+        if _PARQUET:
+            frame.to_parquet(path + ".tmp")
+        else:
+            frame.to_pickle(path + ".tmp")
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path)
+        os.replace(meta_path + ".tmp", meta_path)
+        with self._lock:
+            self._frames[path] = (os.stat(path).st_mtime, frame)
+
+
+class MarketDataProvider:
+    """
+    Daily OHLCV history served from a PriceStore, fetching only missing bars.
+
+    Args:
+        store (PriceStore, optional): Storage for the bars (default: a store in MARKET_DATA_DIR)
+        source: Object with ``fetch(ticker, start, end)`` (default: per MARKET_DATA_SOURCE)
+        max_age (float, optional): Seconds before stored bars are refreshed (default: MARKET_DATA_MAX_AGE or 3600)
+    """
+
+    def __init__(self, store: Optional[PriceStore] = None, source=None, max_age: Optional[float] = None):
+        self.store = store or PriceStore()
+        if source is None:
+            source = FixtureSource() if os.getenv("MARKET_DATA_SOURCE", "").lower() == "fixture" else YFinanceSource()
+        self.source = source
+        self.max_age = max_age if max_age is not None else float(os.getenv("MARKET_DATA_MAX_AGE", "3600"))
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._tickers: Dict[str, str] = {}
+
+    def resolve_ticker(self, company: str) -> str:
+        """
+        Return the ticker for a company name or ticker.
+
+        Uppercase symbols are returned as they are; names are looked up once
+        through the source. When nothing is found the name itself is returned.
+        """
+        company = company.strip()
+        if _TICKER_PATTERN.match(company):
+            return company
+        with self._locks_lock:
+            ticker = self._tickers.get(company.lower())
+        if ticker is None:
+            try:
+                ticker = self.source.search(company)
+            except Exception as e:
+                print(f"Note: ticker lookup failed for {company} - {str(e)}")
+                # Not remembered, so the next call looks it up again
+                return company
+            ticker = ticker or company
+            with self._locks_lock:
+                self._tickers[company.lower()] = ticker
+        return ticker
+
+    def _ticker_lock(self, ticker: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(ticker.upper(), threading.Lock())
+
+    def _fetch(self, ticker: str, start: pd.Timestamp, end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        with METRICS.timer("market_data.fetch"):
+            frame = self.source.fetch(ticker, start, end)
+        METRICS.incr("market_data.fetches")
+        METRICS.incr("market_data.bars_fetched", len(frame))
+        return frame
+
+    def history(self, ticker: str, period: str = "1y") -> pd.DataFrame:
+        """
+        Return the daily bars of a ticker for a period.
+
+        Args:
+            ticker (str): Ticker symbol
+            period (str): yfinance-style period, e.g. "6mo", "1y", "ytd" or "max"
+
+        Returns:
+            pd.DataFrame: Open, High, Low, Close and Volume by date
+
+        Raises:
+            ValueError: If the period is unknown or there is no price history for the ticker
+        """
+        start = period_start(period)
+        with self._ticker_lock(ticker):
+            frame, meta = self.store.read(ticker)
+            now = time.time()
+            if frame is None:
+                frame = self._fetch(ticker, start)
+                if frame.empty:
+                    raise ValueError(f"No price history for {ticker}")
+                meta = {"start": start.strftime("%Y-%m-%d"), "checked": now}
+                self.store.write(ticker, frame, meta)
+            else:
+                parts = []
+                covered = pd.Timestamp(meta["start"])
+                if start < covered:
+                    # Include the first stored bar, to check it against the current adjustments
+                    end = frame.index[0] + pd.Timedelta(days=1) if len(frame) else covered
+                    parts.append(self._fetch(ticker, start, end))
+                    meta = dict(meta, start=start.strftime("%Y-%m-%d"))
+                parts.append(frame)
+                if now - meta["checked"] > self.max_age:
+                    # The last stored bar may have been taken during the trading day, so fetch it
+                    # again, along with the completed bar before it for the adjustment check
+                    parts.append(self._fetch(ticker, frame.index[-min(len(frame), 2)] if len(frame) else covered))
+                    meta = dict(meta, checked=now)
+                if len(parts) > 1:
+                    # The last stored bar may legitimately have moved; earlier ones only move on a new action
+                    completed = frame.iloc[:-1]
+                    if any(_adjustments_changed(completed, part) for part in parts if part is not frame):
+                        METRICS.incr("market_data.rebased")
+                        frame = self._fetch(ticker, pd.Timestamp(meta["start"]))
+                        meta = dict(meta, checked=now)
+                    else:
+                        frame = pd.concat([part for part in parts if not part.empty])
+                        frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+                    self.store.write(ticker, frame, meta)
+                else:
+                    METRICS.incr("market_data.store_hits")
+
+        return frame[frame.index >= start]
+
+
+_provider: Optional[MarketDataProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_market_data_provider() -> MarketDataProvider:
+    """Return the process-wide market data provider, creating it on first use."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = MarketDataProvider()
+        return _provider
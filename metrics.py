@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Optional
+
+import numpy as np
+
+
+class MetricsRegistry:
+    """Thread-safe, process-wide counters and latency samples."""
+
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """Increment a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a sample (e.g. a latency in seconds) for a metric."""
+        with self._lock:
+            if name not in self._samples:
+                self._samples[name] = deque(maxlen=self.max_samples)
+            self._samples[name].append(value)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Record the wall-clock duration of the enclosed block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def counter(self, name: str) -> float:
+        """Return the current value of a counter (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def percentile(self, name: str, pct: float) -> Optional[float]:
+        """Return the given percentile (0-100) of a metric's samples."""
+        with self._lock:
+            samples = list(self._samples.get(name, ()))
+        if not samples:
+            return None
+        return float(np.percentile(samples, pct))
+
+    def snapshot(self) -> Dict:
+        """Return all counters and a count/mean/p50/p95/p99 summary per sampled metric."""
+        with self._lock:
+            counters = dict(self._counters)
+            samples = {name: list(values) for name, values in self._samples.items()}
+
+        summaries = {}
+        for name, values in samples.items():
+            if not values:
+                continue
+            summaries[name] = {
+                'count': len(values),
+                'mean': float(np.mean(values)),
+                'p50': float(np.percentile(values, 50)),
+                'p95': float(np.percentile(values, 95)),
+                'p99': float(np.percentile(values, 99))
+            }
+
+        return {'counters': counters, 'samples': summaries}
+
+    def reset(self) -> None:
+        """Drop all counters and samples."""
+        with self._lock:
+            self._counters.clear()
+            self._samples.clear()
+
+
+# Shared registry used by the LLM, news and report pipelines
+METRICS = MetricsRegistry()
@@ -0,0 +1,151 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from duckduckgo_service import DuckDuckGoNewsService
+from metrics import METRICS
+from news_service import BraveNewsService
+
+# Query parameters that only track the click and never change the article
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "cmpid", "ocid"}
+
+# Shared by every aggregator; a provider that misses the deadline keeps its
+# worker until it returns, so the pool is larger than the number of providers
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="news-provider")
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalise an article URL for deduplication.
+
+    Lower-cases the scheme and host, drops "www.", the fragment, a trailing
+    slash and tracking parameters (utm_* and TRACKING_PARAMS), and sorts the
+    remaining query parameters.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/")
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def merge_articles(results: Sequence[List[Dict]]) -> List[Dict]:
+    """Merge provider results in order, keeping the first article for each normalised URL."""
+    seen = set()
+    merged = []
+    for articles in results:
+        for article in articles:
+            key = normalize_url(article.get("link") or "") or article.get("title")
+            if key in seen:
+                METRICS.incr("news.duplicates")
+                continue
+            seen.add(key)
+            merged.append(article)
+    return merged
+
+
+class NewsAggregator:
+    """
+    Fan a news query out to several providers concurrently and merge the results.
+
+    Every provider gets the same deadline, counted from the start of the fetch.
+    Results that have arrived by then are merged in provider order and
+    deduplicated by normalised URL; late or failing providers are skipped, so a
+    fetch takes at most ``deadline`` seconds however many providers are
+    configured. Providers implement ``fetch_company_news(company, timeframe,
+    language, since)`` like DuckDuckGoNewsService and BraveNewsService, and
+    raise when a request fails so that a failure is told apart from no news.
+    """
+
+    def __init__(self, providers: List[Tuple[str, object]], deadline: Optional[float] = None):
+        if not providers:
+            raise ValueError("NewsAggregator needs at least one provider")
+        self.providers = providers
+        self.deadline = deadline if deadline is not None else float(os.getenv("NEWS_PROVIDER_DEADLINE", "8"))
+
+    def _fetch_one(self, name: str, provider, company: str, timeframe: str, language: str,
+                   since: Optional[datetime]) -> List[Dict]:
+        with METRICS.timer(f"news.provider.{name}"):
+            return provider.fetch_company_news(company, timeframe, language, since=since)
+
+    def fetch_company_news(self, company: str, timeframe: str, language: str = "English",
+                           since: Optional[datetime] = None) -> List[Dict]:
+        """
+        Fetch company news from every provider and merge what arrives before the deadline.
+
+        Args:
+            company (str): Company name to search for
+            timeframe (str): Timeframe for news (6 months, 1 year, 2 years, 5 years)
+            language (str): Language for news articles (default: English)
+            since (datetime, optional): Only ask providers for articles newer than this
+
+        Returns:
+            List[Dict]: Deduplicated news articles with title, description, link, and published date
+        """
+        return self.fetch_with_status(company, timeframe, language, since=since)[0]
+
+    def fetch_with_status(self, company: str, timeframe: str, language: str = "English",
+                          since: Optional[datetime] = None) -> Tuple[List[Dict], bool]:
+        """
+        Like ``fetch_company_news``, but also report whether the result is complete.
+
+        Returns:
+            Tuple[List[Dict], bool]: The merged articles, and True only if every
+            provider answered before the deadline without an error
+        """
+        futures = [
+            (name, _executor.submit(self._fetch_one, name, provider, company, timeframe, language, since))
+            for name, provider in self.providers
+        ]
+        wait([future for _, future in futures], timeout=self.deadline)
+
+        results = []
+        for name, future in futures:
+            if not future.done():
+                print(f"News provider {name} missed the {self.deadline:g}s deadline")
+                METRICS.incr(f"news.provider.{name}.timeouts")
+                continue
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"Error fetching news from {name}: {str(e)}")
+                METRICS.incr(f"news.provider.{name}.errors")
+        return merge_articles(results), len(results) == len(futures)
+
+    def format_news_for_prompt(self, news_articles: List[Dict]) -> str:
+        """Format news articles for a prompt, as the first provider does."""
+        return self.providers[0][1].format_news_for_prompt(news_articles)
+
+
+def create_news_service() -> NewsAggregator:
+    """
+    Build the news aggregator from the ``NEWS_PROVIDERS`` environment variable.
+
+    ``NEWS_PROVIDERS`` is a comma-separated list of "duckduckgo" and "brave"
+    (default: both). Brave is skipped when ``BRAVE_API_KEY`` is not set.
+    """
+    names = [name.strip().lower() for name in os.getenv("NEWS_PROVIDERS", "duckduckgo,brave").split(",") if name.strip()]
+    providers = []
+    for name in names:
+        if name == "duckduckgo":
+            providers.append((name, DuckDuckGoNewsService()))
+        elif name == "brave":
+            try:
+                providers.append((name, BraveNewsService()))
+            except ValueError as e:
+                print(f"Note: Brave news provider disabled - {str(e)}")
+        else:
+            print(f"Note: unknown news provider {name} ignored")
+    if not providers:
+        providers.append(("duckduckgo", DuckDuckGoNewsService()))
+    return NewsAggregator(providers)
@@ -0,0 +1,295 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from metrics import METRICS
+from news_aggregator import normalize_url
+
+DEFAULT_ARCHIVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "news_archive.sqlite3")
+
+# Same mapping as the news services' _get_timeframe_days
+TIMEFRAME_DAYS = {
+    "6 months": 180,
+    "1 year": 365,
+    "2 years": 730,
+    "5 years": 1825
+}
+
+
+def timeframe_days(timeframe: str) -> int:
+    """Convert a timeframe string to a number of days, defaulting to one year."""
+    return TIMEFRAME_DAYS.get(timeframe, 365)
+
+
+def published_timestamp(published: str) -> Optional[float]:
+    """Parse an ISO publication date to epoch seconds; None for missing or free-form dates like "2 days ago"."""
+    try:
+        return datetime.fromisoformat((published or "").strip().replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class NewsArchive:
+    """
+    Persistent archive of fetched news articles with a full-text index.
+
+    Articles are stored once per (company, language, normalised URL) with
+    their publication time and the time they were first seen, so every fetch
+    adds to what earlier runs collected. Timeframe queries filter on the
+    publication time, or on the first-seen time when the provider gave no
+    date. The archive also records which period it has fetched for each
+    company and language, so callers only narrow a fetch to new articles when
+    the start of the requested timeframe is already covered.
+
+    An FTS5 index over title and description lets timeframe queries also pick
+    up articles stored under another spelling of the company name. When the
+    SQLite build has no FTS5 the archive falls back to LIKE matching.
+
+    Defaults come from the ``NEWS_ARCHIVE_PATH`` and ``NEWS_ARCHIVE_DISABLED``
+    environment variables.
+    """
+
+    def __init__(self, path: Optional[str] = None, enabled: Optional[bool] = None):
+        self.path = path or os.getenv("NEWS_ARCHIVE_PATH", DEFAULT_ARCHIVE_PATH)
+        if enabled is None:
+            enabled = os.getenv("NEWS_ARCHIVE_DISABLED", "").lower() not in ("1", "true", "yes")
+        self.enabled = enabled
+        self.fts = False
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS articles (
+                        id INTEGER PRIMARY KEY,
+                        company TEXT NOT NULL,
+                        language TEXT NOT NULL,
+                        url TEXT NOT NULL,
+                        link TEXT NOT NULL,
+                        title TEXT NOT NULL,
+                        description TEXT NOT NULL,
+                        source TEXT NOT NULL,
+                        published TEXT NOT NULL,
+                        published_at REAL,
+                        published_estimated INTEGER NOT NULL DEFAULT 0,
+                        first_seen REAL NOT NULL,
+                        UNIQUE (company, language, url)
+                    )"""
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_articles_company_language ON articles (company, language)"
+                )
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS coverage (
+                        company TEXT NOT NULL,
+                        language TEXT NOT NULL,
+                        start REAL NOT NULL,
+                        end REAL NOT NULL,
+                        PRIMARY KEY (company, language)
+                    )"""
+                )
+                self.fts = self._create_fts(conn)
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection, so the archive is usable from any thread."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _create_fts(conn: sqlite3.Connection) -> bool:
+        """Create the FTS5 index and its sync triggers; returns False if FTS5 is unavailable."""
+        try:
+            conn.execute(
+                """CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                    title, description, content='articles', content_rowid='id'
+                )"""
+            )
+        except sqlite3.OperationalError:
+            return False
+        conn.execute(
+            """CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+            END"""
+        )
+        conn.execute(
+            """CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END"""
+        )
+        return True
+
+    @staticmethod
+    def _key(company: str) -> str:
+        return company.strip().lower()
+
+    def add(self, company: str, articles: List[Dict], language: str = "English") -> int:
+        """
+        Store articles for a company, keeping the first-seen time of ones already archived.
+
+        Estimated publication dates (``published_estimated``, the fetch time
+        DuckDuckGo reports) are kept for display but not used as publication times.
+
+        Returns:
+            int: Number of articles that were new
+        """
+        if not self.enabled or not articles:
+            return 0
+
+        now = time.time()
+        rows = []
+        for article in articles:
+            published = article.get("published") or ""
+            estimated = bool(article.get("published_estimated"))
+            rows.append((
+                self._key(company),
+                language,
+                normalize_url(article.get("link") or "") or article.get("title") or "",
+                article.get("link") or "",
+                article.get("title") or "",
+                article.get("description") or "",
+                article.get("source") or "",
+                published,
+                None if estimated else published_timestamp(published),
+                int(estimated),
+                now
+            ))
+        with self._lock, self._connect() as conn:
+            # rowcount leaves out the rows the FTS triggers write
+            added = conn.executemany(
+                """INSERT OR IGNORE INTO articles
+                   (company, language, url, link, title, description, source, published,
+                    published_at, published_estimated, first_seen)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                rows
+            ).rowcount
+        METRICS.incr("news.archive.added", added)
+        return added
+
+    def coverage(self, company: str, language: str = "English") -> Optional[Tuple[float, float]]:
+        """Return the (start, end) epoch seconds of the period fetched for a company, or None."""
+        if not self.enabled:
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT start, end FROM coverage WHERE company = ? AND language = ?",
+                (self._key(company), language)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def mark_covered(self, company: str, start: float, end: float, language: str = "English") -> None:
+        """
+        Record that the articles of a company published between start and end were fetched.
+
+        A period that overlaps the recorded one extends it; a disjoint one
+        replaces it, since the archive only tracks a single contiguous period.
+        """
+        if not self.enabled:
+            return
+        key = (self._key(company), language)
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT start, end FROM coverage WHERE company = ? AND language = ?", key).fetchone()
+            if row and start <= row[1] and end >= row[0]:
+                start, end = min(start, row[0]), max(end, row[1])
+            conn.execute(
+                "INSERT OR REPLACE INTO coverage (company, language, start, end) VALUES (?, ?, ?, ?)",
+                key + (start, end)
+            )
+
+    def query(self, company: str, timeframe: str, language: str = "English", limit: int = 500) -> List[Dict]:
+        """
+        Return the archived articles for a company published within a timeframe, newest first.
+
+        Articles archived under the company's key are combined with full-text
+        matches of the company name in any archived article of the same
+        language. Articles without a known publication date are dated by when
+        they were first seen.
+
+        Args:
+            company (str): Company name
+            timeframe (str): Timeframe, as mapped by timeframe_days
+            language (str): Language the articles were fetched in
+            limit (int): Maximum number of articles
+
+        Returns:
+            List[Dict]: Articles with title, description, link, published date and source
+        """
+        if not self.enabled:
+            return []
+
+        since = time.time() - timeframe_days(timeframe) * 86400
+        columns = "a.link, a.title, a.description, a.source, a.published, a.published_estimated"
+        dated = "COALESCE(a.published_at, a.first_seen)"
+        with self._connect() as conn:
+            if self.fts:
+                phrase = '"' + company.replace('"', '""') + '"'
+                rows = conn.execute(
+                    f"""SELECT {columns} FROM articles a WHERE {dated} >= ? AND a.language = ? AND (
+                            a.company = ? OR a.id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)
+                        )
+                        ORDER BY {dated} DESC LIMIT ?""",
+                    (since, language, self._key(company), phrase, limit * 2)
+                ).fetchall()
+            else:
+                pattern = f"%{company}%"
+                rows = conn.execute(
+                    f"""SELECT {columns} FROM articles a WHERE {dated} >= ? AND a.language = ? AND (
+                            a.company = ? OR a.title LIKE ? OR a.description LIKE ?
+                        )
+                        ORDER BY {dated} DESC LIMIT ?""",
+                    (since, language, self._key(company), pattern, pattern, limit * 2)
+                ).fetchall()
+
+        # The same URL can be archived under several company keys
+        articles = []
+        seen = set()
+        for link, title, description, source, published, estimated in rows:
+            key = normalize_url(link) or title
+            if key in seen:
+                continue
+            seen.add(key)
+            article = {
+                "title": title,
+                "description": description,
+                "link": link,
+                "published": published,
+                "source": source
+            }
+            if estimated:
+                article["published_estimated"] = True
+            articles.append(article)
+        return articles[:limit]
+
+    def stats(self) -> Dict:
+        """Return the number of archived articles and companies."""
+        articles, companies = 0, 0
+        if self.enabled:
+            with self._connect() as conn:
+                articles, companies = conn.execute("SELECT COUNT(*), COUNT(DISTINCT company) FROM articles").fetchone()
+        return {'articles': articles, 'companies': companies, 'fts': self.fts}
+
+
+_archive: Optional[NewsArchive] = None
+_archive_lock = threading.Lock()
+
+
+def get_news_archive() -> NewsArchive:
+    """Return the process-wide news archive, creating it on first use."""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = NewsArchive()
+        return _archive
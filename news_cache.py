@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from metrics import METRICS
+
+
+class _Flight:
+    """A fetch in progress that concurrent callers for the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[List[Dict]] = None
+        self.error: Optional[BaseException] = None
+
+
+class NewsCache:
+    """
+    In-memory cache of fetched news articles with a TTL and request coalescing.
+
+    Entries are keyed by (company, timeframe, language). When several threads
+    ask for a key that is not cached, only the first one calls the fetch
+    function; the others wait for its result ("single flight"), so a burst of
+    report pipelines for one company triggers a single outbound request.
+
+    Empty results are not cached, so a failed fetch is retried on the next call.
+    The TTL defaults to the ``NEWS_CACHE_TTL`` environment variable (seconds).
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl if ttl is not None else float(os.getenv("NEWS_CACHE_TTL", "900"))
+        self._entries: Dict[Hashable, Tuple[float, List[Dict]]] = {}
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], List[Dict]], refresh: bool = False) -> List[Dict]:
+        """
+        Return the cached articles for a key, fetching them once if missing or expired.
+
+        Args:
+            key (Hashable): Cache key, e.g. (company, timeframe, language)
+            fetch (Callable): Function returning the articles on a miss
+            refresh (bool): Ignore a cached entry (a fetch already in flight is still shared)
+
+        Returns:
+            List[Dict]: News articles
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not refresh and entry[0] > now:
+                METRICS.incr("news.cache.hits")
+                return list(entry[1])
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            METRICS.incr("news.cache.coalesced")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return list(flight.result)
+
+        METRICS.incr("news.cache.misses")
+        try:
+            flight.result = fetch()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None and flight.result:
+                    self._entries[key] = (time.monotonic() + self.ttl, flight.result)
+                del self._flights[key]
+            flight.done.set()
+        return list(flight.result)
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: Optional[NewsCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_news_cache() -> NewsCache:
+    """Return the process-wide news cache, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = NewsCache()
+        return _cache
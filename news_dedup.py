@@ -0,0 +1,141 @@
+"""
+Near-duplicate collapsing of news articles with MinHash shingles.
+
+Every article is reduced to the set of word 3-shingles of its title and
+description. Two articles are near-duplicates (syndicated copies, DuckDuckGo
+RelatedTopics entries repeating the same text) when the Jaccard similarity of
+their shingle sets reaches ``threshold``.
+
+Candidate pairs come from locality-sensitive hashing: each article gets a
+MinHash signature of NUM_BANDS x ROWS_PER_BAND values, and only articles that
+agree on every value of at least one band are compared. Each article is
+looked up in a constant number of buckets, so the pass is linear in the
+number of articles rather than comparing every pair.
+"""
+import hashlib
+import re
+from collections import defaultdict
+from typing import Dict, List, Set
+
+import numpy as np
+
+from metrics import METRICS
+from token_budget import estimate_tokens
+
+SHINGLE_SIZE = 3
+NUM_BANDS = 20
+ROWS_PER_BAND = 3
+
+# Universal hash functions h(x) = (a * x + b) mod p standing in for random permutations
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, _MERSENNE_PRIME, size=NUM_BANDS * ROWS_PER_BAND, dtype=np.int64).astype(np.uint64)
+_PERM_B = _rng.randint(0, _MERSENNE_PRIME, size=NUM_BANDS * ROWS_PER_BAND, dtype=np.int64).astype(np.uint64)
+
+_WORD = re.compile(r'\w+', flags=re.UNICODE)
+
+
+def _article_text(article: Dict) -> str:
+    return f"{article.get('title') or ''} {article.get('description') or ''}"
+
+
+def shingles(text: str) -> Set[str]:
+    """Return the word shingles of a text, lower-cased."""
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set: Set[str]) -> np.ndarray:
+    """Return the MinHash signature of a shingle set."""
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "big") for s in shingle_set],
+        dtype=np.uint64
+    )
+    # a * x wraps around in uint64, which still mixes the bits well enough for MinHash
+    with np.errstate(over="ignore"):
+        permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % np.uint64(_MERSENNE_PRIME)
+    return (permuted & np.uint64(0xFFFFFFFF)).min(axis=0)
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Jaccard similarity of two sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def cluster_near_duplicates(articles: List[Dict], threshold: float = 0.6) -> List[List[int]]:
+    """
+    Group articles into clusters of near-duplicates.
+
+    Args:
+        articles (List[Dict]): Articles with title and description
+        threshold (float): Shingle Jaccard similarity at which two articles are duplicates
+
+    Returns:
+        List[List[int]]: Article indices per cluster, ordered by first occurrence
+    """
+    shingle_sets = [shingles(_article_text(article)) for article in articles]
+    parent = list(range(len(articles)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets = defaultdict(list)
+    for i, shingle_set in enumerate(shingle_sets):
+        signature = minhash(shingle_set)
+        keys = [
+            (band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes())
+            for band in range(NUM_BANDS)
+        ]
+        for key in keys:
+            for j in buckets[key]:
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j and jaccard(shingle_set, shingle_sets[j]) >= threshold:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+        # Only cluster representatives go into the buckets, so many copies of one
+        # story do not make every later lookup scan all of them
+        if find(i) == i:
+            for key in keys:
+                buckets[key].append(i)
+
+    clusters = defaultdict(list)
+    for i in range(len(articles)):
+        clusters[find(i)].append(i)
+    return sorted(clusters.values(), key=lambda cluster: cluster[0])
+
+
+def dedupe_articles(articles: List[Dict], threshold: float = 0.6) -> List[Dict]:
+    """
+    Keep one article per near-duplicate cluster.
+
+    The first article of each cluster (provider order) is kept. The number of
+    dropped articles and the prompt tokens they would have used are recorded
+    as ``news.dedup.dropped`` and ``news.dedup.tokens_saved``.
+
+    Args:
+        articles (List[Dict]): Articles with title, description and link
+        threshold (float): Shingle Jaccard similarity at which two articles are duplicates
+
+    Returns:
+        List[Dict]: Deduplicated articles in their original order
+    """
+    if len(articles) < 2:
+        return list(articles)
+
+    kept = []
+    dropped_tokens = 0
+    for cluster in cluster_near_duplicates(articles, threshold):
+        kept.append(articles[cluster[0]])
+        for i in cluster[1:]:
+            dropped_tokens += estimate_tokens(f"{_article_text(articles[i])} {articles[i].get('link') or ''}")
+
+    METRICS.incr("news.dedup.articles", len(articles))
+    METRICS.incr("news.dedup.dropped", len(articles) - len(kept))
+    METRICS.incr("news.dedup.tokens_saved", dropped_tokens)
+    return kept
@@ -0,0 +1,120 @@
+"""
+Compact rendering of news articles for the report prompts.
+
+The full format spends six labelled lines and a separator on every article,
+plus the full URL and an ISO timestamp. The compact format puts each article
+on one row of a ``|``-separated table:
+
+    Recent News Articles (#|age|source|headline: summary):
+    1|3d|s1|Apple beats estimates: Revenue rose 8% on services growth
+    2|-|reuters.com|...
+    Sources: s1=bloomberg.com
+
+Rows are numbered; the number is the article's reference id, in place of its
+URL. Sources named by more than one article get a short id listed once in the
+legend. Dates are shown as their age (``today``, ``3d``, ``5w``, ``4mo``,
+``2y``), and ``-`` when the date is unknown or only the time of the fetch. A
+summary that repeats the headline is not repeated.
+
+The format is chosen with the ``NEWS_FORMAT`` environment variable ("full",
+the default, or "compact").
+"""
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+NEWS_FORMATS = ("full", "compact")
+
+
+def news_format() -> str:
+    """Return the configured news format, "full" or "compact"."""
+    value = os.getenv("NEWS_FORMAT", "full").strip().lower()
+    return value if value in NEWS_FORMATS else "full"
+
+
+def relative_date(published: str, now: Optional[datetime] = None) -> str:
+    """
+    Render a publication date as its age, e.g. "3d" or "4mo".
+
+    Args:
+        published (str): ISO date or timestamp; other strings are kept as they are
+        now (datetime, optional): Reference time (default: now)
+
+    Returns:
+        str: Age of the date, "-" if there is no date
+    """
+    published = (published or "").strip()
+    if not published:
+        return "-"
+    try:
+        date = datetime.fromisoformat(published.replace("Z", "+00:00"))
+    except ValueError:
+        # Provider-formatted dates such as "2 days ago"
+        return _cell(published[:20])
+
+    now = now or datetime.now(date.tzinfo)
+    if (now.tzinfo is None) != (date.tzinfo is None):
+        date = date.replace(tzinfo=now.tzinfo)
+    days = (now - date).days
+    if days < 1:
+        return "today"
+    if days < 14:
+        return f"{days}d"
+    if days < 60:
+        return f"{days // 7}w"
+    if days < 730:
+        return f"{days // 30}mo"
+    return f"{days // 365}y"
+
+
+def _cell(text: str) -> str:
+    """Make text safe for one table cell."""
+    return " ".join(text.replace("|", "/").split())
+
+
+def _source(article: Dict) -> str:
+    source = _cell(article.get("source") or "")
+    return source[4:] if source.startswith("www.") else source
+
+
+def _headline(article: Dict) -> str:
+    title = _cell(article.get("title") or "")
+    description = _cell(article.get("description") or "")
+    if not description or description == title:
+        return title
+    # DuckDuckGo titles are the start of the description
+    if description.startswith(title.rstrip(".…")):
+        return description
+    return f"{title}: {description}" if title else description
+
+
+def format_news_compact(news_articles: List[Dict], now: Optional[datetime] = None) -> str:
+    """
+    Format news articles as a compact, numbered table.
+
+    Args:
+        news_articles (List[Dict]): List of news articles
+        now (datetime, optional): Reference time for the article ages (default: now)
+
+    Returns:
+        str: Formatted news summary
+    """
+    if not news_articles:
+        return "No recent news articles found."
+
+    sources = [_source(article) for article in news_articles]
+    source_counts: Dict[str, int] = {}
+    for source in sources:
+        source_counts[source] = source_counts.get(source, 0) + 1
+
+    source_ids: Dict[str, str] = {}
+    lines = ["Recent News Articles (#|age|source|headline: summary):"]
+    for number, (article, source) in enumerate(zip(news_articles, sources), 1):
+        if source and source_counts[source] > 1:
+            source = source_ids.setdefault(source, f"s{len(source_ids) + 1}")
+        age = "-" if article.get("published_estimated") else relative_date(article.get("published") or "", now)
+        lines.append(f"{number}|{age}|{source or '-'}|{_headline(article)}")
+
+    if source_ids:
+        lines.append("Sources: " + " ".join(f"{source_id}={source}" for source, source_id in source_ids.items()))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,126 @@
+"""
+Relevance-ranked, token-budgeted news context for the report prompts.
+
+Articles are scored with BM25 against a query built from the company, the
+industry and terms describing the report type, then packed greedily, most
+relevant first, into a token budget. An article that does not fit whole is
+included with a truncated description when enough budget is left for it to
+be useful. The packed articles are rendered with the news service's own
+format_news_for_prompt.
+"""
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+from metrics import METRICS
+from token_budget import estimate_tokens
+
+# Terms describing what each report looks for in the news
+REPORT_TERMS = {
+    "market_trends": "market trend industry sector competition competitor share demand growth consumer regulation",
+    "financial_projections": "revenue earnings profit margin guidance forecast outlook quarter cash flow sales results",
+    "investment_recommendations": "stock shares investors valuation analyst rating upgrade downgrade target price dividend risk"
+}
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Smallest budget worth spending on a truncated article
+MIN_ARTICLE_TOKENS = 60
+
+_WORD = re.compile(r'\w+', flags=re.UNICODE)
+
+
+def _terms(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def bm25_scores(documents: List[str], query: str) -> List[float]:
+    """
+    Score documents against a query with Okapi BM25.
+
+    Inverse document frequencies come from the documents themselves, so the
+    scores rank one fetched article set rather than an external corpus.
+    """
+    tokenized = [_terms(document) for document in documents]
+    if not tokenized:
+        return []
+    average_length = sum(len(tokens) for tokens in tokenized) / len(tokenized) or 1.0
+    document_frequency = Counter(term for tokens in tokenized for term in set(tokens))
+    query_terms = Counter(_terms(query))
+
+    scores = []
+    for tokens in tokenized:
+        frequencies = Counter(tokens)
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / average_length)
+        score = 0.0
+        for term, query_weight in query_terms.items():
+            frequency = frequencies.get(term)
+            if not frequency:
+                continue
+            idf = math.log(1 + (len(tokenized) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            score += query_weight * idf * frequency * (BM25_K1 + 1) / (frequency + length_norm)
+        scores.append(score)
+    return scores
+
+
+def _truncate_article(article: Dict, news_service, budget: int) -> Optional[Dict]:
+    """Return a copy of the article with its description cut to fit the budget, or None."""
+    fixed = estimate_tokens(news_service.format_news_for_prompt([dict(article, description="")]))
+    description = article.get("description") or ""
+    allowed = budget - fixed
+    description_tokens = estimate_tokens(description)
+    if allowed <= 0 or not description_tokens:
+        return None
+    cut = description[:int(len(description) * allowed / description_tokens)].rsplit(" ", 1)[0]
+    return dict(article, description=cut.rstrip(" ,.;:") + "…") if cut else None
+
+
+def pack_news_context(news_service, news_articles: List[Dict], company: str, report_type: str,
+                      industry: str = "", token_budget: Optional[int] = None) -> str:
+    """
+    Build the news block for one report from the most relevant articles that fit a token budget.
+
+    Args:
+        news_service: Service whose format_news_for_prompt renders the articles
+        news_articles (List[Dict]): Fetched articles
+        company (str): Company name
+        report_type (str): Key in REPORT_TERMS, e.g. "market_trends"
+        industry (str): Industry, if the report uses one
+        token_budget (int, optional): Token budget for the block (default: NEWS_CONTEXT_TOKENS or 1500)
+
+    Returns:
+        str: Formatted news block
+    """
+    if token_budget is None:
+        token_budget = int(os.getenv("NEWS_CONTEXT_TOKENS", "1500"))
+    if not news_articles:
+        return news_service.format_news_for_prompt([])
+
+    # The company is the most important signal, so its terms count twice
+    query = f"{company} {company} {industry} {REPORT_TERMS.get(report_type, '')}"
+    scores = bm25_scores([f"{a.get('title') or ''} {a.get('description') or ''}" for a in news_articles], query)
+    ranked = sorted(range(len(news_articles)), key=lambda i: -scores[i])
+
+    packed = []
+    remaining = token_budget
+    for i in ranked:
+        article = news_articles[i]
+        cost = estimate_tokens(news_service.format_news_for_prompt([article]))
+        if cost > remaining:
+            if remaining < MIN_ARTICLE_TOKENS:
+                continue
+            article = _truncate_article(article, news_service, remaining)
+            if article is None:
+                continue
+            METRICS.incr("news.packing.truncated")
+            cost = estimate_tokens(news_service.format_news_for_prompt([article]))
+        packed.append(article)
+        remaining -= cost
+
+    METRICS.incr("news.packing.articles", len(packed))
+    METRICS.incr("news.packing.dropped", len(news_articles) - len(packed))
+    METRICS.observe(f"news.packing.tokens.{report_type}", token_budget - remaining)
+    return news_service.format_news_for_prompt(packed)
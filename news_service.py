@@ -3,12 +3,16 @@ import requests
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
+from http_transport import get_http_transport
+from news_format import format_news_compact, news_format
+from rate_limiter import get_rate_limiter
+
 class BraveNewsService:
     def __init__(self):
         self.api_key = os.getenv("BRAVE_API_KEY")
         if not self.api_key:
             raise ValueError("BRAVE_API_KEY environment variable is not set")
-        self.base_url = "https://api.search.brave.com/res/v1/web/search"
+        self.base_url = os.getenv("BRAVE_BASE_URL", "https://api.search.brave.com/res/v1/web/search")
 
     def _get_timeframe_days(self, timeframe: str) -> int:
         """Convert timeframe string to number of days."""
@@ -20,7 +24,8 @@ class BraveNewsService:
         }
         return timeframe_map.get(timeframe, 365)  # Default to 1 year if timeframe not found
 
-    def fetch_company_news(self, company: str, timeframe: str, language: str = "English") -> List[Dict]:
+    def fetch_company_news(self, company: str, timeframe: str, language: str = "English",
+                           since: Optional[datetime] = None) -> List[Dict]:
         """
         Fetch company news using Brave Search API.
         
@@ -28,6 +33,7 @@ class BraveNewsService:
             company (str): Company name to search for
             timeframe (str): Timeframe for news (6 months, 1 year, 2 years, 5 years)
             language (str): Language for news articles (default: English)
+            since (datetime, optional): Only return articles newer than this
             
         Returns:
             List[Dict]: List of news articles with title, description, link, and published date
@@ -37,6 +43,10 @@ class BraveNewsService:
             days = self._get_timeframe_days(timeframe)
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
+            freshness = "d" + str(days)
+            if since is not None and since > start_date:
+                # Incremental fetch: only ask for what is newer than the archive
+                freshness = f"{since:%Y-%m-%d}to{end_date:%Y-%m-%d}"
 
             # Prepare search query
             query = f"{company} company news"
@@ -52,12 +62,15 @@ class BraveNewsService:
                 "q": query,
                 "count": 10,  # Number of results to return
                 "search_lang": language,
-                "freshness": "d" + str(days),  # Filter by freshness in days
+                "freshness": freshness,  # Filter by freshness in days or by date range
                 "text_format": "plain"  # Get plain text for better processing
             }
 
-            # Make API request
-            response = requests.get(
+            # Wait only if this process (or, with RATE_LIMIT_DB, any worker) is over the rate limit
+            get_rate_limiter("brave").acquire()
+
+            # Make API request over the shared keep-alive session
+            response = get_http_transport().get(
                 self.base_url,
                 headers=headers,
                 params=params
@@ -83,7 +96,7 @@ class BraveNewsService:
 
         except requests.exceptions.RequestException as e:
             print(f"Error fetching news from Brave Search: {str(e)}")
-            return []
+            raise
 
     def format_news_for_prompt(self, news_articles: List[Dict]) -> str:
         """
@@ -95,16 +108,20 @@ class BraveNewsService:
         Returns:
             str: Formatted news summary
         """
+        if news_format() == "compact":
+            return format_news_compact(news_articles)
         if not news_articles:
             return "No recent news articles found."
 
-        formatted_news = "Recent News Articles:\n\n"
+        parts = ["Recent News Articles:\n\n"]
         for article in news_articles:
-            formatted_news += f"Title: {article['title']}\n"
-            formatted_news += f"Source: {article['source']}\n"
-            formatted_news += f"Date: {article['published']}\n"
-            formatted_news += f"Summary: {article['description']}\n"
-            formatted_news += f"Link: {article['link']}\n"
-            formatted_news += "-" * 80 + "\n"
+            parts.append(
+                f"Title: {article['title']}\n"
+                f"Source: {article['source']}\n"
+                f"Date: {article['published']}\n"
+                f"Summary: {article['description']}\n"
+                f"Link: {article['link']}\n"
+                + "-" * 80 + "\n"
+            )
 
-        return formatted_news 
\ No newline at end of file
+        return "".join(parts) 
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+Stock metrics for many tickers at once over a wide price panel.
+
+``calculate_panel_metrics`` takes closing prices as a dates x tickers array
+and computes, for every column in one vectorized pass, the metrics
+``utils.calculate_stock_metrics`` computes for a single series: annualised
+volatility, SMA-50, SMA-200 and the 14-period RSI.
+
+Histories may be ragged: a ticker that listed later, was delisted or did not
+trade on some dates has NaN there. Each column gets the metrics of its
+non-NaN prices, exactly as if that series had been passed to
+``calculate_stock_metrics`` on its own. To do that without a Python loop,
+every column's valid prices are first moved to the bottom of the panel in
+their original order, so "the last 50 prices" is the same row slice for all
+tickers.
+"""
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+METRIC_COLUMNS = ["volatility", "sma_50", "sma_200", "rsi"]
+
+RSI_PERIOD = 14
+
+
+def align_bottom(values: np.ndarray) -> np.ndarray:
+    """
+    Move every column's non-NaN values to the bottom rows, keeping their order.
+
+    Args:
+        values (np.ndarray): 2-D array, rows are dates and columns tickers
+
+    Returns:
+        np.ndarray: Array of the same shape with NaN padding at the top of each column
+    """
+    # A stable sort on "is valid" puts the NaNs first and keeps the valid values in order
+    order = np.argsort(~np.isnan(values), axis=0, kind="stable")
+    return np.take_along_axis(values, order, axis=0)
+
+
+def calculate_panel_metrics(prices: Union[pd.DataFrame, np.ndarray],
+                            tickers: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Calculate volatility, SMA-50, SMA-200 and RSI for every ticker of a price panel.
+
+    Results match ``calculate_stock_metrics`` on each ticker's own non-NaN
+    closing prices, including its defaults: 0.0 for a moving average without
+    enough history and 50.0 for an undefined RSI.
+
+    Args:
+        prices (Union[pd.DataFrame, np.ndarray]): Closing prices, dates x tickers, oldest first
+        tickers (Sequence[str], optional): Column names when ``prices`` is an array
+
+    Returns:
+        pd.DataFrame: One row per ticker with the columns of METRIC_COLUMNS
+    """
+    if isinstance(prices, pd.DataFrame):
+        tickers = list(prices.columns) if tickers is None else list(tickers)
+        values = prices.to_numpy(dtype="float64")
+    else:
+        values = np.asarray(prices, dtype="float64")
+        if values.ndim == 1:
+            values = values[:, np.newaxis]
+        tickers = list(range(values.shape[1])) if tickers is None else list(tickers)
+
+    rows, columns = values.shape
+    packed = align_bottom(values)
+    lengths = (~np.isnan(values)).sum(axis=0)
+
+    metrics = pd.DataFrame(
+        {"volatility": 0.0, "sma_50": 0.0, "sma_200": 0.0, "rsi": 50.0},
+        index=pd.Index(tickers, name="ticker"),
+        columns=METRIC_COLUMNS
+    )
+    if rows == 0 or columns == 0:
+        return metrics
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Volatility: sample standard deviation of the daily returns (NaN with fewer than two)
+        returns = packed[1:] / packed[:-1] - 1
+        return_counts = (~np.isnan(returns)).sum(axis=0)
+        volatility = np.full(columns, np.nan)
+        enough = return_counts >= 2
+        if enough.any():
+            volatility[enough] = np.nanstd(returns[:, enough], axis=0, ddof=1) * np.sqrt(252)
+        metrics["volatility"] = np.where(lengths > 0, volatility, 0.0)
+
+        # Moving averages over the last prices of each column
+        for window, name in ((50, "sma_50"), (200, "sma_200")):
+            if rows >= window:
+                means = packed[-window:].mean(axis=0)
+                metrics[name] = np.where(lengths >= window, means, 0.0)
+
+        # RSI: simple averages of the last RSI_PERIOD gains and losses. As with
+        # Series.where in the single-series version, an undefined first
+        # difference counts as no gain and no loss.
+        if rows >= RSI_PERIOD:
+            delta = np.diff(packed[-(RSI_PERIOD + 1):], axis=0, prepend=np.nan)[-RSI_PERIOD:]
+            gain = np.where(delta > 0, delta, 0.0).mean(axis=0)
+            loss = np.where(delta < 0, -delta, 0.0).mean(axis=0)
+            rs = gain / loss
+            rsi = 100 - 100 / (1 + rs)
+            metrics["rsi"] = np.where((lengths >= RSI_PERIOD) & ~np.isnan(rs), rsi, 50.0)
+
+    return metrics
@@ -0,0 +1,68 @@
+"""
+Prompt assembly laid out for provider-side prefix (KV) caching.
+
+The report templates in translated_prompts start with a [CONTEXT] block of
+per-request fields (company, timeframe, news) followed by long static
+instructions. Providers can only reuse cached attention state for an
+identical prompt prefix, so putting the variable fields first means nothing
+after the system prompt is ever reused. build_report_prompt reorders each
+template into:
+
+    system context        (system message, fixed per language)
+    static instructions   (fixed per language and report type)
+    news block            (packed per report, see news_packing)
+    context fields        (small per-report suffix)
+
+Every report gets its own relevance-ranked news block, so nothing after the
+system context is shared within a bundle; the instructions come first so
+that each report type reuses its cached prefix across bundles.
+"""
+import re
+from functools import lru_cache
+from typing import Tuple
+
+from translated_prompts import LANGUAGES
+
+# "<label>:\n{news_context}" lines inside a template's [CONTEXT] block
+_NEWS_PLACEHOLDER = re.compile(r'\n*[^\n]*\n\{news_context\}')
+
+# Blank line before the next bracketed section header, e.g. "\n\n[TASK]"
+_SECTION_BREAK = "\n\n["
+
+
+@lru_cache(maxsize=None)
+def split_template(language: str, report_type: str) -> Tuple[str, str]:
+    """
+    Split a report template into its per-request context block and its static instructions.
+
+    Args:
+        language (str): Language key in LANGUAGES
+        report_type (str): Template key, e.g. "market_trends"
+
+    Returns:
+        Tuple[str, str]: Context block (still containing format fields) and static instructions
+    """
+    template = _NEWS_PLACEHOLDER.sub("", LANGUAGES[language][report_type])
+    index = template.find(_SECTION_BREAK)
+    if index == -1:
+        return template.strip(), ""
+    return template[:index].strip(), template[index + 2:].strip()
+
+
+def build_report_prompt(language: str, report_type: str, news_context: str, **fields) -> str:
+    """
+    Build a report prompt with the static instructions first and the variable fields last.
+
+    Args:
+        language (str): Language key in LANGUAGES
+        report_type (str): Template key, e.g. "market_trends"
+        news_context (str): Formatted news block for this report
+        **fields: Values for the template's context fields
+
+    Returns:
+        str: User prompt text
+    """
+    context_block, instructions = split_template(language, report_type)
+    news_block = f"{LANGUAGES[language]['news_context_label']}\n{news_context}"
+    parts = [instructions, news_block, context_block.format(**fields)]
+    return "\n\n".join(part for part in parts if part)
@@ -0,0 +1,122 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from metrics import METRICS
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter.
+
+    The bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per
+    second. ``acquire`` takes a token and only sleeps when the bucket is empty,
+    i.e. when callers are actually going faster than the configured rate.
+    Tokens are reserved before sleeping, so concurrent callers queue up in
+    order instead of all waking at once.
+
+    With ``db_path`` the bucket state lives in a SQLite file, so every process
+    using the same file shares one limit (e.g. several Streamlit or batch
+    workers). Without it the bucket is local to the process.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float = 1.0, db_path: Optional[str] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.name = name
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS buckets (
+                        name TEXT PRIMARY KEY,
+                        tokens REAL NOT NULL,
+                        updated REAL NOT NULL
+                    )"""
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode, so _reserve_shared controls the transaction with BEGIN IMMEDIATE
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _take(self, tokens: float, available: float, elapsed: float):
+        """Refill, then take tokens; returns (tokens left, seconds to wait for them)."""
+        available = min(self.burst, available + elapsed * self.rate) - tokens
+        wait = -available / self.rate if available < 0 else 0.0
+        return available, wait
+
+    def _reserve_local(self, tokens: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens, wait = self._take(tokens, self._tokens, now - self._updated)
+            self._updated = now
+        return wait
+
+    def _reserve_shared(self, tokens: float) -> float:
+        # Wall-clock time, since monotonic clocks are not comparable across processes
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)).fetchone()
+            available, updated = row if row is not None else (self.burst, now)
+            available, wait = self._take(tokens, available, max(0.0, now - updated))
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                (self.name, available, now)
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return wait
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, sleeping only if the rate is exceeded.
+
+        Args:
+            tokens (float): Number of tokens to take (default: one request)
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        wait = self._reserve_shared(tokens) if self.db_path else self._reserve_local(tokens)
+        if wait > 0:
+            METRICS.incr(f"ratelimit.{self.name}.delayed")
+            METRICS.observe(f"ratelimit.{self.name}.wait", wait)
+            time.sleep(wait)
+        return wait
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str) -> TokenBucket:
+    """
+    Return the process-wide rate limiter for a provider, creating it on first use.
+
+    The rate comes from ``<NAME>_RATE_LIMIT`` (requests per second, default
+    ``NEWS_RATE_LIMIT`` or 1) and ``<NAME>_RATE_BURST`` (default
+    ``NEWS_RATE_BURST`` or 2), e.g. ``DUCKDUCKGO_RATE_LIMIT``. Setting
+    ``RATE_LIMIT_DB`` to a SQLite file path shares the limits across processes.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            prefix = name.upper()
+            rate = float(os.getenv(f"{prefix}_RATE_LIMIT", os.getenv("NEWS_RATE_LIMIT", "1")))
+            burst = float(os.getenv(f"{prefix}_RATE_BURST", os.getenv("NEWS_RATE_BURST", "2")))
+            limiter = _limiters[name] = TokenBucket(name, rate, burst, db_path=os.getenv("RATE_LIMIT_DB") or None)
+        return limiter
@@ -0,0 +1,462 @@
+"""
+Local stand-in for the Together AI, DuckDuckGo and Brave Search APIs.
+
+Used by the benchmarks and for offline runs of the whole pipeline, exercising
+the real OpenAI SDK and news service code paths without network access or
+API costs:
+
+    with StandInServer(latency=0.05) as server:
+        client = openai.OpenAI(api_key="test", base_url=server.base_url)
+
+The server answers with synthetic responses by default. With a cassette it
+can instead record the real APIs' responses (``mode="record"``, forwarding
+every request upstream) and replay them later (``mode="replay"``), so runs
+are deterministic. Latency, streaming speed, ``finish_reason`` and injected
+errors are configurable.
+
+Run it as a process and point the app at it through the environment:
+
+    python standin_server.py --port 8900 --latency 0.2 --error-rate 0.05
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+DEFAULT_REPLY = "<think>Reasoning about the request.</think>Stand-in analysis report."
+
+# Real endpoints, used when recording
+UPSTREAMS = {
+    "together": "https://api.together.xyz/v1",
+    "duckduckgo": "https://api.duckduckgo.com/",
+    "brave": "https://api.search.brave.com/res/v1/web/search"
+}
+
+# Request headers passed on to the real APIs when recording
+FORWARDED_HEADERS = ["Authorization", "X-Subscription-Token", "Accept", "Content-Type", "User-Agent"]
+
+MODES = ("synthetic", "record", "replay")
+
+# ISO dates and timestamps, e.g. fetch-time "published" fields that end up in
+# prompts and Brave's freshness range; they change between runs
+VOLATILE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?")
+
+
+class StandInServer:
+    """
+    Threaded HTTP server that mimics the APIs the pipeline talks to.
+
+    Routes:
+        ``POST /v1/chat/completions``: Together AI chat completions, plain or streamed
+        ``GET /duckduckgo/``: DuckDuckGo Instant Answer API
+        ``GET /brave/res/v1/web/search``: Brave web search API
+
+    Args:
+        host (str): Interface to bind (default: 127.0.0.1)
+        port (int): Port to bind; 0 picks a free port
+        latency (float): Artificial delay in seconds before each response
+        reply (str): Assistant message content returned for every request
+        chunk_size (int): Characters per chunk for streamed responses
+        chunk_delay (float): Artificial delay in seconds between streamed chunks
+        prefill_per_token (float): Simulated prompt processing time per uncached prompt token
+        finish_reason (str): ``finish_reason`` of synthetic completions, e.g. "stop" or "length"
+        news_articles (int): Articles in synthetic news responses
+        error_rate (float): Fraction of requests answered with ``error_status`` instead
+        error_status (int): HTTP status of injected errors
+        seed (int, optional): Seed for error injection, for repeatable runs
+        cassette (str, optional): JSONL file of recorded responses
+        mode (str): "synthetic", "record" or "replay"
+
+    Prompt processing is simulated with a provider-style prefix cache: the part
+    of a prompt that matches the start of an earlier prompt is "cached" and
+    costs no prefill time. Totals are kept in ``prompt_tokens_total`` and
+    ``cached_tokens_total``.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, reply: str = DEFAULT_REPLY,
+                 chunk_size: int = 8, chunk_delay: float = 0.0, prefill_per_token: float = 0.0,
+                 finish_reason: str = "stop", news_articles: int = 10, error_rate: float = 0.0,
+                 error_status: int = 503, seed: Optional[int] = None, cassette: Optional[str] = None,
+                 mode: str = "synthetic"):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        if mode != "synthetic" and not cassette:
+            raise ValueError(f"mode {mode!r} needs a cassette file")
+        self.latency = latency
+        self.reply = reply
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.prefill_per_token = prefill_per_token
+        self.finish_reason = finish_reason
+        self.news_articles = news_articles
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.cassette = cassette
+        self.mode = mode
+        self.requests_served = 0
+        self.errors_injected = 0
+        self.prompt_tokens_total = 0
+        self.cached_tokens_total = 0
+        self._seen_prompts: List[str] = []
+        self._random = random.Random(seed)
+        self._recordings: Dict[str, Dict] = self._load_cassette() if mode == "replay" else {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def root_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to pass to ``openai.OpenAI(base_url=...)``."""
+        return f"{self.root_url}/v1"
+
+    @property
+    def duckduckgo_url(self) -> str:
+        """Replacement for the DuckDuckGo API URL."""
+        return f"{self.root_url}/duckduckgo/"
+
+    @property
+    def brave_url(self) -> str:
+        """Replacement for the Brave web search URL."""
+        return f"{self.root_url}/brave/res/v1/web/search"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point the app's clients at this server."""
+        return {
+            "TOGETHER_BASE_URL": self.base_url,
+            "DUCKDUCKGO_BASE_URL": self.duckduckgo_url,
+            "BRAVE_BASE_URL": self.brave_url
+        }
+
+    def start(self) -> "StandInServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the socket."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # Record/replay
+
+    def _load_cassette(self) -> Dict[str, Dict]:
+        recordings = {}
+        if os.path.exists(self.cassette):
+            with open(self.cassette, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        recordings[record["key"]] = record
+        return recordings
+
+    @staticmethod
+    def request_key(route: str, method: str, query: Dict, payload: Optional[Dict]) -> str:
+        """
+        Identify a request by its route, method, query and body, independent of ordering.
+
+        Dates and timestamps are masked (VOLATILE_PATTERN), so a request that
+        only differs in the time it was made replays the same recording.
+        """
+        canonical = json.dumps([route, method, sorted(query.items()), payload], sort_keys=True, ensure_ascii=False)
+        canonical = VOLATILE_PATTERN.sub("<date>", canonical)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _record(self, key: str, route: str, status: int, content_type: str, body: str) -> None:
+        record = {"key": key, "route": route, "status": status, "content_type": content_type, "body": body}
+        with self._lock:
+            self._recordings[key] = record
+            with open(self.cassette, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _forward(self, route: str, method: str, path: str, query: Dict, payload: Optional[Dict],
+                 headers: Dict[str, str]) -> Tuple[int, str, str]:
+        """Send a request to the real API; returns (status, content type, body)."""
+        url = UPSTREAMS[route]
+        if route == "together":
+            url += path.split("/v1", 1)[1]
+        response = requests.request(method, url, params=query or None, json=payload, headers=headers, timeout=600)
+        return response.status_code, response.headers.get("Content-Type", "application/json"), response.text
+
+    # Synthetic responses
+
+    def prefill(self, payload: Dict) -> Tuple[int, int]:
+        """Simulate prompt processing with a prefix cache; returns (prompt_tokens, cached_tokens)."""
+        prompt = "\n".join(
+            f"{message.get('role')}: {message.get('content') or ''}" for message in payload.get("messages", [])
+        )
+        with self._lock:
+            cached_chars = max((len(os.path.commonprefix([prompt, seen])) for seen in self._seen_prompts), default=0)
+            self._seen_prompts = (self._seen_prompts + [prompt])[-256:]
+            prompt_tokens = max(1, len(prompt) // 4)
+            cached_tokens = min(cached_chars // 4, prompt_tokens)
+            self.prompt_tokens_total += prompt_tokens
+            self.cached_tokens_total += cached_tokens
+
+        if self.prefill_per_token:
+            time.sleep((prompt_tokens - cached_tokens) * self.prefill_per_token)
+        return prompt_tokens, cached_tokens
+
+    def chat_completion(self, payload: Dict, prompt_tokens: int = 1, cached_tokens: int = 0) -> Dict:
+        """Build an OpenAI-shaped chat completion response for a request payload."""
+        completion_tokens = max(1, len(self.reply) // 4)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "stand-in"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.reply},
+                "finish_reason": self.finish_reason
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens}
+            }
+        }
+
+    def chat_completion_chunks(self, payload: Dict):
+        """Yield OpenAI-shaped ``chat.completion.chunk`` events for a streamed request."""
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        base = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": payload.get("model", "stand-in")
+        }
+        yield dict(base, choices=[{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for start in range(0, len(self.reply), self.chunk_size):
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            content = self.reply[start:start + self.chunk_size]
+            yield dict(base, choices=[{"index": 0, "delta": {"content": content}, "finish_reason": None}])
+        yield dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": self.finish_reason}])
+
+    def _synthetic_articles(self, query: str) -> List[Dict]:
+        company = query.split(" company")[0] or "Company"
+        slug = "".join(c if c.isalnum() else "-" for c in company.lower())
+        return [
+            {
+                "title": f"{company} update {i + 1}",
+                "description": f"{company} update {i + 1} - analysts discuss revenue, margins and outlook for the sector.",
+                "url": f"https://news.example/{slug}/{i + 1}"
+            }
+            for i in range(self.news_articles)
+        ]
+
+    def duckduckgo_response(self, query: Dict) -> Dict:
+        """Build a DuckDuckGo Instant Answer response with RelatedTopics for a query."""
+        return {
+            "RelatedTopics": [
+                {"Text": article["description"], "FirstURL": article["url"]}
+                for article in self._synthetic_articles(query.get("q", ""))
+            ],
+            "Results": []
+        }
+
+    def brave_response(self, query: Dict) -> Dict:
+        """Build a Brave web search response for a query."""
+        return {
+            "web": {
+                "results": [
+                    dict(article, published=time.strftime("%Y-%m-%d"), source="news.example")
+                    for article in self._synthetic_articles(query.get("q", ""))
+                ]
+            }
+        }
+
+    def _inject_error(self) -> bool:
+        with self._lock:
+            inject = self.error_rate > 0 and self._random.random() < self.error_rate
+            if inject:
+                self.errors_injected += 1
+        return inject
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 so clients can keep connections alive between requests
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self._handle("GET", None)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self._handle("POST", json.loads(self.rfile.read(length) or b"{}"))
+
+            def _route(self, method: str, path: str) -> Optional[str]:
+                if method == "POST" and path.endswith("/chat/completions"):
+                    return "together"
+                if method == "GET" and path.startswith("/duckduckgo"):
+                    return "duckduckgo"
+                if method == "GET" and path.startswith("/brave"):
+                    return "brave"
+                return None
+
+            def _handle(self, method: str, payload: Optional[Dict]):
+                parts = urlsplit(self.path)
+                query = dict(parse_qsl(parts.query, keep_blank_values=True))
+                route = self._route(method, parts.path)
+                if route is None:
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+
+                with server._lock:
+                    server.requests_served += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if server._inject_error():
+                    self._send_json(server.error_status, {"error": {"message": "Injected stand-in error"}})
+                    return
+
+                if server.mode == "synthetic":
+                    self._send_synthetic(route, query, payload)
+                    return
+
+                key = server.request_key(route, method, query, payload)
+                if server.mode == "replay":
+                    record = server._recordings.get(key)
+                    if record is None:
+                        self._send_json(404, {"error": {"message": f"No recording for this {route} request"}})
+                        return
+                    status, content_type, body = record["status"], record["content_type"], record["body"]
+                else:
+                    headers = {name: self.headers[name] for name in FORWARDED_HEADERS if self.headers.get(name)}
+                    status, content_type, body = server._forward(route, method, parts.path, query, payload, headers)
+                    server._record(key, route, status, content_type, body)
+                self._send_recorded(status, content_type, body)
+
+            def _send_synthetic(self, route: str, query: Dict, payload: Optional[Dict]):
+                if route == "duckduckgo":
+                    self._send_json(200, server.duckduckgo_response(query))
+                elif route == "brave":
+                    self._send_json(200, server.brave_response(query))
+                else:
+                    prompt_tokens, cached_tokens = server.prefill(payload)
+                    if payload.get("stream"):
+                        self._send_stream(
+                            f"data: {json.dumps(event)}\n\n" for event in server.chat_completion_chunks(payload)
+                        )
+                    else:
+                        self._send_json(200, server.chat_completion(payload, prompt_tokens, cached_tokens))
+
+            def _send_recorded(self, status: int, content_type: str, body: str):
+                if status == 200 and content_type.startswith("text/event-stream"):
+                    # Replay the recorded events one by one, paced like a live stream
+                    self._send_stream(self._paced_events(body))
+                    return
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _paced_events(self, body: str):
+                for event in body.split("\n\n"):
+                    if not event.strip() or event.strip() == "data: [DONE]":
+                        continue
+                    if server.chunk_delay:
+                        time.sleep(server.chunk_delay)
+                    yield event + "\n\n"
+
+            def _send_json(self, status: int, body: Dict):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, events):
+                # Server-sent events over chunked transfer encoding, as the OpenAI API streams
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for event in events:
+                        self._write_chunk(event.encode("utf-8"))
+                    self._write_chunk(b"data: [DONE]\n\n")
+                    self._write_chunk(b"")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client closed the stream early (e.g. a cancelled hedge attempt)
+                    self.close_connection = True
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8900, help="Port to bind")
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay before each response (seconds)")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Delay between streamed chunks (seconds)")
+    parser.add_argument("--finish-reason", default="stop", help="finish_reason of synthetic completions")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with --error-status")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status of injected errors")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for error injection")
+    parser.add_argument("--cassette", default=None, help="JSONL file for recorded responses")
+    parser.add_argument("--mode", choices=MODES, default="synthetic", help="Serve synthetic, record or replay responses")
+    args = parser.parse_args(argv)
+
+    server = StandInServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        chunk_delay=args.chunk_delay,
+        finish_reason=args.finish_reason,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+        cassette=args.cassette,
+        mode=args.mode
+    )
+    print(f"Stand-in server ({args.mode}) listening on {server.root_url}; point the app at it with:")
+    for name, value in server.env().items():
+        print(f"  export {name}={value}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
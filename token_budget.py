@@ -0,0 +1,140 @@
+import re
+from typing import Dict, List, Optional
+
+from metrics import METRICS
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # Not installed, or the encoding could not be downloaded; fall back to a character heuristic
+    _ENCODING = None
+
+DEFAULT_CONTEXT_WINDOW = 32768
+
+# Context window (prompt + completion tokens) of the models offered in the sidebar
+MODEL_CONTEXT_WINDOWS = {
+    "meta-llama/Llama-3.3-70B-Instruct-Turbo": 131072,
+    "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo": 131072,
+    "meta-llama/Meta-Llama-3.1-405B-Instruct-Turbo": 130815,
+    "deepseek-ai/DeepSeek-R1": 131072
+}
+
+# Completion budget per task type; reasoning models need room for their <think> block
+COMPLETION_BUDGETS = {
+    "report": {
+        "default": 8192,
+        "deepseek-ai/DeepSeek-R1": 32768
+    },
+    "evaluation": {
+        "default": 2048,
+        "deepseek-ai/DeepSeek-R1": 8192
+    },
+    # Several reports scored in one call
+    "batch_evaluation": {
+        "default": 6144,
+        "deepseek-ai/DeepSeek-R1": 16384
+    }
+}
+
+# Tokens kept free for chat formatting and estimation error
+SAFETY_MARGIN = 512
+MIN_COMPLETION_TOKENS = 256
+
+_NON_ASCII = re.compile(r'[^\x00-\x7f]')
+_THINK_BLOCK = re.compile(r'<think>.*?</think>', flags=re.DOTALL)
+
+
+class ContextWindowExceeded(ValueError):
+    """Raised when a prompt leaves no room for a completion in the model's context window."""
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+
+    Uses tiktoken's cl100k_base encoding when it is available. Otherwise counts
+    about four characters per token for ASCII text and two per token for other
+    scripts (Devanagari tokenizes much less densely than English).
+    """
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    non_ascii = len(_NON_ASCII.findall(text))
+    return (len(text) - non_ascii + 3) // 4 + (non_ascii + 1) // 2
+
+
+def estimate_message_tokens(messages: List[Dict]) -> int:
+    """Estimate the prompt tokens of a chat request, including per-message overhead."""
+    return sum(estimate_tokens(message.get("content") or "") + 4 for message in messages)
+
+
+def context_window(model: str) -> int:
+    """Return the context window of a model."""
+    return MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+
+
+def plan_max_tokens(model: str, task: str, prompt_tokens: int) -> int:
+    """
+    Choose max_tokens for a request from the task's budget and the room left in the context window.
+
+    Args:
+        model (str): Model name
+        task (str): Task type, "report", "evaluation" or "batch_evaluation"
+        prompt_tokens (int): Estimated prompt size in tokens
+
+    Returns:
+        int: Completion token limit to request
+
+    Raises:
+        ContextWindowExceeded: If the prompt leaves less than MIN_COMPLETION_TOKENS of room
+    """
+    budgets = COMPLETION_BUDGETS.get(task, COMPLETION_BUDGETS["report"])
+    budget = budgets.get(model, budgets["default"])
+    available = context_window(model) - prompt_tokens - SAFETY_MARGIN
+    if available < MIN_COMPLETION_TOKENS:
+        METRICS.incr("llm.tokens.context_exceeded")
+        raise ContextWindowExceeded(
+            f"Prompt of about {prompt_tokens} tokens does not fit the {context_window(model)}-token "
+            f"context window of {model}"
+        )
+    return min(budget, available)
+
+
+def record_usage(model: str, task: str, usage=None, raw_content: Optional[str] = None,
+                 prompt_estimate: Optional[int] = None) -> Dict:
+    """
+    Record prompt, completion and reasoning token counts for one call.
+
+    Args:
+        model (str): Model name
+        task (str): Task type, "report", "evaluation" or "batch_evaluation"
+        usage: ``usage`` object from the API response, if any
+        raw_content (str, optional): Uncleaned model output, used to estimate reasoning tokens
+        prompt_estimate (int, optional): Local prompt estimate, used when usage is missing
+
+    Returns:
+        Dict: The recorded prompt/completion/reasoning token counts
+    """
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    details = getattr(usage, "completion_tokens_details", None)
+    reasoning_tokens = getattr(details, "reasoning_tokens", None)
+
+    if prompt_tokens is None:
+        prompt_tokens = prompt_estimate or 0
+    if completion_tokens is None:
+        completion_tokens = estimate_tokens(raw_content or "")
+    if reasoning_tokens is None:
+        reasoning_tokens = sum(estimate_tokens(block) for block in _THINK_BLOCK.findall(raw_content or ""))
+
+    counts = {
+        'prompt': prompt_tokens,
+        'completion': completion_tokens,
+        'reasoning': reasoning_tokens
+    }
+    for kind, value in counts.items():
+        METRICS.incr(f"llm.tokens.{kind}", value)
+        METRICS.incr(f"llm.tokens.{kind}.{task}", value)
+        METRICS.observe(f"llm.tokens.{kind}.{model}", value)
+    return counts
@@ -174,7 +174,9 @@ UI_TRANSLATIONS = {
         "news_title": "Latest News",
         "news_publisher": "Publisher",
         "news_date": "Date",
-        "news_link": "Read More"
+        "news_link": "Read More",
+        "evaluating": "🔄 Evaluating report quality...",
+        "reused_report": "♻️ Inputs for this report are unchanged; reused from the previous run."
     },
     "Hindi": {
         "title": "AI-जनित वित्तीय पूर्वानुमान और विश्लेषण रिपोर्ट",
@@ -217,7 +219,9 @@ UI_TRANSLATIONS = {
         "news_title": "ताज़ा समाचार",
         "news_publisher": "प्रकाशक",
         "news_date": "दिनांक",
-        "news_link": "और पढ़ें"
+        "news_link": "और पढ़ें",
+        "evaluating": "🔄 रिपोर्ट की गुणवत्ता का मूल्यांकन किया जा रहा है...",
+        "reused_report": "♻️ इस रिपोर्ट के इनपुट नहीं बदले हैं; पिछली रिपोर्ट का पुनः उपयोग किया गया।"
     },
     "Marathi": {
         "title": "AI-जनरेटेड फायनान्शियल फोरकास्टिंग आणि अॅनालिसिस रिपोर्ट",
@@ -260,7 +264,9 @@ UI_TRANSLATIONS = {
         "news_title": "नवीनतम बातम्या",
         "news_publisher": "प्रकाशक",
         "news_date": "दिनांक",
-        "news_link": "अधिक वाचा"
+        "news_link": "अधिक वाचा",
+        "evaluating": "🔄 अहवालाच्या गुणवत्तेचे मूल्यांकन करत आहे...",
+        "reused_report": "♻️ या अहवालाचे इनपुट बदललेले नाहीत; मागील अहवाल पुन्हा वापरला आहे."
     }
 }
 
@@ -512,6 +518,11 @@ You excel at integrating recent news and market events into your analysis to pro
 ☐ Geopolitical Risk Assessment
 ☐ News Impact Analysis""",
 
+        "news_context_label": "Recent News Context:",
+
+        "batch_evaluation_instructions": """Evaluate each of the reports below separately, using the evaluation format above for every report.
+Start each evaluation with the report's marker line exactly as given (for example `=== REPORT: market_trends ===`) and evaluate the reports in the order shown.""",
+
         "ui": UI_TRANSLATIONS["English"]
     },
     "Hindi": {
@@ -520,6 +531,9 @@ You excel at integrating recent news and market events into your analysis to pro
         "financial_projections": HINDI_FINANCIAL_PROJECTIONS_PROMPT,
         "investment_recommendations": HINDI_INVESTMENT_RECOMMENDATIONS_PROMPT,
         "evaluation_template": HINDI_EVALUATION_TEMPLATE,
+        "news_context_label": "हालिया समाचार संदर्भ:",
+        "batch_evaluation_instructions": """नीचे दी गई प्रत्येक रिपोर्ट का ऊपर दिए गए मूल्यांकन प्रारूप का उपयोग करके अलग-अलग मूल्यांकन करें।
+प्रत्येक मूल्यांकन को रिपोर्ट की मार्कर पंक्ति से ठीक वैसे ही शुरू करें जैसी दी गई है (उदाहरण: `=== REPORT: market_trends ===`) और रिपोर्टों का मूल्यांकन दिखाए गए क्रम में करें।""",
         "ui": UI_TRANSLATIONS["Hindi"]
     },
     "Marathi": {
@@ -528,6 +542,9 @@ You excel at integrating recent news and market events into your analysis to pro
         "financial_projections": MARATHI_FINANCIAL_PROJECTIONS_PROMPT,
         "investment_recommendations": MARATHI_INVESTMENT_RECOMMENDATIONS_PROMPT,
         "evaluation_template": MARATHI_EVALUATION_TEMPLATE,
+        "news_context_label": "अलीकडील बातम्यांचा संदर्भ:",
+        "batch_evaluation_instructions": """खालील प्रत्येक अहवालाचे वरील मूल्यांकन स्वरूप वापरून स्वतंत्रपणे मूल्यांकन करा.
+प्रत्येक मूल्यांकनाची सुरुवात अहवालाच्या मार्कर ओळीनेच जशी दिली आहे तशी करा (उदाहरण: `=== REPORT: market_trends ===`) आणि अहवालांचे मूल्यांकन दाखवलेल्या क्रमाने करा.""",
         "ui": UI_TRANSLATIONS["Marathi"]
     }
 } 
\ No newline at end of file
@@ -6,45 +6,292 @@ import os
 from dotenv import load_dotenv
 import pandas as pd
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import json
-from typing import Dict, List, Union, Optional
-from translated_prompts import LANGUAGES
-from duckduckgo_service import DuckDuckGoNewsService
+from typing import Callable, Dict, List, Union, Optional, Tuple
+from translated_prompts import LANGUAGES, UI_TRANSLATIONS
+from prompt_layout import build_report_prompt
+from columnar_store import PriceColumns
+from company_metadata import get_company_metadata_cache
+import indicators
+from news_aggregator import create_news_service
+from llm_cache import get_completion_cache
+from llm_client import (
+    HedgedStream,
+    backup_model,
+    call_with_fallback,
+    fallback_models,
+    get_llm_client,
+    hedge_deadline,
+    hedging_enabled
+)
+from market_data import get_market_data_provider
+from metrics import METRICS
+from news_archive import get_news_archive, timeframe_days
+from news_cache import get_news_cache
+from news_dedup import dedupe_articles
+from news_packing import pack_news_context
+from token_budget import ContextWindowExceeded, estimate_message_tokens, plan_max_tokens, record_usage
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import markdown
+import pdfkit
 
 load_dotenv()
 
+# Keys of the reports in a bundle, in display order
+REPORT_KEYS = ['market_trends', 'financial_projections', 'investment_recommendations']
+
+# Marker separating the reports (and their evaluations) in a batched evaluation
+REPORT_MARKER = "=== REPORT: {key} ==="
+
+# Sidebar inputs each report reads; a report is only regenerated when one of these changes
+REPORT_INPUTS = {
+    'market_trends': ['company', 'industry', 'timeframe'],
+    'financial_projections': ['company', 'timeframe'],
+    # The investment report shares the bundle's news, which is fetched for the timeframe
+    'investment_recommendations': ['company', 'timeframe', 'risk_profile', 'investment_horizon']
+}
+
+# Inputs every report depends on
+SHARED_INPUTS = ['language', 'model']
+
+class CompletionError(RuntimeError):
+    """A model call failed or its prompt did not fit the model's context window."""
+
 def clean_model_output(text):
     """Remove text within <think> tags from model output."""
     return re.sub(r'<think>.*?</think>', '', text, flags=re.DOTALL)
 
+class ThinkTagFilter:
+    """
+    Incrementally remove <think>...</think> spans from streamed model output.
+
+    Text is fed chunk by chunk; tags may be split across chunk boundaries. The
+    concatenated output of feed() and flush() equals clean_model_output() of the
+    full text, including leaving an unterminated <think> block untouched.
+    """
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+
+    def __init__(self):
+        self._buffer = ""
+        self._inside = False
+        self._hidden = []  # Text of the currently open think block
+
+    @staticmethod
+    def _partial_tag_length(text: str, tag: str) -> int:
+        """Length of the longest suffix of text that is a proper prefix of tag."""
+        for length in range(min(len(tag) - 1, len(text)), 0, -1):
+            if text.endswith(tag[:length]):
+                return length
+        return 0
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk and return the text that is now known to be visible."""
+        self._buffer += chunk
+        visible = []
+
+        while True:
+            tag = self.CLOSE_TAG if self._inside else self.OPEN_TAG
+            index = self._buffer.find(tag)
+            if index == -1:
+                # Hold back a possible partial tag until the next chunk arrives
+                keep = self._partial_tag_length(self._buffer, tag)
+                ready = self._buffer[:len(self._buffer) - keep]
+                if self._inside:
+                    self._hidden.append(ready)
+                else:
+                    visible.append(ready)
+                self._buffer = self._buffer[len(self._buffer) - keep:]
+                break
+
+            if self._inside:
+                self._hidden = []
+            else:
+                visible.append(self._buffer[:index])
+                self._hidden = [tag]
+            self._buffer = self._buffer[index + len(tag):]
+            self._inside = not self._inside
+
+        return "".join(visible)
+
+    def flush(self) -> str:
+        """Return any held-back text once the stream has ended."""
+        remaining = "".join(self._hidden) + self._buffer if self._inside else self._buffer
+        self._buffer = ""
+        self._inside = False
+        self._hidden = []
+        return remaining
+
 def setup_client():
-    """Initialize the OpenAI client with Together AI API."""
-    return openai.OpenAI(
-        api_key=os.getenv("TOGETHER_API_KEY", ""),
-        base_url="https://api.together.xyz/v1",
-    )
+    """Return the shared, connection-pooled OpenAI client for the Together AI API."""
+    return get_llm_client()
+
+def _model_max_tokens(model: str, primary: str, primary_max_tokens: int, task: str, prompt_tokens: int) -> int:
+    """max_tokens for a request sent to ``model``; fallback and hedge models get their own budget."""
+    return primary_max_tokens if model == primary else plan_max_tokens(model, task, prompt_tokens)
+
+def _completion_cache_key(model: str, system_context: str, user_message: str, temperature: float, max_tokens: int) -> str:
+    """Completion cache key of a request answered by ``model`` with ``max_tokens``."""
+    return get_completion_cache().make_key(model, system_context, user_message, temperature, max_tokens)
+
+def stream_completion(client, model: str, messages: List[Dict], temperature: float, max_tokens: int,
+                      on_text: Optional[Callable[[str], None]] = None, task: str = "report",
+                      hedge: bool = False) -> Tuple[str, Optional[str], str]:
+    """
+    Stream a chat completion, stripping <think> blocks as the chunks arrive.
 
-def generate_completion(prompt_text: str, language: str = "English") -> str:
-    """Generate completion using Together AI via OpenAI SDK."""
+    Opening the stream is retried on transient errors and falls back to the
+    backup model. With hedge set, a backup request is also fired when the
+    model has not started answering within the hedge deadline. Requests to
+    the backup model get its own max_tokens budget.
+
+    Args:
+        client: OpenAI SDK client
+        model (str): Model name
+        messages (List[Dict]): Chat messages
+        temperature (float): Sampling temperature
+        max_tokens (int): Completion token limit for ``model``
+        on_text (Callable, optional): Called with each piece of cleaned, visible text
+        task (str): Task type used for token accounting
+        hedge (bool): Race a slow model against the backup model
+
+    Returns:
+        Tuple[str, Optional[str], str]: Cleaned content, the finish reason and the model that answered
+    """
+    start = time.perf_counter()
+    think_filter = ThinkTagFilter()
+    parts = []
+    raw_parts = []
+    finish_reason = None
+    usage = None
+    first_token_seen = False
+    prompt_tokens = estimate_message_tokens(messages)
+    opened = []  # Models asked, in order; the last one answered unless hedged
+
+    def emit(text):
+        if not text:
+            return
+        if not parts:
+            METRICS.observe("llm.time_to_first_visible_token", time.perf_counter() - start)
+        parts.append(text)
+        if on_text:
+            on_text(text)
+
+    def open_stream(stream_model):
+        opened.append(stream_model)
+        return client.chat.completions.create(
+            model=stream_model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=_model_max_tokens(stream_model, model, max_tokens, task, prompt_tokens),
+            stream=True
+        )
+
+    if hedge and backup_model() != model:
+        stream = HedgedStream(open_stream, model, backup_model(), hedge_deadline())
+    else:
+        stream = call_with_fallback(open_stream, fallback_models(model))
+    for chunk in stream:
+        # Together reports token usage on the final chunk
+        if getattr(chunk, "usage", None):
+            usage = chunk.usage
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if choice.finish_reason:
+            finish_reason = choice.finish_reason
+        delta = choice.delta.content if choice.delta else None
+        if not delta:
+            continue
+        if not first_token_seen:
+            first_token_seen = True
+            METRICS.observe("llm.time_to_first_token", time.perf_counter() - start)
+        raw_parts.append(delta)
+        emit(think_filter.feed(delta))
+
+    emit(think_filter.flush())
+    METRICS.observe("llm.completion_time", time.perf_counter() - start)
+    # A hedged stream names its winner; otherwise the last model opened answered
+    answered_model = getattr(stream, "model", None) or opened[-1]
+    record_usage(answered_model, task, usage, raw_content="".join(raw_parts), prompt_estimate=prompt_tokens)
+    return "".join(parts), finish_reason, answered_model
+
+def generate_completion(prompt_text: str, language: str = "English", on_text: Optional[Callable[[str], None]] = None,
+                        force_refresh: bool = False) -> str:
+    """
+    Generate completion using Together AI via OpenAI SDK.
+
+    When on_text is given the completion is streamed and each piece of cleaned
+    text is passed to it as soon as it arrives. Completions are served from the
+    persistent completion cache unless force_refresh is set. max_tokens is sized
+    from the prompt estimate and the model's report budget; prompts that do not
+    fit the model's context window are rejected without calling the API.
+    Transient API errors are retried and fall back to the backup model; with
+    LLM_HEDGING set, slow first tokens are hedged as well (see stream_completion).
+
+    Raises:
+        CompletionError: If the prompt does not fit or the model call fails
+    """
     client = setup_client()
     
+    system_context = LANGUAGES[language]["system_context"]
     messages = [
-        {"role": "system", "content": LANGUAGES[language]["system_context"]},
+        {"role": "system", "content": system_context},
         {"role": "user", "content": prompt_text}
     ]
+    model = os.environ["MODEL_NAME"] or "deepseek-ai/DeepSeek-R1"
+    temperature = 0.7
+
+    prompt_tokens = estimate_message_tokens(messages)
+    try:
+        max_tokens = plan_max_tokens(model, "report", prompt_tokens)
+    except ContextWindowExceeded as e:
+        print(f"Error generating completion: {str(e)}")
+        raise CompletionError(str(e)) from e
+
+    cache = get_completion_cache()
+    if not force_refresh:
+        cached_content = cache.get(_completion_cache_key(model, system_context, prompt_text, temperature, max_tokens))
+        if cached_content is not None:
+            if on_text is not None:
+                on_text(cached_content)
+            return cached_content
     
     try:
-        # First attempt with higher token limit
-        response = client.chat.completions.create(
-            model=(os.environ["MODEL_NAME"] or "deepseek-ai/DeepSeek-R1"),
-            messages=messages,
-            temperature=0.7,
-            max_tokens=100000  # Increased token limit
-        )
+        # Hedging needs to watch for the first token, so it always streams
+        if on_text is not None or hedging_enabled():
+            cleaned_content, finish_reason, answered_model = stream_completion(
+                client, model, messages, temperature=temperature, max_tokens=max_tokens, on_text=on_text,
+                task="report", hedge=hedging_enabled()
+            )
+            if finish_reason == "length":
+                print("Warning: Response was truncated due to length limits")
+            # Cache under the model that answered, so a backup's answer is never served for the primary
+            answered_max_tokens = _model_max_tokens(answered_model, model, max_tokens, "report", prompt_tokens)
+            cache.set(_completion_cache_key(answered_model, system_context, prompt_text, temperature, answered_max_tokens),
+                      cleaned_content)
+            return cleaned_content
+
+        asked = []
+        def create(completion_model):
+            asked.append(completion_model)
+            return client.chat.completions.create(
+                model=completion_model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=_model_max_tokens(completion_model, model, max_tokens, "report", prompt_tokens)
+            )
+
+        response = call_with_fallback(create, fallback_models(model))
+        answered_model = asked[-1]
         
         content = response.choices[0].message.content
+        record_usage(answered_model, "report", response.usage, raw_content=content, prompt_estimate=prompt_tokens)
         
         # Check if response was truncated
         if response.choices[0].finish_reason == "length":
@@ -53,11 +300,14 @@ def generate_completion(prompt_text: str, language: str = "English") -> str:
         # Clean and return the response
         cleaned_content = clean_model_output(content)
         print(cleaned_content)
+        answered_max_tokens = _model_max_tokens(answered_model, model, max_tokens, "report", prompt_tokens)
+        cache.set(_completion_cache_key(answered_model, system_context, prompt_text, temperature, answered_max_tokens),
+                  cleaned_content)
         return cleaned_content
         
     except Exception as e:
         print(f"Error generating completion: {str(e)}")
-        return f"Error generating response: {str(e)}"
+        raise CompletionError(str(e)) from e
 
 def generate_market_trends_report(company, industry, timeframe):
     """Generate market trends report using Together AI."""
@@ -215,8 +465,39 @@ def generate_mock_news(language: str = "English"):
     return news_templates.get(language, news_templates["English"])
 
 def get_stock_data(ticker_symbol: str, period: str = "1y") -> Dict:
-    """Get mock stock data instead of real-time data."""
-    return generate_mock_data()
+    """
+    Get historical stock data for a ticker from the local market data store.
+
+    Only bars missing from the store are fetched, so repeated views of a
+    ticker are served from disk. Financial projections and news are not part
+    of the price history and are still mocked.
+
+    Args:
+        ticker_symbol (str): Ticker symbol
+        period (str): yfinance-style period, e.g. "6mo" or "1y"
+
+    Returns:
+        Dict: Historical data, current price, market cap, volume and metrics, with ``success``
+    """
+    try:
+        historical_data = get_market_data_provider().history(ticker_symbol, period)
+    except Exception as e:
+        print(f"Error fetching stock data for {ticker_symbol}: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
+    mock_data = generate_mock_data()
+    # Only use metadata that is already cached; the chart should not wait for it
+    info = get_company_metadata_cache().peek(ticker_symbol) or {}
+    return {
+        'historical_data': historical_data,
+        'financial_data': mock_data['financial_data'],
+        'current_price': historical_data['Close'].iloc[-1],
+        'market_cap': info.get('marketCap'),
+        'volume': historical_data['Volume'].iloc[-1],
+        'metrics': calculate_stock_metrics(historical_data),
+        'news': mock_data['news'],
+        'success': True
+    }
 
 def calculate_stock_metrics(historical_data: pd.DataFrame) -> Dict:
     """Calculate additional stock metrics."""
@@ -228,23 +509,21 @@ def calculate_stock_metrics(historical_data: pd.DataFrame) -> Dict:
     }
     
     try:
-        if not historical_data.empty and 'Close' in historical_data.columns:
+        close = historical_data['Close'].dropna() if 'Close' in historical_data.columns else pd.Series(dtype=float)
+        if not close.empty:
             # Volatility
-            metrics['volatility'] = historical_data['Close'].pct_change().std() * np.sqrt(252)
+            metrics['volatility'] = close.pct_change().std() * np.sqrt(252)
             
             # Moving averages
-            if len(historical_data) >= 50:
-                metrics['sma_50'] = historical_data['Close'].rolling(window=50).mean().iloc[-1]
-            if len(historical_data) >= 200:
-                metrics['sma_200'] = historical_data['Close'].rolling(window=200).mean().iloc[-1]
+            if len(close) >= 50:
+                metrics['sma_50'] = indicators.sma(close, 50)[-1]
+            if len(close) >= 200:
+                metrics['sma_200'] = indicators.sma(close, 200)[-1]
             
-            # RSI
-            delta = historical_data['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            if not pd.isna(rs.iloc[-1]):
-                metrics['rsi'] = 100 - (100 / (1 + rs.iloc[-1]))
+            # RSI over simple averages of the last 14 gains and losses
+            rsi = indicators.rsi(close, 14, method="sma")[-1]
+            if not np.isnan(rsi):
+                metrics['rsi'] = rsi
     except Exception as e:
         print(f"Error calculating metrics: {str(e)}")
     
@@ -257,6 +536,8 @@ def create_stock_visualization(data: pd.DataFrame, title: str, xlabel: str = "Da
         
         if isinstance(data, pd.Series):
             data = pd.DataFrame({'Close': data})
+        elif isinstance(data, PriceColumns):
+            data = data.to_frame()
         
         if 'Close' not in data.columns:
             raise ValueError("Data must contain 'Close' column")
@@ -266,9 +547,9 @@ def create_stock_visualization(data: pd.DataFrame, title: str, xlabel: str = "Da
         
         # Only add moving averages if we have enough data points
         if len(data) >= 50:
-            ax1.plot(data.index, data['Close'].rolling(window=50).mean(), label=LANGUAGES[language]["ui"]["sma_50"])
+            ax1.plot(data.index, indicators.sma(data['Close'], 50), label=LANGUAGES[language]["ui"]["sma_50"])
         if len(data) >= 200:
-            ax1.plot(data.index, data['Close'].rolling(window=200).mean(), label=LANGUAGES[language]["ui"]["sma_200"])
+            ax1.plot(data.index, indicators.sma(data['Close'], 200), label=LANGUAGES[language]["ui"]["sma_200"])
         
         ax1.set_title(title)
         ax1.set_ylabel(ylabel)
@@ -333,11 +614,31 @@ def display_news_articles(news_articles, language="English"):
             st.write(article['description'])
             st.markdown(f"[{LANGUAGES[language]['ui']['news_link']}]({article['link']})")
 
+def display_evaluation(evaluation, language="English"):
+    """Display report quality scores and improvement areas."""
+    if not evaluation:
+        return
+
+    ui = LANGUAGES[language]["ui"]
+    scores = evaluation.get('scores', {})
+    if scores:
+        st.subheader(ui["quality_scores"])
+        for col, (score_name, score) in zip(st.columns(len(scores)), scores.items()):
+            col.metric(score_name, f"{score}/10")
+
+    improvements = evaluation.get('improvements', [])
+    if improvements:
+        with st.expander(ui["improvement_areas"]):
+            for improvement in improvements:
+                st.write(improvement)
+
 class FinancialAnalysis:
-    def __init__(self, language="English"):
+    def __init__(self, language="English", force_refresh=False):
         self.client = setup_client()
         self.language = language
-        self.news_service = DuckDuckGoNewsService()
+        # Bypass the completion cache and always ask the model
+        self.force_refresh = force_refresh
+        self.news_service = create_news_service()
         
     def evaluate_report(self, report: str, language: str = "English") -> Dict:
         """Evaluate the generated report using GPT."""
@@ -346,13 +647,59 @@ class FinancialAnalysis:
         system_context = LANGUAGES[language]["system_context"]
         
         # Generate evaluation response
-        evaluation_response = self.generate_response(
-            system_context=system_context,
-            user_message=f"{evaluation_template}\n\nReport to evaluate:\n{report}"
-        )
+        try:
+            evaluation_response = self.generate_response(
+                system_context=system_context,
+                user_message=f"{evaluation_template}\n\nReport to evaluate:\n{report}"
+            )
+        except CompletionError as e:
+            return failed_evaluation(e)
         
         # Parse evaluation response
         return parse_evaluation(evaluation_response, language)
+
+    def evaluate_reports(self, reports: Dict[str, str], language: str = "English") -> Dict[str, Dict]:
+        """
+        Evaluate several reports with a single model call.
+
+        Reports whose section is missing from the response, or parses to no
+        scores because the model mangled the markers, are evaluated on their own.
+
+        Args:
+            reports (Dict[str, str]): Report text by report key
+            language (str): Language of the reports and evaluation
+
+        Returns:
+            Dict[str, Dict]: Parsed evaluation (scores and improvements) by report key
+        """
+        if not reports:
+            return {}
+        if len(reports) == 1:
+            key, report = next(iter(reports.items()))
+            return {key: self.evaluate_report(report, language=language)}
+
+        evaluation_template = LANGUAGES[language]["evaluation_template"]
+        instructions = LANGUAGES[language]["batch_evaluation_instructions"]
+        system_context = LANGUAGES[language]["system_context"]
+        sections = "\n\n".join(
+            f"{REPORT_MARKER.format(key=key)}\n{report}" for key, report in reports.items()
+        )
+
+        try:
+            evaluation_response = self.generate_response(
+                system_context=system_context,
+                user_message=f"{evaluation_template}\n\n{instructions}\n\n{sections}",
+                task="batch_evaluation"
+            )
+        except CompletionError as e:
+            return {key: failed_evaluation(e) for key in reports}
+
+        evaluations = parse_batch_evaluation(evaluation_response, list(reports), language)
+        for key, report in reports.items():
+            if not evaluations.get(key, {}).get('scores'):
+                METRICS.incr("evaluation.batch_fallbacks")
+                evaluations[key] = self.evaluate_report(report, language=language)
+        return {key: evaluations[key] for key in reports}
     
     def validate_financial_data(self, data: Dict) -> bool:
         """Validate financial data for consistency and completeness."""
@@ -374,14 +721,49 @@ class FinancialAnalysis:
             
         return metrics
     
-    def generate_market_analysis(self, company: str, industry: str, timeframe: str, market_cap: float = 100.0, geographic_focus: str = "North America, Europe") -> Dict:
+    def fetch_news(self, company: str, timeframe: str) -> List[Dict]:
+        """Fetch deduplicated company news through the shared news cache, coalescing concurrent fetches."""
+        with METRICS.timer("stage.news"):
+            return get_news_cache().get_or_fetch(
+                (company, timeframe, self.language),
+                # Collapse syndicated copies once, before the articles are cached and reach any prompt
+                lambda: dedupe_articles(self._fetch_archived_news(company, timeframe)),
+                refresh=self.force_refresh
+            )
+
+    def _fetch_archived_news(self, company: str, timeframe: str) -> List[Dict]:
+        """
+        Fetch news through the archive and serve the timeframe from it.
+
+        When the archive already covers the start of the timeframe only articles
+        newer than its coverage are fetched; otherwise the whole timeframe is.
+        """
+        archive = get_news_archive()
+        now = time.time()
+        start = now - timeframe_days(timeframe) * 86400
+        covered = archive.coverage(company, self.language)
+        since = datetime.fromtimestamp(covered[1]) if covered and covered[0] <= start else None
+        fetched, complete = self.news_service.fetch_with_status(company, timeframe, self.language, since=since)
+        if not archive.enabled:
+            return fetched
+        archive.add(company, fetched, self.language)
+        # A provider that failed or missed the deadline leaves a gap, so only a complete fetch covers the period
+        if complete:
+            archive.mark_covered(company, since.timestamp() if since else start, now, self.language)
+        return archive.query(company, timeframe, self.language)
+
+    def generate_market_analysis(self, company: str, industry: str, timeframe: str, market_cap: float = 100.0, geographic_focus: str = "North America, Europe", on_report_text: Optional[Callable[[str], None]] = None, evaluate: bool = True, news_articles: Optional[List[Dict]] = None) -> Dict:
         """Generate comprehensive market analysis with evaluation."""
-        # Fetch company news
-        news_articles = self.news_service.fetch_company_news(company, timeframe, self.language)
-        news_summary = self.news_service.format_news_for_prompt(news_articles)
+        # Fetch company news unless the bundle already did
+        if news_articles is None:
+            news_articles = self.fetch_news(company, timeframe)
+        # Most relevant articles for this report, within the news token budget
+        news_summary = pack_news_context(self.news_service, news_articles, company, "market_trends", industry=industry)
         
         # Add news context to the prompt
-        prompt = LANGUAGES[self.language]["market_trends"].format(
+        prompt = build_report_prompt(
+            self.language,
+            "market_trends",
             company=company,
             industry=industry,
             timeframe=timeframe,
@@ -390,8 +772,12 @@ class FinancialAnalysis:
             news_context=news_summary
         )
         
-        report = generate_completion(prompt, language=self.language)
-        evaluation = self.evaluate_report(report, language=self.language)
+        with METRICS.timer("stage.report"):
+            report = generate_completion(prompt, language=self.language, on_text=on_report_text, force_refresh=self.force_refresh)
+        evaluation = None  # Filled in later by evaluate_bundle when not evaluated here
+        if evaluate:
+            with METRICS.timer("stage.evaluation"):
+                evaluation = self.evaluate_report(report, language=self.language)
         
         return {
             'report': report,
@@ -400,14 +786,18 @@ class FinancialAnalysis:
             'news_articles': news_articles
         }
     
-    def generate_financial_forecast(self, company: str, timeframe: str, metrics: str) -> Dict:
+    def generate_financial_forecast(self, company: str, timeframe: str, metrics: str, on_report_text: Optional[Callable[[str], None]] = None, evaluate: bool = True, news_articles: Optional[List[Dict]] = None) -> Dict:
         """Generate financial forecast with evaluation."""
-        # Fetch company news
-        news_articles = self.news_service.fetch_company_news(company, timeframe, self.language)
-        news_summary = self.news_service.format_news_for_prompt(news_articles)
+        # Fetch company news unless the bundle already did
+        if news_articles is None:
+            news_articles = self.fetch_news(company, timeframe)
+        # Most relevant articles for this report, within the news token budget
+        news_summary = pack_news_context(self.news_service, news_articles, company, "financial_projections")
         
         # Add news context to the prompt
-        prompt = LANGUAGES[self.language]["financial_projections"].format(
+        prompt = build_report_prompt(
+            self.language,
+            "financial_projections",
             company=company,
             timeframe=timeframe,
             metrics=metrics,
@@ -416,8 +806,12 @@ class FinancialAnalysis:
             news_context=news_summary
         )
         
-        report = generate_completion(prompt, language=self.language)
-        evaluation = self.evaluate_report(report, language=self.language)
+        with METRICS.timer("stage.report"):
+            report = generate_completion(prompt, language=self.language, on_text=on_report_text, force_refresh=self.force_refresh)
+        evaluation = None  # Filled in later by evaluate_bundle when not evaluated here
+        if evaluate:
+            with METRICS.timer("stage.evaluation"):
+                evaluation = self.evaluate_report(report, language=self.language)
         
         return {
             'report': report,
@@ -426,14 +820,18 @@ class FinancialAnalysis:
             'news_articles': news_articles
         }
     
-    def generate_investment_advice(self, company: str, risk_profile: str, investment_horizon: str) -> Dict:
+    def generate_investment_advice(self, company: str, risk_profile: str, investment_horizon: str, on_report_text: Optional[Callable[[str], None]] = None, evaluate: bool = True, news_articles: Optional[List[Dict]] = None) -> Dict:
         """Generate investment recommendations with evaluation."""
-        # Fetch company news
-        news_articles = self.news_service.fetch_company_news(company, "1 year", self.language)  # Use 1 year for investment advice
-        news_summary = self.news_service.format_news_for_prompt(news_articles)
+        # Fetch company news unless the bundle already did
+        if news_articles is None:
+            news_articles = self.fetch_news(company, "1 year")  # Use 1 year for investment advice
+        # Most relevant articles for this report, within the news token budget
+        news_summary = pack_news_context(self.news_service, news_articles, company, "investment_recommendations")
         
         # Add news context to the prompt
-        prompt = LANGUAGES[self.language]["investment_recommendations"].format(
+        prompt = build_report_prompt(
+            self.language,
+            "investment_recommendations",
             company=company,
             risk_profile=risk_profile,
             investment_horizon=investment_horizon,
@@ -442,8 +840,12 @@ class FinancialAnalysis:
             news_context=news_summary
         )
         
-        report = generate_completion(prompt, language=self.language)
-        evaluation = self.evaluate_report(report, language=self.language)
+        with METRICS.timer("stage.report"):
+            report = generate_completion(prompt, language=self.language, on_text=on_report_text, force_refresh=self.force_refresh)
+        evaluation = None  # Filled in later by evaluate_bundle when not evaluated here
+        if evaluate:
+            with METRICS.timer("stage.evaluation"):
+                evaluation = self.evaluate_report(report, language=self.language)
         
         return {
             'report': report,
@@ -452,33 +854,293 @@ class FinancialAnalysis:
             'news_articles': news_articles
         }
 
-    def generate_response(self, system_context: str, user_message: str) -> str:
-        """Generate a response using the language model."""
-        client = setup_client()
-        
+    def generate_response(self, system_context: str, user_message: str, task: str = "evaluation") -> str:
+        """Generate a response using the language model; raises CompletionError when the call fails."""
         messages = [
             {"role": "system", "content": system_context},
             {"role": "user", "content": user_message}
         ]
+        model = os.getenv("MODEL_NAME", "deepseek-ai/DeepSeek-R1")
+        temperature = 0.7
+
+        prompt_tokens = estimate_message_tokens(messages)
+        try:
+            max_tokens = plan_max_tokens(model, task, prompt_tokens)
+        except ContextWindowExceeded as e:
+            print(f"Error generating response: {str(e)}")
+            raise CompletionError(str(e)) from e
+
+        cache = get_completion_cache()
+        if not self.force_refresh:
+            cached_content = cache.get(_completion_cache_key(model, system_context, user_message, temperature, max_tokens))
+            if cached_content is not None:
+                return cached_content
         
         try:
-            response = client.chat.completions.create(
-                model=os.getenv("MODEL_NAME", "deepseek-ai/DeepSeek-R1"),
-                messages=messages,
-                temperature=0.7,
-                max_tokens=10000
-            )
+            asked = []
+            def create(completion_model):
+                asked.append(completion_model)
+                return self.client.chat.completions.create(
+                    model=completion_model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=_model_max_tokens(completion_model, model, max_tokens, task, prompt_tokens)
+                )
+
+            response = call_with_fallback(create, fallback_models(model))
+            answered_model = asked[-1]
             
             content = response.choices[0].message.content
+            record_usage(answered_model, task, response.usage, raw_content=content, prompt_estimate=prompt_tokens)
             
             if response.choices[0].finish_reason == "length":
                 print("Warning: Response was truncated due to length limits")
             
-            return clean_model_output(content)
+            cleaned_content = clean_model_output(content)
+            # Cache under the model that answered, so a backup's answer is never served for the primary
+            answered_max_tokens = _model_max_tokens(answered_model, model, max_tokens, task, prompt_tokens)
+            cache.set(_completion_cache_key(answered_model, system_context, user_message, temperature, answered_max_tokens),
+                      cleaned_content)
+            return cleaned_content
             
         except Exception as e:
             print(f"Error generating response: {str(e)}")
-            return f"Error generating response: {str(e)}"
+            raise CompletionError(str(e)) from e
+
+def failed_evaluation(error: Exception) -> Dict:
+    """Evaluation entry for a report whose evaluation call failed."""
+    return {'scores': {}, 'improvements': [], 'error': str(error)}
+
+def _run_report_pipeline(pipeline, script_run_ctx=None):
+    """Run a single report pipeline, turning an exception into a failed report entry."""
+    if script_run_ctx is not None:
+        # Let worker threads update Streamlit elements (streamed report text)
+        add_script_run_ctx(threading.current_thread(), script_run_ctx)
+    try:
+        return pipeline()
+    except Exception as e:
+        print(f"Error generating report: {str(e)}")
+        return {
+            'report': f"Error generating response: {str(e)}",
+            'evaluation': {'scores': {}, 'improvements': []},
+            'timestamp': datetime.now().isoformat(),
+            'news_articles': [],
+            'error': str(e)
+        }
+
+def _reusable_report(entry: Optional[Dict]) -> bool:
+    """
+    Whether a report entry of an earlier bundle can be reused.
+
+    It must have succeeded, have text and an evaluation with scores; an
+    evaluation that is still None is filled in by evaluate_bundle.
+    """
+    if not entry or 'error' in entry or not (entry.get('report') or "").strip():
+        return False
+    evaluation = entry.get('evaluation')
+    return evaluation is None or ('error' not in evaluation and bool(evaluation.get('scores')))
+
+def stale_reports(inputs: Dict, previous_bundle: Optional[Dict] = None) -> List[str]:
+    """
+    Return the keys of the reports that must be regenerated for a set of inputs.
+
+    A report of the previous bundle is reused only when it is usable (see
+    _reusable_report) and none of its REPORT_INPUTS or SHARED_INPUTS changed.
+
+    Args:
+        inputs (Dict): Current inputs, as stored in a bundle's ``inputs``
+        previous_bundle (Dict, optional): Bundle returned by the previous generate_all_reports call
+
+    Returns:
+        List[str]: Report keys to regenerate, in REPORT_KEYS order
+    """
+    if not previous_bundle:
+        return list(REPORT_KEYS)
+
+    previous_inputs = previous_bundle.get('inputs') or {}
+    stale = []
+    for key in REPORT_KEYS:
+        previous = previous_bundle.get(key)
+        changed = any(inputs.get(name) != previous_inputs.get(name) for name in SHARED_INPUTS + REPORT_INPUTS[key])
+        if not _reusable_report(previous) or changed:
+            stale.append(key)
+    return stale
+
+def generate_all_reports(financial_analyzer, company, industry, timeframe, risk_profile, investment_horizon, concurrent=True, on_report_text=None,
+                         evaluation_mode="batched", previous_bundle=None):
+    """Generate all reports at once.
+
+    The company news is fetched once, through the shared news cache, and passed
+    to every report. With ``concurrent`` enabled the three report pipelines
+    (report completion and its evaluation) run in parallel, so the bundle takes
+    about as long as the slowest pipeline. A failing pipeline only marks its own report
+    with an ``error``; the bundle fails only when every report failed.
+
+    ``on_report_text`` optionally maps report keys to callbacks that receive the
+    report text as it streams in.
+
+    ``evaluation_mode`` controls report evaluation: "per_report" evaluates each
+    report in its own pipeline, "batched" scores all reports in one model call
+    once they are done, and "deferred" leaves ``evaluation`` as None so the
+    caller can show the reports first and run evaluate_bundle afterwards.
+
+    With ``previous_bundle`` (the result of an earlier call), reports whose
+    inputs did not change are copied from it instead of being regenerated and
+    are marked ``reused``; see stale_reports. ``force_refresh`` on the analyzer
+    regenerates everything.
+    """
+    reports = {}
+    on_report_text = on_report_text or {}
+    inputs = {
+        'company': company,
+        'industry': industry,
+        'timeframe': timeframe,
+        'risk_profile': risk_profile,
+        'investment_horizon': investment_horizon,
+        'language': financial_analyzer.language,
+        'model': os.getenv("MODEL_NAME") or "deepseek-ai/DeepSeek-R1"
+    }
+    if financial_analyzer.force_refresh:
+        previous_bundle = None
+    stale = stale_reports(inputs, previous_bundle)
+
+    # Fetch the news once and share it between the regenerated reports
+    news_articles = None
+    if stale:
+        # Company metadata is slow to resolve; warm it in the background, off the report path.
+        # It is keyed by ticker, the same key get_stock_data peeks with.
+        get_company_metadata_cache().prefetch(get_market_data_provider().resolve_ticker(company))
+        try:
+            news_articles = financial_analyzer.fetch_news(company, timeframe)
+        except Exception as e:
+            # Let each pipeline retry the fetch and fail on its own
+            print(f"Error fetching news: {str(e)}")
+
+    market_cap = 100.0  # Default value
+    geographic_focus = "North America, Europe"  # Default value
+    metrics = "Revenue, EBITDA, Net Income, Operating Cash Flow"
+    evaluate_each = evaluation_mode == "per_report"
+
+    pipelines = {
+        # Market Trends Analysis
+        'market_trends': lambda: financial_analyzer.generate_market_analysis(
+            company=company,
+            industry=industry,
+            timeframe=timeframe,
+            market_cap=market_cap,
+            geographic_focus=geographic_focus,
+            on_report_text=on_report_text.get('market_trends'),
+            evaluate=evaluate_each,
+            news_articles=news_articles
+        ),
+        # Financial Projections
+        'financial_projections': lambda: financial_analyzer.generate_financial_forecast(
+            company=company,
+            timeframe=timeframe,
+            metrics=metrics,
+            on_report_text=on_report_text.get('financial_projections'),
+            evaluate=evaluate_each,
+            news_articles=news_articles
+        ),
+        # Investment Recommendations
+        'investment_recommendations': lambda: financial_analyzer.generate_investment_advice(
+            company=company,
+            risk_profile=risk_profile,
+            investment_horizon=investment_horizon,
+            on_report_text=on_report_text.get('investment_recommendations'),
+            evaluate=evaluate_each,
+            news_articles=news_articles
+        )
+    }
+    pipelines = {key: pipeline for key, pipeline in pipelines.items() if key in stale}
+
+    for key in REPORT_KEYS:
+        if key not in stale:
+            METRICS.incr("reports.reused")
+            reports[key] = dict(previous_bundle[key], reused=True)
+
+    if concurrent and pipelines:
+        with ThreadPoolExecutor(max_workers=len(pipelines)) as executor:
+            futures = {
+                key: executor.submit(_run_report_pipeline, pipeline, get_script_run_ctx(suppress_warning=True))
+                for key, pipeline in pipelines.items()
+            }
+            for key, future in futures.items():
+                reports[key] = future.result()
+    else:
+        for key, pipeline in pipelines.items():
+            reports[key] = _run_report_pipeline(pipeline)
+
+    # Keep the display order regardless of which reports were regenerated
+    reports = {key: reports[key] for key in REPORT_KEYS}
+    errors = [report['error'] for report in reports.values() if 'error' in report]
+    reports['success'] = len(errors) < len(REPORT_KEYS)
+    if not reports['success']:
+        reports['error'] = "; ".join(errors)
+    reports['inputs'] = inputs
+
+    if evaluation_mode == "batched":
+        evaluate_bundle(financial_analyzer, reports)
+
+    return reports
+
+def evaluate_bundle(financial_analyzer, all_reports):
+    """Evaluate every successful, not yet evaluated report of a bundle in one model call."""
+    pending = {
+        key: all_reports[key]['report'] for key in REPORT_KEYS
+        if key in all_reports and 'error' not in all_reports[key] and all_reports[key].get('evaluation') is None
+    }
+    if not pending:
+        return all_reports
+
+    with METRICS.timer("stage.evaluation"):
+        evaluations = financial_analyzer.evaluate_reports(pending, language=financial_analyzer.language)
+    for key, evaluation in evaluations.items():
+        all_reports[key]['evaluation'] = evaluation
+    return all_reports
+
+def parse_batch_evaluation(evaluation_text: str, report_keys: List[str], language: str = "English") -> Dict[str, Dict]:
+    """Split a batched evaluation response by report marker and parse each section; keys without a section are left out."""
+    marker_pattern = re.escape(REPORT_MARKER).replace(re.escape("{key}"), r"(\w+)")
+    markers = list(re.finditer(marker_pattern, evaluation_text))
+
+    sections = {}
+    for index, match in enumerate(markers):
+        end = markers[index + 1].start() if index + 1 < len(markers) else len(evaluation_text)
+        # Keep the first section if the model repeats a marker
+        sections.setdefault(match.group(1), evaluation_text[match.end():end])
+
+    return {key: parse_evaluation(sections[key], language) for key in report_keys if key in sections}
+
+def build_report_markdown(all_reports, company, language="English"):
+    """Build the markdown document for a report bundle."""
+    ui = UI_TRANSLATIONS[language]
+    return f"""# {company} Financial Analysis Report
+Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+## {ui["market_trends_analysis"]}
+{all_reports['market_trends']['report']}
+
+## {ui["financial_projections"]}
+{all_reports['financial_projections']['report']}
+
+## {ui["investment_recommendations"]}
+{all_reports['investment_recommendations']['report']}
+"""
+
+def write_pdf_report(all_reports, company, pdf_path, language="English"):
+    """Render a report bundle to a PDF file with wkhtmltopdf."""
+    # Convert markdown to HTML
+    html_content = markdown.markdown(build_report_markdown(all_reports, company, language))
+    
+    # Configure wkhtmltopdf path (default Windows installation path)
+    config = pdfkit.configuration(
+        wkhtmltopdf=os.getenv("WKHTMLTOPDF_PATH", r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
+    )
+    
+    # Convert HTML to PDF
+    pdfkit.from_string(html_content, pdf_path, configuration=config)
+    return pdf_path
 
 def parse_evaluation(evaluation_text: str, language: str = "English") -> Dict:
     """Parse evaluation response into structured format."""